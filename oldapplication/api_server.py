@@ -1,17 +1,30 @@
+import time
+
+_BOOT_STARTED = time.perf_counter()
+
+import asyncio
 from typing import List, Dict, Any
 
-from fastapi import FastAPI, Request, BackgroundTasks
+from fastapi import FastAPI, Request, BackgroundTasks, Query
 from fastapi.responses import JSONResponse, HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.templating import Jinja2Templates
 
+import config
 import db
-from main import run_analysis
+from processors import entity_index, explainer, keyword_store, model_registry, sentiment_cache, xai
+from processors.micro_batcher import create_batcher
+from scrapers import rate_limiter
 
 
 app = FastAPI(title="Brand Reputation Analyzer API")
 
+# On-demand sentiment scoring shares one batching queue per process
+score_batcher = create_batcher()
+MAX_SCORE_TEXTS = 256
+_startup_seconds = None
+
 # CORS for Vite dev server and common localhost origins
 app.add_middleware(
     CORSMiddleware,
@@ -204,7 +217,7 @@ async def api_analyze(payload: Dict[str, Any], background: BackgroundTasks):
     if not company_name:
         return JSONResponse({'error': 'Company name is required.'}, status_code=400)
     keywords_list = [k.strip() for k in keywords.split(',') if k.strip()]
-    background.add_task(run_analysis, company_name, keywords_list)
+    background.add_task(_run_analysis_task, company_name, keywords_list)
     company_id = company_name.replace(' ', '_').lower()
     return JSONResponse({'message': f'Analysis started for {company_name}.', 'company_id': company_id}, status_code=202)
 
@@ -223,7 +236,7 @@ async def analysis_status(company_id: str):
 
 @app.get("/api/health")
 async def api_health():
-    info: Dict[str, Any] = { 'mongo': 'disabled' }
+    info: Dict[str, Any] = { 'mongo': 'disabled', 'startup_seconds': _startup_seconds }
     try:
         ds = db.get_status()
         info.update({
@@ -247,6 +260,80 @@ async def api_health():
     return JSONResponse(info)
 
 
+@app.get("/api/rate-limits")
+async def api_rate_limits():
+    return JSONResponse(rate_limiter.get_stats())
+
+
+@app.get("/api/model/status")
+async def api_model_status():
+    cache = sentiment_cache.get_sentiment_cache()
+    return JSONResponse({
+        **model_registry.get_stats(),
+        'cache': cache.get_stats() if cache is not None else None,
+        'score_batcher': score_batcher.get_stats(),
+    })
+
+
+@app.post("/api/model/warmup")
+def api_model_warmup():
+    try:
+        return JSONResponse({'status': 'ready', **model_registry.warm_up()})
+    except Exception as e:
+        return JSONResponse({'error': f'{type(e).__name__}: {e}'}, status_code=500)
+
+
+@app.post("/api/model/unload")
+async def api_model_unload():
+    return JSONResponse({'unloaded': model_registry.unload(all_models=True)})
+
+
+def _run_analysis_task(company_name: str, keywords_list: List[str]):
+    # Scrapers, spaCy and the sentiment model are only imported once an analysis actually runs
+    from main import run_analysis
+    run_analysis(company_name, keywords_list)
+
+
+@app.on_event("startup")
+async def startup_event():
+    global _startup_seconds
+    score_batcher.start()
+    if config.PRELOAD_MODELS:
+        # Analysis workers take the model load at startup instead of on the first request
+        from processors import data_processor
+        try:
+            report = await asyncio.to_thread(data_processor.preload)
+            print(f"Preloaded models: spaCy {report['spacy_seconds']}s, sentiment model {report['sentiment_model'].get('load_seconds')}s.")
+        except Exception as e:
+            print(f"Model preload failed; models will load on first use: {e}")
+    _startup_seconds = round(time.perf_counter() - _BOOT_STARTED, 3)
+    print(f"API ready in {_startup_seconds}s.")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await score_batcher.stop()
+    model_registry.unload(all_models=True)
+
+
+@app.post("/api/score")
+async def api_score(payload: Dict[str, Any]):
+    texts = payload.get('texts')
+    if texts is None and payload.get('text') is not None:
+        texts = [payload.get('text')]
+    if not texts or not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+        return JSONResponse({'error': 'Provide "text" or a list of "texts".'}, status_code=400)
+    if len(texts) > MAX_SCORE_TEXTS:
+        return JSONResponse({'error': f'At most {MAX_SCORE_TEXTS} texts per request.'}, status_code=400)
+    try:
+        results = await score_batcher.score_many(texts)
+    except Exception as e:
+        return JSONResponse({'error': f'{type(e).__name__}: {e}'}, status_code=500)
+    if 'texts' in payload:
+        return JSONResponse({'results': results})
+    return JSONResponse(results[0])
+
+
 @app.get("/api/sentiment/{company_id}")
 async def api_sentiment(company_id: str):
     if not db.is_enabled():
@@ -254,7 +341,7 @@ async def api_sentiment(company_id: str):
     try:
         s_col = db.get_collection('sentiments')
         if s_col is not None:
-            doc = s_col.find_one({'company_id': company_id}, sort=[('date', -1)])
+            doc = s_col.find_one({'company_id': company_id}, sort=[('date', -1), ('_id', -1)])
             if doc:
                 return JSONResponse({'positive': int(doc.get('positive', 0)), 'neutral': int(doc.get('neutral', 0)), 'negative': int(doc.get('negative', 0))})
     except Exception:
@@ -262,11 +349,41 @@ async def api_sentiment(company_id: str):
     return JSONResponse({'positive': 0, 'neutral': 0, 'negative': 0})
 
 
+def _top_terms(company_id: str, kind: str, days: int, limit: int) -> List[Dict[str, Any]]:
+    start, end = keyword_store.window_bounds(days)
+    cid = company_id.replace(' ', '_').lower()
+    return keyword_store.top_terms(db.get_db(), cid, kind, start, end, limit)
+
+
+@app.get("/api/keywords/trends/{company_id}")
+async def api_keyword_trends(company_id: str, window: int = config.KEYWORD_TREND_WINDOW_DAYS, limit: int = 20, end_date: str = None):
+    if not 1 <= window <= config.KEYWORD_TREND_MAX_WINDOW_DAYS:
+        return JSONResponse({'error': f'window must be between 1 and {config.KEYWORD_TREND_MAX_WINDOW_DAYS} days.'}, status_code=400)
+    if not db.is_enabled():
+        return JSONResponse({'window_days': window, 'keywords': []})
+    try:
+        cid = company_id.replace(' ', '_').lower()
+        trends = keyword_store.keyword_trends(db.get_db(), cid, window, end_date, min(max(limit, 1), 200),
+                                              config.KEYWORD_TREND_GROWTH_THRESHOLD, config.KEYWORD_TREND_MIN_COUNT)
+        return JSONResponse(trends)
+    except ValueError as e:
+        return JSONResponse({'error': str(e)}, status_code=400)
+    except Exception as e:
+        return JSONResponse({'error': f'{type(e).__name__}: {e}'}, status_code=500)
+
+
 @app.get("/api/keywords/{company_id}")
-async def api_keywords(company_id: str):
+async def api_keywords(company_id: str, days: int = Query(30, ge=1, le=config.KEYWORD_TREND_MAX_WINDOW_DAYS), limit: int = 15):
     if not db.is_enabled():
         return JSONResponse([])
     try:
+        counted = _top_terms(company_id, 'keyword', days, limit)
+        if counted:
+            return JSONResponse(counted)
+    except Exception:
+        pass
+    try:
+        # Rows written before per-day counters existed
         k_col = db.get_collection('keywords')
         if k_col is not None:
             raw = list(k_col.find(_company_filter(company_id)).sort('date', -1))
@@ -292,6 +409,50 @@ async def api_keywords(company_id: str):
     return JSONResponse([])
 
 
+@app.get("/api/xai/{mention_id}")
+async def api_xai(mention_id: str, method: str = 'attention'):
+    if method != 'attention' and method not in explainer.METHODS:
+        return JSONResponse({'error': f'Unknown method: {method}'}, status_code=400)
+    if not db.is_enabled():
+        return JSONResponse({'error': 'mongo disabled'}, status_code=503)
+    m = db.get_collection('mentions')
+    try:
+        doc = m.find_one({'mention_id': mention_id}, {'_id': 0}) if m is not None else None
+    except Exception as e:
+        return JSONResponse({'error': f'{type(e).__name__}: {e}'}, status_code=500)
+    if not doc:
+        return JSONResponse({'error': 'Mention not found.'}, status_code=404)
+    if method == 'attention':
+        explanation = xai.explanation_from_mention(doc)
+        if explanation is None:
+            return JSONResponse({'error': 'No explanation stored for this mention.'}, status_code=404)
+        return JSONResponse(_sanitize_value(explanation))
+    text = doc.get('text') or doc.get('title') or ''
+    if doc.get('source') == 'news' and doc.get('title'):
+        # News mentions are scored on their headline
+        text = doc.get('title')
+    try:
+        explanation = await asyncio.to_thread(explainer.explain_text, model_registry.get_sentiment_model(), text, method, mention_id)
+    except Exception as e:
+        return JSONResponse({'error': f'{type(e).__name__}: {e}'}, status_code=500)
+    return JSONResponse(_sanitize_value(explanation))
+
+
+@app.post("/api/xai/explain")
+async def api_xai_explain(payload: Dict[str, Any]):
+    text = payload.get('text')
+    method = payload.get('method', 'kernel_shap')
+    if not isinstance(text, str) or not text.strip():
+        return JSONResponse({'error': 'Provide "text".'}, status_code=400)
+    if method not in explainer.METHODS:
+        return JSONResponse({'error': f'Unknown method: {method}'}, status_code=400)
+    try:
+        explanation = await asyncio.to_thread(explainer.explain_text, model_registry.get_sentiment_model(), text, method, payload.get('id'))
+    except Exception as e:
+        return JSONResponse({'error': f'{type(e).__name__}: {e}'}, status_code=500)
+    return JSONResponse(_sanitize_value(explanation))
+
+
 @app.get("/api/debug/mentions/{company_id}")
 async def debug_mentions(company_id: str):
     if not db.is_enabled():
@@ -316,9 +477,15 @@ async def debug_mentions(company_id: str):
     return JSONResponse(info)
 
 @app.get("/api/themes/{company_id}")
-async def api_themes(company_id: str):
+async def api_themes(company_id: str, days: int = Query(30, ge=1, le=config.KEYWORD_TREND_MAX_WINDOW_DAYS), limit: int = 15):
     if not db.is_enabled():
         return JSONResponse([])
+    try:
+        counted = _top_terms(company_id, 'theme', days, limit)
+        if counted:
+            return JSONResponse([t['theme'] for t in counted])
+    except Exception:
+        pass
     try:
         t_col = db.get_collection('themes')
         if t_col is not None:
@@ -330,6 +497,30 @@ async def api_themes(company_id: str):
     return JSONResponse([])
 
 
+@app.get("/api/entities/{company_id}")
+async def api_entities(company_id: str, limit: int = 50):
+    if not db.is_enabled():
+        return JSONResponse([])
+    try:
+        cid = company_id.replace(' ', '_').lower()
+        return JSONResponse(entity_index.top_entities(db.get_db(), cid, min(max(limit, 1), 500)))
+    except Exception:
+        return JSONResponse([])
+
+
+@app.get("/api/entities/{company_id}/{entity}/mentions")
+async def api_entity_mentions(company_id: str, entity: str, page: int = 1, page_size: int = 20):
+    if not db.is_enabled():
+        return JSONResponse({'entity': entity, 'page': page, 'page_size': page_size, 'total': 0, 'mentions': []})
+    try:
+        cid = company_id.replace(' ', '_').lower()
+        result = entity_index.mentions_for_entity(db.get_db(), cid, entity, page, page_size)
+        result['mentions'] = _sanitize_docs(result['mentions'])
+        return JSONResponse(result)
+    except Exception as e:
+        return JSONResponse({'error': f'{type(e).__name__}: {e}'}, status_code=500)
+
+
 @app.get("/api/news/{company_id}")
 async def api_news(company_id: str):
     if not db.is_enabled():
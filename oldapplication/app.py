@@ -1,7 +1,6 @@
 # Flask REST API for Brand Reputation Analyzer
 from flask import Flask, jsonify, request, render_template
 import threading
-from main import run_analysis # Import the run_analysis function
 import db
 
 app = Flask(__name__)
@@ -183,6 +182,8 @@ def api_analyze():
     # We create a thread to run the analysis in the background.
     # The 'args' tuple must contain exactly the arguments that run_analysis expects.
     # In this case, it's two arguments: company_name (string) and keywords_list (list).
+    # main (scrapers, spaCy, the sentiment model) is imported here so the read-only routes start fast.
+    from main import run_analysis
     thread = threading.Thread(target=run_analysis, args=(company_name, keywords_list))
     thread.start()
 
@@ -236,7 +237,7 @@ def api_sentiment(company_id):
     try:
         s_col = db.get_collection('sentiments')
         if s_col is not None:
-            doc = s_col.find_one({'company_id': company_id}, sort=[('date', -1)])
+            doc = s_col.find_one({'company_id': company_id}, sort=[('date', -1), ('_id', -1)])
             if doc:
                 return jsonify({
                     'positive': int(doc.get('positive', 0)),
@@ -0,0 +1,89 @@
+# processors/cascade.py
+
+import importlib
+import re
+from typing import Any, Callable, Dict, List, Tuple
+
+_WORD_RE = re.compile(r"[a-z']+")
+
+POSITIVE_WORDS = {
+    'amazing', 'awesome', 'best', 'brilliant', 'excellent', 'excited', 'fantastic', 'good', 'great',
+    'happy', 'impressive', 'love', 'loved', 'loves', 'outstanding', 'perfect', 'pleased', 'recommend',
+    'reliable', 'superb', 'thanks', 'thank', 'win', 'wins', 'wonderful', 'helpful', 'beautiful',
+    'record', 'growth', 'praised', 'success', 'successful', 'easy', 'fast', 'smooth',
+}
+NEGATIVE_WORDS = {
+    'angry', 'awful', 'bad', 'broken', 'complaint', 'complaints', 'crash', 'crashes', 'disappointed',
+    'disappointing', 'fail', 'failed', 'failure', 'fraud', 'hate', 'horrible', 'issue', 'issues',
+    'lawsuit', 'layoffs', 'outage', 'poor', 'problem', 'problems', 'recall', 'refund', 'scam',
+    'slow', 'terrible', 'useless', 'worst', 'frustrated', 'frustrating', 'sued', 'breach', 'bug', 'bugs',
+}
+NEGATIONS = {'not', 'no', 'never', "don't", "doesn't", "didn't", "isn't", "wasn't", "can't", "won't", 'hardly'}
+
+
+class LexiconScorer:
+    """
+    Cheap first-stage scorer: counts polarity words (flipping them after a negation)
+    and reports how one-sided and how strong the evidence is as a 0-1 confidence.
+    Texts with no polarity words get confidence 0 so they are always escalated.
+    """
+
+    def __init__(self, positive_words=None, negative_words=None, negations=None):
+        self.positive_words = set(positive_words or POSITIVE_WORDS)
+        self.negative_words = set(negative_words or NEGATIVE_WORDS)
+        self.negations = set(negations or NEGATIONS)
+
+    def score_one(self, text: str) -> Dict[str, Any]:
+        words = _WORD_RE.findall(str(text or '').lower())
+        positive = negative = 0
+        for i, word in enumerate(words):
+            polarity = 1 if word in self.positive_words else -1 if word in self.negative_words else 0
+            if not polarity:
+                continue
+            if any(w in self.negations for w in words[max(0, i - 3):i]):
+                polarity = -polarity
+            if polarity > 0:
+                positive += 1
+            else:
+                negative += 1
+        hits = positive + negative
+        if hits == 0:
+            return {'label': 'neutral', 'confidence': 0.0}
+        net = positive - negative
+        label = 'positive' if net > 0 else 'negative' if net < 0 else 'neutral'
+        # One-sidedness of the evidence times its strength (1 net word -> 0.5, 2 -> 0.75, ...)
+        confidence = (abs(net) / hits) * (1 - 0.5 ** abs(net))
+        return {'label': label, 'confidence': round(confidence, 4)}
+
+    def score(self, texts: List[str]) -> List[Dict[str, Any]]:
+        return [self.score_one(t) for t in texts]
+
+
+def load_scorer(path: str):
+    """Instantiates a first-stage scorer from a dotted path such as 'processors.cascade.LexiconScorer'."""
+    module_name, _, attr = path.rpartition('.')
+    if not module_name:
+        raise ValueError(f"Expected a dotted path to a scorer class, got: {path}")
+    return getattr(importlib.import_module(module_name), attr)()
+
+
+def run_cascade(texts: List[str], first_stage, margin: float, second_stage: Callable[[List[str]], List[Dict[str, Any]]]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Labels every text with the first stage and sends only those below `margin`
+    confidence to `second_stage`. Returns results in input order plus per-tier counts.
+    """
+    first = first_stage.score(texts)
+    escalated = [i for i, r in enumerate(first) if r['confidence'] < margin]
+    results: List[Dict[str, Any]] = [{**r, 'tier': 'first_stage'} for r in first]
+    if escalated:
+        second = second_stage([texts[i] for i in escalated])
+        for i, r in zip(escalated, second):
+            results[i] = {**r, 'tier': 'model'}
+    total = len(texts)
+    stats = {
+        'first_stage': total - len(escalated),
+        'model': len(escalated),
+        'escalation_rate': round(len(escalated) / total, 4) if total else 0.0,
+        'margin': margin,
+    }
+    return results, stats
@@ -9,6 +9,8 @@ load_dotenv(override=True)
 
 # Wikipedia Settings
 WIKI_USER_AGENT = os.getenv("WIKI_USER_AGENT")
+# Stored profiles are reused without a request for this long, then revalidated by revision id
+WIKI_PROFILE_TTL_HOURS = float(os.getenv("WIKI_PROFILE_TTL_HOURS", "168"))
 
 # NewsAPI Settings
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
@@ -19,10 +21,108 @@ REDDIT_CLIENT_SECRET = os.getenv("REDDIT_CLIENT_SECRET")
 REDDIT_USER_AGENT = os.getenv("REDDIT_USER_AGENT")
 
 # General Scraping Settings
-# Number of items to fetch from each source
+# Number of items to fetch from each source per run; NewsAPI and Reddit are paged (100 per request) up to this
 REDDIT_LIMIT = int(os.getenv("REDDIT_LIMIT", "100"))
 NEWS_LIMIT = int(os.getenv("NEWS_LIMIT", "100"))
 TWITTER_LIMIT = int(os.getenv("TWITTER_LIMIT", "100"))
+# Incremental runs only fetch items newer than the stored cursor; Reddit pages back to it up to this many posts
+SCRAPE_INCREMENTAL = os.getenv("SCRAPE_INCREMENTAL", "true").lower() in ("1", "true", "yes")
+REDDIT_CURSOR_MAX_ITEMS = int(os.getenv("REDDIT_CURSOR_MAX_ITEMS", "1000"))
+# Reddit comments: expand the comment forests of the top N posts (0 turns comment ingestion off)
+REDDIT_COMMENT_SUBMISSIONS = int(os.getenv("REDDIT_COMMENT_SUBMISSIONS", "0"))
+REDDIT_COMMENTS_PER_SUBMISSION = int(os.getenv("REDDIT_COMMENTS_PER_SUBMISSION", "200"))
+REDDIT_COMMENT_DEPTH = int(os.getenv("REDDIT_COMMENT_DEPTH", "3"))
+# "load more comments" requests per post, and posts expanded at the same time
+REDDIT_COMMENT_MORE_LIMIT = int(os.getenv("REDDIT_COMMENT_MORE_LIMIT", "4"))
+REDDIT_COMMENT_WORKERS = int(os.getenv("REDDIT_COMMENT_WORKERS", "4"))
+
+# Requests per minute per source, shared by all analyses in the process; they slow down on 429s
+NEWS_RATE_PER_MINUTE = float(os.getenv("NEWS_RATE_PER_MINUTE", "30"))
+REDDIT_RATE_PER_MINUTE = float(os.getenv("REDDIT_RATE_PER_MINUTE", "60"))
+WIKIPEDIA_RATE_PER_MINUTE = float(os.getenv("WIKIPEDIA_RATE_PER_MINUTE", "200"))
+
+# Sources are scraped concurrently; each gets its own deadline in seconds
+SCRAPE_TIMEOUT_SECONDS = float(os.getenv("SCRAPE_TIMEOUT_SECONDS", "60"))
+WIKIPEDIA_TIMEOUT_SECONDS = float(os.getenv("WIKIPEDIA_TIMEOUT_SECONDS", str(SCRAPE_TIMEOUT_SECONDS)))
+NEWS_TIMEOUT_SECONDS = float(os.getenv("NEWS_TIMEOUT_SECONDS", str(SCRAPE_TIMEOUT_SECONDS)))
+REDDIT_TIMEOUT_SECONDS = float(os.getenv("REDDIT_TIMEOUT_SECONDS", str(SCRAPE_TIMEOUT_SECONDS)))
+TWITTER_TIMEOUT_SECONDS = float(os.getenv("TWITTER_TIMEOUT_SECONDS", str(SCRAPE_TIMEOUT_SECONDS)))
+
+# spaCy Settings
+# Mentions per nlp.pipe batch and worker processes for keyword/theme extraction
+SPACY_BATCH_SIZE = int(os.getenv("SPACY_BATCH_SIZE", "64"))
+SPACY_N_PROCESS = int(os.getenv("SPACY_N_PROCESS", "1"))
+
+# Relevance and Language Prefilter Settings
+# Mentions below either score skip NLP and sentiment scoring; 'quarantine' keeps them in quarantined_mentions, 'drop' discards them
+PREFILTER_ENABLED = os.getenv("PREFILTER_ENABLED", "true").lower() in ("1", "true", "yes")
+PREFILTER_MIN_RELEVANCE = float(os.getenv("PREFILTER_MIN_RELEVANCE", "0.5"))
+PREFILTER_MIN_ENGLISH = float(os.getenv("PREFILTER_MIN_ENGLISH", "0.5"))
+# A keyword within this many words of the company name makes a mention fully relevant
+PREFILTER_PROXIMITY_WORDS = int(os.getenv("PREFILTER_PROXIMITY_WORDS", "12"))
+PREFILTER_ACTION = os.getenv("PREFILTER_ACTION", "quarantine").lower()
+
+# Near-Duplicate Mention Settings
+# Mentions whose word shingles overlap at least this much (estimated Jaccard) share one scored representative
+NEAR_DUP_ENABLED = os.getenv("NEAR_DUP_ENABLED", "true").lower() in ("1", "true", "yes")
+NEAR_DUP_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", "0.8"))
+NEAR_DUP_SHINGLE_SIZE = int(os.getenv("NEAR_DUP_SHINGLE_SIZE", "4"))
+# Representatives stay matchable for this many days after their cluster was last seen
+NEAR_DUP_TTL_DAYS = float(os.getenv("NEAR_DUP_TTL_DAYS", "30"))
+
+# Sentiment Model Settings
+# Load spaCy and the sentiment model when an API server starts (the scheduler always does);
+# leave off for read-only API replicas that never run an analysis
+PRELOAD_MODELS = os.getenv("PRELOAD_MODELS", "false").lower() in ("1", "true", "yes")
+# "torch" runs best_model.pth; "onnx" runs the exported graph with onnxruntime (no torch import)
+SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "torch")
+SENTIMENT_MODEL_PATH = os.getenv("SENTIMENT_MODEL_PATH", "best_model.pth")
+SENTIMENT_ONNX_PATH = os.getenv("SENTIMENT_ONNX_PATH", "best_model.onnx")
+# Label agreement with torch an ONNX export must reach before it replaces SENTIMENT_ONNX_PATH
+SENTIMENT_ONNX_MIN_AGREEMENT = float(os.getenv("SENTIMENT_ONNX_MIN_AGREEMENT", "1.0"))
+# Leave empty to pick cuda when available, otherwise cpu
+SENTIMENT_DEVICE = os.getenv("SENTIMENT_DEVICE", "")
+# "float32" or "int8" (dynamic INT8 quantization, cpu only)
+SENTIMENT_DTYPE = os.getenv("SENTIMENT_DTYPE", "float32")
+# Held-out sample (one text per line) checked against fp32 before an int8 model is used
+SENTIMENT_INT8_CHECK_SAMPLE = os.getenv("SENTIMENT_INT8_CHECK_SAMPLE", "")
+SENTIMENT_INT8_MIN_AGREEMENT = float(os.getenv("SENTIMENT_INT8_MIN_AGREEMENT", "0.97"))
+
+# Store per-word attention weights on each mention for the XAI views
+SENTIMENT_STORE_ATTRIBUTIONS = os.getenv("SENTIMENT_STORE_ATTRIBUTIONS", "true").lower() in ("1", "true", "yes")
+
+# Sentiment Result Cache Settings
+# "auto" (Mongo if configured, else local file), "mongo", "disk" or "off"
+SENTIMENT_CACHE_BACKEND = os.getenv("SENTIMENT_CACHE_BACKEND", "auto")
+SENTIMENT_CACHE_PATH = os.getenv("SENTIMENT_CACHE_PATH", "sentiment_cache.sqlite3")
+SENTIMENT_CACHE_MAX_ITEMS = int(os.getenv("SENTIMENT_CACHE_MAX_ITEMS", "500000"))
+SENTIMENT_CACHE_MEMORY_ITEMS = int(os.getenv("SENTIMENT_CACHE_MEMORY_ITEMS", "10000"))
+
+# Perturbation explainer (occlusion / KernelSHAP) settings
+XAI_MAX_EVALUATIONS = int(os.getenv("XAI_MAX_EVALUATIONS", "512"))
+XAI_CACHE_PATH = os.getenv("XAI_CACHE_PATH", "xai_cache.sqlite3")
+XAI_CACHE_MAX_ITEMS = int(os.getenv("XAI_CACHE_MAX_ITEMS", "50000"))
+XAI_CACHE_MEMORY_ITEMS = int(os.getenv("XAI_CACHE_MEMORY_ITEMS", "1000"))
+
+# Sentiment Cascade Settings
+# A cheap first-stage scorer labels confident texts; the rest go to the sentiment model
+SENTIMENT_CASCADE_ENABLED = os.getenv("SENTIMENT_CASCADE_ENABLED", "false").lower() in ("1", "true", "yes")
+SENTIMENT_CASCADE_SCORER = os.getenv("SENTIMENT_CASCADE_SCORER", "processors.cascade.LexiconScorer")
+SENTIMENT_CASCADE_MARGIN = float(os.getenv("SENTIMENT_CASCADE_MARGIN", "0.7"))
+
+# On-demand scoring (/api/score): a batch closes after this many texts or milliseconds
+SCORE_BATCH_MAX_ITEMS = int(os.getenv("SCORE_BATCH_MAX_ITEMS", "32"))
+SCORE_BATCH_MAX_WAIT_MS = float(os.getenv("SCORE_BATCH_MAX_WAIT_MS", "10"))
+# Number of texts scored per forward pass
+SENTIMENT_BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", "32"))
+
+# Keyword Trend Settings (/api/keywords/trends)
+# Each window is compared with the window of the same length just before it
+KEYWORD_TREND_WINDOW_DAYS = int(os.getenv("KEYWORD_TREND_WINDOW_DAYS", "7"))
+KEYWORD_TREND_MAX_WINDOW_DAYS = int(os.getenv("KEYWORD_TREND_MAX_WINDOW_DAYS", "90"))
+# Relative change that counts as rising/falling, and the smallest absolute change that counts at all
+KEYWORD_TREND_GROWTH_THRESHOLD = float(os.getenv("KEYWORD_TREND_GROWTH_THRESHOLD", "0.25"))
+KEYWORD_TREND_MIN_COUNT = int(os.getenv("KEYWORD_TREND_MIN_COUNT", "2"))
 
 # MongoDB Settings
 MONGODB_URI = os.getenv("MONGODB_URI")
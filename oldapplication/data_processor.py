@@ -1,44 +1,150 @@
 # processors/data_processor.py
+import threading
+import time
 import pandas as pd
 from collections import Counter
-import spacy
-from .sentiment import SentimentModel # Import the new class
+import config
+from .model_registry import get_sentiment_model, warm_up
+from .sentiment_cache import get_sentiment_cache
+from .cascade import load_scorer, run_cascade
 
 
-# Load the spaCy model once
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    print("Downloading spaCy model 'en_core_web_sm'. This may take a moment.")
-    from spacy.cli import download
-    download("en_core_web_sm")
-    nlp = spacy.load("en_core_web_sm")
+_nlp = None
+_nlp_lock = threading.Lock()
 
-def extract_keywords_and_themes(df: pd.DataFrame, text_column: str) -> tuple:
+def get_nlp():
+    """
+    Loads the spaCy model once, on first use, so importing this module stays cheap
+    for processes that never run an analysis.
+    """
+    global _nlp
+    if _nlp is not None:
+        return _nlp
+    with _nlp_lock:
+        if _nlp is None:
+            import spacy
+            try:
+                _nlp = spacy.load("en_core_web_sm")
+            except OSError:
+                print("Downloading spaCy model 'en_core_web_sm'. This may take a moment.")
+                from spacy.cli import download
+                download("en_core_web_sm")
+                _nlp = spacy.load("en_core_web_sm")
+    return _nlp
+
+def preload(sentiment: bool = True) -> dict:
+    """
+    Loads spaCy and (optionally) the sentiment model ahead of the first analysis and
+    reports how long each took. Meant for analysis workers; API replicas skip it.
+    """
+    report = {}
+    started = time.perf_counter()
+    get_nlp()
+    report['spacy_seconds'] = round(time.perf_counter() - started, 3)
+    if sentiment:
+        report['sentiment_model'] = warm_up()
+    return report
+
+# Components extract_keywords_and_themes never reads; ner, the tagger/attribute_ruler (pos_)
+# and the lemmatizer stay on
+_UNUSED_PIPES = ('parser', 'senter')
+
+def extract_mention_terms(df: pd.DataFrame, text_column: str, batch_size: int = None, n_process: int = None) -> list:
+    """
+    Extracts named entities (as keywords) and adjectives (as themes) from each text entry.
+    Mentions are streamed through nlp.pipe, so memory stays bounded and no single Doc can
+    exceed spaCy's max_length. Returns one (keywords, themes) pair of lists per row, in
+    order; rows without text get empty lists.
+    """
+    nlp = get_nlp()
+    batch_size = batch_size or config.SPACY_BATCH_SIZE
+    n_process = n_process or config.SPACY_N_PROCESS
+    disabled = [name for name in _UNUSED_PIPES if name in nlp.pipe_names]
+    column = df[text_column]
+    present = column.notna().tolist()
+    texts = (str(t)[:nlp.max_length] for t in column.dropna())
+
+    docs = nlp.pipe(texts, batch_size=batch_size, n_process=n_process, disable=disabled)
+    terms = []
+    for has_text in present:
+        if not has_text:
+            terms.append(([], []))
+            continue
+        doc = next(docs)
+        # Extract keywords (Organizations, Products, People)
+        keywords = [ent.text for ent in doc.ents if ent.label_ in ('ORG', 'PRODUCT', 'PERSON')]
+        # Extract themes (adjectives)
+        themes = [token.lemma_.lower() for token in doc if token.pos_ == 'ADJ']
+        terms.append((keywords, themes))
+    return terms
+
+def top_terms(mention_terms: list, limit: int = 15) -> tuple:
+    """
+    Folds per-mention (keywords, themes) pairs into running counters.
+    Returns a tuple of (keywords_df, themes_df) with the top `limit` of each.
+    """
+    keyword_counts = Counter()
+    theme_counts = Counter()
+    for keywords, themes in mention_terms:
+        keyword_counts.update(keywords)
+        theme_counts.update(themes)
+    top_keywords = pd.DataFrame(keyword_counts.most_common(limit), columns=['keyword', 'count'])
+    top_themes = pd.DataFrame(theme_counts.most_common(limit), columns=['theme', 'count'])
+    return top_keywords, top_themes
+
+def extract_keywords_and_themes(df: pd.DataFrame, text_column: str, batch_size: int = None, n_process: int = None) -> tuple:
     """
     Extracts named entities (as keywords) and common adjectives (as themes) from text.
     Returns a tuple of (keywords_df, themes_df)
     """
-    all_text = ' '.join(df[text_column].dropna())
-    doc = nlp(all_text)
-    
-    # Extract keywords (Organizations, Products, People)
-    keywords = [ent.text for ent in doc.ents if ent.label_ in ('ORG', 'PRODUCT', 'PERSON')]
-    
-    # Extract themes (adjectives)
-    themes = [token.lemma_.lower() for token in doc if token.pos_ == 'ADJ']
-    
     # Get top 15 of each
-    top_keywords = pd.DataFrame(Counter(keywords).most_common(15), columns=['keyword', 'count'])
-    top_themes = pd.DataFrame(Counter(themes).most_common(15), columns=['theme', 'count'])
-    
-    return top_keywords, top_themes
+    return top_terms(extract_mention_terms(df, text_column, batch_size, n_process), 15)
+
+def _score_with_model(texts, with_attributions=False):
+    model = get_sentiment_model()
+    cache = get_sentiment_cache()
+    if cache is None:
+        return model.predict_batch(texts, batch_size=config.SENTIMENT_BATCH_SIZE, return_attributions=with_attributions)
+    results = cache.predict_batch(model, texts, batch_size=config.SENTIMENT_BATCH_SIZE, return_attributions=with_attributions)
+    stats = cache.get_stats()
+    print(f"Sentiment cache: {stats['memory_hits'] + stats['store_hits']} hits, {stats['misses']} misses so far.")
+    return results
+
+def score_mentions(df, text_column, cascade=None, with_attributions=False):
+    """
+    Scores each text entry in a DataFrame column and returns (results, tiers), with one
+    {'label', 'probabilities', ...} dict per row in order. With the cascade enabled
+    (argument or SENTIMENT_CASCADE_ENABLED), a cheap first-stage scorer labels confident
+    texts and only the rest reach the sentiment model; tiers holds the per-tier counts
+    (None without the cascade). with_attributions adds per-word attention weights to
+    every result scored by the model.
+    """
+    texts = df[text_column].tolist()
+    if cascade is None:
+        cascade = config.SENTIMENT_CASCADE_ENABLED
+    if not (cascade and texts):
+        return _score_with_model(texts, with_attributions), None
+    results, tiers = run_cascade(texts, load_scorer(config.SENTIMENT_CASCADE_SCORER), config.SENTIMENT_CASCADE_MARGIN,
+                                 lambda escalated: _score_with_model(escalated, with_attributions))
+    print(f"Sentiment cascade: {tiers['first_stage']} texts labelled by the first stage, "
+          f"{tiers['model']} escalated to the model ({tiers['escalation_rate']:.0%}).")
+    return results, tiers
+
+def sentiment_counts(results, tiers=None):
+    """
+    Aggregates per-text results into the one-row positive/neutral/negative frame
+    stored in 'sentiments'; tiers (if any) are attached as attrs['tiers'].
+    """
+    sentiments = pd.Series([r['label'] for r in results], dtype=object)
+    counts = sentiments.value_counts().reindex(['positive', 'neutral', 'negative'], fill_value=0)
+    sentiment_df = pd.DataFrame([counts])
+    if tiers is not None:
+        sentiment_df.attrs['tiers'] = tiers
+    return sentiment_df
 
-def analyze_sentiment(df, text_column):
+def analyze_sentiment(df, text_column, cascade=None):
     """
     Analyzes the sentiment of each text entry in a DataFrame column.
     """
-    model = SentimentModel()
-    sentiments = df[text_column].apply(model.predict)
-    sentiment_counts = sentiments.value_counts().reindex(['positive', 'neutral', 'negative'], fill_value=0)
-    return pd.DataFrame([sentiment_counts])
\ No newline at end of file
+    results, tiers = score_mentions(df, text_column, cascade=cascade)
+    return sentiment_counts(results, tiers)
\ No newline at end of file
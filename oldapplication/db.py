@@ -1,7 +1,7 @@
 import threading
-from typing import Optional
+from typing import Callable, List, Optional
 
-from pymongo import MongoClient, ASCENDING, errors
+from pymongo import MongoClient, ASCENDING, DESCENDING, errors
 import ssl
 import certifi
 
@@ -10,6 +10,8 @@ import config
 _client_lock = threading.Lock()
 _client: Optional[MongoClient] = None
 _last_error: Optional[str] = None
+# Index setups of feature modules, registered by the code that uses them
+_index_setups: List[Callable] = []
 
 
 def _ensure_client() -> Optional[MongoClient]:
@@ -112,6 +114,13 @@ def get_collection(name: str):
     return db[name]
 
 
+def register_indexes(*setups: Callable) -> None:
+    """Adds fn(database) callbacks that ensure_indexes runs after the core indexes."""
+    for setup in setups:
+        if setup not in _index_setups:
+            _index_setups.append(setup)
+
+
 def ensure_indexes() -> None:
     db = get_db()
     if db is None:
@@ -126,12 +135,22 @@ def ensure_indexes() -> None:
         db["companies"].create_index([("company_id", ASCENDING)], unique=True)
         db["mentions"].create_index([("company_id", ASCENDING), ("source", ASCENDING), ("url", ASCENDING)], unique=True)
         db["mentions"].create_index([("company_id", ASCENDING), ("source", ASCENDING)])
+        db["mentions"].create_index([("mention_id", ASCENDING)])
         db["keywords"].create_index([("company_id", ASCENDING), ("date", ASCENDING)])
         db["themes"].create_index([("company_id", ASCENDING), ("date", ASCENDING)])
         db["sentiments"].create_index([("company_id", ASCENDING), ("date", ASCENDING)])
+        db["sentiment_cache"].create_index([("last_used", ASCENDING)])
+        db["xai_cache"].create_index([("last_used", ASCENDING)])
+        db["scrape_runs"].create_index([("company_id", ASCENDING), ("started_at", DESCENDING)])
     except errors.PyMongoError:
         # Avoid crashing app if index creation fails; operations will still attempt
         pass
+    for setup in _index_setups:
+        # One failing module must not skip the others
+        try:
+            setup(db)
+        except errors.PyMongoError:
+            pass
 
 
 def get_status() -> dict:
@@ -0,0 +1,123 @@
+# processors/entity_index.py
+"""
+Per-mention entities and an entity -> mention inverted index.
+
+Each mention's ORG/PRODUCT/PERSON entities are normalised and stored on its document in
+'mentions'. 'entity_postings' holds one row per (company_id, entity, mention_id), so the
+mentions about an entity can be paged straight off an index, and 'entity_counts' keeps
+how many mentions each entity appears in.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+
+POSTINGS_COLLECTION = 'entity_postings'
+COUNTS_COLLECTION = 'entity_counts'
+
+_POSSESSIVE_RE = re.compile(r"(?:'s|’s|')$")
+_EDGE_PUNCT = "\"'“”‘’.,;:!?()[]{}"
+
+
+def _clean_entity(text: str) -> str:
+    text = ' '.join(str(text or '').split()).strip(_EDGE_PUNCT)
+    text = _POSSESSIVE_RE.sub('', text).strip(_EDGE_PUNCT)
+    if text.lower().startswith('the '):
+        text = text[4:]
+    return text
+
+
+def normalize_entity(text: str) -> str:
+    """Lower-cased, whitespace-collapsed form without surrounding punctuation, a leading 'the' or a trailing possessive."""
+    return _clean_entity(text).lower()
+
+
+def mention_entities(raw_entities: List[str]) -> Tuple[List[str], List[str]]:
+    """
+    Deduplicates a mention's entities by normalised form.
+    Returns (display forms as first written, normalised keys).
+    """
+    display: Dict[str, str] = {}
+    for ent in raw_entities:
+        name = _clean_entity(ent)
+        key = name.lower()
+        if key and key not in display:
+            display[key] = name
+    return list(display.values()), list(display.keys())
+
+
+def ensure_indexes(database) -> None:
+    database[POSTINGS_COLLECTION].create_index([("company_id", ASCENDING), ("entity", ASCENDING), ("mention_id", ASCENDING)], unique=True)
+    database[POSTINGS_COLLECTION].create_index([("company_id", ASCENDING), ("entity", ASCENDING), ("_id", DESCENDING)])
+    database[COUNTS_COLLECTION].create_index([("company_id", ASCENDING), ("entity", ASCENDING)], unique=True)
+    database[COUNTS_COLLECTION].create_index([("company_id", ASCENDING), ("count", DESCENDING)])
+
+
+def index_mentions(database, company_id: str, date: str, mention_entity_lists: Dict[str, List[str]], sources: Optional[Dict[str, str]] = None) -> Dict[str, int]:
+    """
+    Stores {mention_id: raw entity texts} on the mention documents and in the inverted index.
+    Counts only grow for postings that did not exist yet, so re-indexing a mention is a no-op.
+    """
+    sources = sources or {}
+    mention_ops = []
+    posting_ops = []
+    postings: List[Tuple[str, str]] = []
+    for mention_id, raw in mention_entity_lists.items():
+        display, keys = mention_entities(raw)
+        mention_ops.append(UpdateOne({"company_id": company_id, "mention_id": mention_id}, {"$set": {"entities": display, "entity_keys": keys}}))
+        for name, key in zip(display, keys):
+            posting_ops.append(UpdateOne(
+                {"company_id": company_id, "entity": key, "mention_id": mention_id},
+                {"$setOnInsert": {"display": name, "date": date, "source": sources.get(mention_id)}},
+                upsert=True,
+            ))
+            postings.append((key, name))
+
+    if mention_ops:
+        database["mentions"].bulk_write(mention_ops, ordered=False)
+    new_postings = 0
+    if posting_ops:
+        result = database[POSTINGS_COLLECTION].bulk_write(posting_ops, ordered=False)
+        new_by_entity: Dict[str, int] = {}
+        display_by_entity: Dict[str, str] = {}
+        for op_index in result.upserted_ids:
+            key, name = postings[op_index]
+            new_by_entity[key] = new_by_entity.get(key, 0) + 1
+            display_by_entity.setdefault(key, name)
+        count_ops = [
+            UpdateOne({"company_id": company_id, "entity": key},
+                      {"$inc": {"count": n}, "$set": {"last_seen": date}, "$setOnInsert": {"display": display_by_entity[key]}},
+                      upsert=True)
+            for key, n in new_by_entity.items()
+        ]
+        if count_ops:
+            database[COUNTS_COLLECTION].bulk_write(count_ops, ordered=False)
+        new_postings = len(result.upserted_ids)
+    return {'mentions': len(mention_ops), 'new_postings': new_postings}
+
+
+def top_entities(database, company_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+    docs = database[COUNTS_COLLECTION].find({"company_id": company_id}, {"_id": 0, "entity": 1, "display": 1, "count": 1}).sort("count", DESCENDING).limit(limit)
+    return list(docs)
+
+
+def mentions_for_entity(database, company_id: str, entity: str, page: int = 1, page_size: int = 20) -> Dict[str, Any]:
+    """
+    One page of mentions (newest postings first) that mention `entity`, plus the total count.
+    """
+    key = normalize_entity(entity)
+    page = max(1, page)
+    page_size = max(1, min(page_size, 100))
+    query = {"company_id": company_id, "entity": key}
+    postings = list(database[POSTINGS_COLLECTION].find(query, {"mention_id": 1}).sort("_id", DESCENDING).skip((page - 1) * page_size).limit(page_size))
+    ids = [p["mention_id"] for p in postings]
+    docs = {d["mention_id"]: d for d in database["mentions"].find({"company_id": company_id, "mention_id": {"$in": ids}}, {"_id": 0})}
+    counts = database[COUNTS_COLLECTION].find_one(query, {"_id": 0, "count": 1}) or {}
+    return {
+        'entity': key,
+        'page': page,
+        'page_size': page_size,
+        'total': counts.get('count', 0),
+        'mentions': [docs[m] for m in ids if m in docs],
+    }
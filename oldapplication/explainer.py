@@ -0,0 +1,196 @@
+# processors/explainer.py
+
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+import config
+from .sentiment_cache import SentimentCache, cache_key, model_fingerprint, normalize_text, select_store
+from .sentiment_labels import label_probabilities
+from .xai import build_explanation
+
+METHODS = ('occlusion', 'kernel_shap')
+
+
+class PerturbationExplainer:
+    """
+    Model-agnostic word attributions for texts where attention weights aren't faithful enough.
+
+    Every perturbed variant of a text is generated up front and scored in large padded batches
+    through model.predict_batch, instead of one forward pass per variant:
+
+    - 'occlusion' drops one word at a time (one batch of n_words + 1 texts);
+    - 'kernel_shap' samples word coalitions in rounds and fits KernelSHAP's weighted linear
+      model, stopping at `max_evaluations` or once no attribution moves more than `tolerance`
+      between rounds.
+
+    Attributions explain the probability of the predicted label (collapsed to 3 labels),
+    scaled so the strongest word is +/-1. The full prediction, the empty text and every
+    variant count against `max_evaluations`; texts with more words than that allows are
+    explained over runs of adjacent words, and each run's attribution is split evenly
+    over its words.
+    """
+
+    def __init__(self, model, batch_size: int = 64, max_evaluations: int = 512, round_size: int = 128, tolerance: float = 0.01, seed: int = 13):
+        self.model = model
+        self.batch_size = batch_size
+        self.max_evaluations = max_evaluations
+        self.round_size = round_size
+        self.tolerance = tolerance
+        self.seed = seed
+
+    def _target_probs(self, texts: List[str], label: str) -> np.ndarray:
+        results = self.model.predict_batch(texts, batch_size=self.batch_size)
+        return np.array([label_probabilities(r['probabilities'])[label] for r in results], dtype=np.float64)
+
+    def explain(self, text: str, method: str = 'kernel_shap') -> Dict[str, Any]:
+        if method not in METHODS:
+            raise ValueError(f"Unknown explanation method: {method}")
+        words = text.split()
+        base = self.model.predict_batch([text], batch_size=1)[0]
+        label = base['label']
+        confidence = label_probabilities(base['probabilities'])[label]
+        if not words:
+            return {'label': label, 'confidence': confidence, 'probabilities': base['probabilities'], 'attributions': [], 'evaluations': 1, 'converged': True}
+
+        # Occlusion needs one variant per segment; KernelSHAP at least one more, plus the empty text
+        limit = max(1, self.max_evaluations - (1 if method == 'occlusion' else 3))
+        groups = np.array_split(np.arange(len(words)), min(limit, len(words)))
+        segments = [' '.join(words[i] for i in group) for group in groups]
+        if method == 'occlusion':
+            segment_values, evaluations, converged = self._occlusion(segments, label, confidence)
+        else:
+            segment_values, evaluations, converged = self._kernel_shap(segments, label, confidence)
+        values = np.zeros(len(words))
+        for group, value in zip(groups, segment_values):
+            values[group] = value / len(group)
+
+        # Same sign convention as the attention attributions: negative means "pushes towards negative"
+        if label == 'negative':
+            values = -values
+        peak = float(np.max(np.abs(values))) or 1.0
+        attributions = [{'word': w, 'value': round(float(v) / peak, 4), 'index': i} for i, (w, v) in enumerate(zip(words, values))]
+        return {
+            'label': label,
+            'confidence': confidence,
+            'probabilities': base['probabilities'],
+            'attributions': attributions,
+            'evaluations': evaluations + 1,
+            'segments': len(segments),
+            'converged': converged,
+        }
+
+    def _occlusion(self, words: List[str], label: str, full: float):
+        variants = [' '.join(words[:i] + words[i + 1:]) for i in range(len(words))]
+        return full - self._target_probs(variants, label), len(variants), True
+
+    def _kernel_shap(self, words: List[str], label: str, full: float):
+        n = len(words)
+        empty = float(self._target_probs([''], label)[0])
+        if n == 1:
+            return np.array([full - empty]), 1, True
+
+        rng = np.random.default_rng(self.seed)
+        # The full text and the empty text are already spent
+        budget = self.max_evaluations - 2
+        masks: List[np.ndarray] = []
+        targets: List[float] = []
+        seen = set()
+        # Shapley kernel mass per coalition size; every subset of a size shares it equally
+        sizes = np.arange(1, n)
+        size_weights = (n - 1) / (sizes * (n - sizes))
+        size_probs = size_weights / size_weights.sum()
+        exhaustive = n <= 12 and (2 ** n - 2) <= budget
+
+        candidates: List[np.ndarray] = []
+        if exhaustive:
+            for code in range(1, 2 ** n - 1):
+                candidates.append(np.array([(code >> j) & 1 for j in range(n)], dtype=np.float64))
+
+        values = np.zeros(n)
+        converged = False
+        while len(masks) < budget:
+            round_masks = []
+            limit = min(self.round_size, budget - len(masks))
+            if exhaustive:
+                round_masks, candidates = candidates[:limit], candidates[limit:]
+            else:
+                attempts = 0
+                while len(round_masks) < limit and attempts < limit * 20:
+                    attempts += 1
+                    size = rng.choice(sizes, p=size_probs)
+                    mask = np.zeros(n)
+                    mask[rng.choice(n, size=size, replace=False)] = 1.0
+                    key = mask.tobytes()
+                    if key not in seen:
+                        seen.add(key)
+                        round_masks.append(mask)
+            if not round_masks:
+                break
+            variants = [' '.join(w for w, keep in zip(words, m) if keep) for m in round_masks]
+            masks.extend(round_masks)
+            targets.extend(self._target_probs(variants, label).tolist())
+
+            updated = _solve_kernel_shap(np.array(masks), np.array(targets), full, empty)
+            if exhaustive and not candidates:
+                values, converged = updated, True
+                break
+            if len(masks) > len(round_masks) and np.max(np.abs(updated - values)) < self.tolerance:
+                values, converged = updated, True
+                break
+            values = updated
+        return values, len(masks) + 1, converged
+
+
+def _solve_kernel_shap(masks: np.ndarray, targets: np.ndarray, full: float, empty: float) -> np.ndarray:
+    """
+    Weighted least squares for KernelSHAP with the efficiency constraint
+    sum(phi) = full - empty enforced by eliminating the last feature.
+    """
+    n = masks.shape[1]
+    sizes = masks.sum(axis=1)
+    weights = (n - 1) / (np.maximum(sizes * (n - sizes), 1) * 1.0)
+    y = targets - empty - masks[:, -1] * (full - empty)
+    X = masks[:, :-1] - masks[:, -1:]
+    sw = np.sqrt(weights)[:, None]
+    phi_rest, *_ = np.linalg.lstsq(X * sw, y * sw[:, 0], rcond=None)
+    return np.append(phi_rest, (full - empty) - phi_rest.sum())
+
+
+_cache: Optional[SentimentCache] = None
+_cache_lock = threading.Lock()
+
+
+def _explanation_cache() -> Optional[SentimentCache]:
+    global _cache
+    if config.SENTIMENT_CACHE_BACKEND == 'off':
+        return None
+    with _cache_lock:
+        if _cache is None:
+            store = select_store("xai_cache", config.XAI_CACHE_PATH, config.XAI_CACHE_MAX_ITEMS, "Explanation cache")
+            _cache = SentimentCache(store, max_memory_items=config.XAI_CACHE_MEMORY_ITEMS)
+    return _cache
+
+
+def explain_text(model, text: str, method: str = 'kernel_shap', explanation_id: Optional[str] = None, max_evaluations: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Explains one text and returns it in the frontend's XAIExplanation shape.
+    Results are cached by text hash + model version + method + budget.
+    """
+    text = normalize_text(text)
+    max_evaluations = max_evaluations or config.XAI_MAX_EVALUATIONS
+    version = f"{model_fingerprint(model)}:{method}:{max_evaluations}"
+    key = cache_key(text, version)
+
+    cache = _explanation_cache()
+    cached = cache.get(key) if cache is not None else None
+    if cached is None:
+        result = PerturbationExplainer(model, batch_size=config.SENTIMENT_BATCH_SIZE, max_evaluations=max_evaluations).explain(text, method)
+        cached = {'label': result['label'], 'probabilities': result['probabilities'], 'attributions': result['attributions']}
+        if cache is not None:
+            cache.put(key, cached, version)
+
+    label = cached['label']
+    confidence = round(label_probabilities(cached['probabilities'])[label], 4) if cached.get('probabilities') else None
+    return build_explanation(explanation_id or key[:16], label, confidence, cached.get('attributions') or [], method=method)
@@ -0,0 +1,114 @@
+# scrapers/fanout.py
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+@dataclass
+class SourceTask:
+    """
+    One scraper call in a fan-out. A `paged` task returns an iterator of pages (lists of
+    records) and every page is handed on as soon as it arrives; otherwise the call's
+    return value (usually a DataFrame) is delivered as a single item. A timeout of None
+    means no deadline.
+    """
+    name: str
+    fn: Callable[..., Any]
+    args: Tuple[Any, ...] = ()
+    timeout: Optional[float] = 60.0
+    paged: bool = False
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+
+_PAGE = 'page'
+_DONE = 'done'
+
+
+def _size(payload: Any) -> int:
+    return len(payload) if payload is not None else 0
+
+
+class SourceStream:
+    """
+    Runs every source in its own thread and yields (name, payload) in arrival order, so the
+    caller can process the first page while later pages are still downloading.
+
+    Each source has a deadline measured from the start: a paged source stops fetching once
+    it has passed, and a source stuck in a request is no longer waited for. What arrived
+    before that is kept. After iteration, `stats` holds {name: {status, seconds, items,
+    pages[, error]}} with status 'ok', 'timeout' or 'error'.
+    """
+
+    def __init__(self, tasks: List[SourceTask]):
+        self.tasks = tasks
+        self.stats: Dict[str, Dict[str, Any]] = {t.name: {'status': 'pending', 'seconds': None, 'items': 0, 'pages': 0} for t in tasks}
+
+    def _produce(self, task: SourceTask, deadline: Optional[float], cancelled: threading.Event, out: queue.Queue) -> None:
+        try:
+            result = task.fn(*task.args, **task.kwargs)
+            if not task.paged:
+                out.put((task.name, _PAGE, result))
+                out.put((task.name, _DONE, ('ok', None)))
+                return
+            for page in result:
+                if cancelled.is_set():
+                    break
+                out.put((task.name, _PAGE, page))
+                if deadline is not None and time.perf_counter() >= deadline:
+                    out.put((task.name, _DONE, ('timeout', None)))
+                    break
+            else:
+                out.put((task.name, _DONE, ('ok', None)))
+            if hasattr(result, 'close'):
+                result.close()
+        except Exception as e:
+            out.put((task.name, _DONE, ('error', f'{type(e).__name__}: {e}')))
+
+    def __iter__(self) -> Iterator[Tuple[str, Any]]:
+        started = time.perf_counter()
+        out: queue.Queue = queue.Queue()
+        deadlines = {t.name: (started + t.timeout if t.timeout is not None else None) for t in self.tasks}
+        cancelled = {t.name: threading.Event() for t in self.tasks}
+        for task in self.tasks:
+            threading.Thread(target=self._produce, args=(task, deadlines[task.name], cancelled[task.name], out),
+                             name=f'scrape-{task.name}', daemon=True).start()
+
+        pending = set(deadlines)
+        try:
+            while pending:
+                try:
+                    # Anything already delivered is used, even if its deadline has passed since
+                    name, kind, payload = out.get_nowait()
+                except queue.Empty:
+                    now = time.perf_counter()
+                    for overdue in [n for n in pending if deadlines[n] is not None and now >= deadlines[n]]:
+                        cancelled[overdue].set()
+                        self.stats[overdue].update(status='timeout', seconds=round(now - started, 3))
+                        pending.discard(overdue)
+                    if not pending:
+                        break
+                    upcoming = [deadlines[n] for n in pending if deadlines[n] is not None]
+                    try:
+                        name, kind, payload = out.get(timeout=max(0.0, min(upcoming) - now) if upcoming else None)
+                    except queue.Empty:
+                        continue
+                if name not in pending:
+                    continue
+                stats = self.stats[name]
+                if kind == _PAGE:
+                    stats['items'] += _size(payload)
+                    stats['pages'] += 1
+                    yield name, payload
+                else:
+                    status, error = payload
+                    stats.update(status=status, seconds=round(time.perf_counter() - started, 3))
+                    if error:
+                        stats['error'] = error
+                    pending.discard(name)
+        finally:
+            # Stop producers when the caller stops iterating early
+            for event in cancelled.values():
+                event.set()
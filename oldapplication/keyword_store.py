@@ -0,0 +1,172 @@
+# processors/keyword_store.py
+"""
+Per-company, per-day keyword and theme counters.
+
+Each run merges its per-mention extraction results into stored counts with $inc upserts,
+so several runs on the same day add up instead of piling up duplicate top-15 rows. A
+ledger of counted mention ids makes sure every mention is counted once, and top-k over a
+date window is a $match on the (company_id, date) index followed by a $group. Keyword
+trends compare two adjacent windows of the same daily buckets.
+"""
+
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from pymongo import ASCENDING, DESCENDING, UpdateOne, errors
+
+TERM_COLLECTIONS = {
+    'keyword': 'keyword_counts',
+    'theme': 'theme_counts',
+}
+LEDGER_COLLECTION = 'counted_mentions'
+
+
+def ensure_indexes(database) -> None:
+    for kind, name in TERM_COLLECTIONS.items():
+        database[name].create_index([("company_id", ASCENDING), ("date", ASCENDING), (kind, ASCENDING)], unique=True)
+        database[name].create_index([("company_id", ASCENDING), (kind, ASCENDING), ("date", ASCENDING)])
+    database[LEDGER_COLLECTION].create_index([("company_id", ASCENDING), ("mention_id", ASCENDING)], unique=True)
+
+
+def claim_new_mentions(database, company_id: str, mention_ids: Iterable[str], date: str) -> Set[str]:
+    """
+    Records mention ids in the ledger and returns the ones that were not counted before.
+    A mention is claimed before its terms are merged, so a failed run can under-count
+    but never count a mention twice.
+    """
+    ids = list(dict.fromkeys(m for m in mention_ids if m))
+    if not ids:
+        return set()
+    docs = [{"company_id": company_id, "mention_id": m, "date": date} for m in ids]
+    try:
+        database[LEDGER_COLLECTION].insert_many(docs, ordered=False)
+    except errors.BulkWriteError as e:
+        duplicates = {ids[err["index"]] for err in e.details.get("writeErrors", []) if err.get("code") == 11000}
+        other = [err for err in e.details.get("writeErrors", []) if err.get("code") != 11000]
+        if other:
+            raise
+        return set(ids) - duplicates
+    return set(ids)
+
+
+def _inc_ops(kind: str, company_id: str, date: str, counts: Counter) -> List[UpdateOne]:
+    return [
+        UpdateOne({"company_id": company_id, "date": date, kind: term}, {"$inc": {"count": n}}, upsert=True)
+        for term, n in counts.items()
+    ]
+
+
+def record_mention_terms(database, company_id: str, date: str, mention_terms: Dict[str, Tuple[List[str], List[str]]]) -> Dict[str, int]:
+    """
+    Merges {mention_id: (keywords, themes)} into the day's counters, skipping mentions
+    that an earlier run already counted.
+    """
+    claimed = claim_new_mentions(database, company_id, mention_terms.keys(), date)
+    keyword_counts: Counter = Counter()
+    theme_counts: Counter = Counter()
+    for mention_id in claimed:
+        keywords, themes = mention_terms[mention_id]
+        keyword_counts.update(keywords)
+        theme_counts.update(themes)
+    for kind, counts in (('keyword', keyword_counts), ('theme', theme_counts)):
+        ops = _inc_ops(kind, company_id, date, counts)
+        if ops:
+            database[TERM_COLLECTIONS[kind]].bulk_write(ops, ordered=False)
+    return {
+        'mentions': len(claimed),
+        'skipped': len(mention_terms) - len(claimed),
+        'keywords': len(keyword_counts),
+        'themes': len(theme_counts),
+    }
+
+
+def window_bounds(days: int, end_date: Optional[str] = None) -> Tuple[str, str]:
+    """Returns (start, end) 'YYYY-MM-DD' strings covering the last `days` days up to end_date."""
+    if days is None or days <= 0:
+        raise ValueError(f"window must be at least 1 day, got {days}")
+    end = datetime.strptime(end_date, '%Y-%m-%d') if end_date else datetime.now()
+    start = (end - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+    return start, end.strftime('%Y-%m-%d')
+
+
+def top_terms(database, company_id: str, kind: str = 'keyword', start_date: Optional[str] = None, end_date: Optional[str] = None, limit: int = 15) -> List[Dict[str, Any]]:
+    """
+    Top `limit` keywords or themes for a company between two dates (inclusive).
+    """
+    match: Dict[str, Any] = {"company_id": company_id}
+    date_range: Dict[str, str] = {}
+    if start_date:
+        date_range["$gte"] = start_date
+    if end_date:
+        date_range["$lte"] = end_date
+    if date_range:
+        match["date"] = date_range
+    pipeline = [
+        {"$match": match},
+        {"$group": {"_id": f"${kind}", "count": {"$sum": "$count"}}},
+        {"$sort": {"count": DESCENDING, "_id": ASCENDING}},
+        {"$limit": limit},
+    ]
+    return [{kind: d["_id"], "count": d["count"]} for d in database[TERM_COLLECTIONS[kind]].aggregate(pipeline)]
+
+
+def classify_trend(current: int, previous: int, growth_threshold: float = 0.25, min_count: int = 2) -> Tuple[str, Optional[float]]:
+    """
+    'new' when a keyword had no mentions in the previous window, otherwise 'rising',
+    'falling' or 'stable' by relative change. Changes below `min_count` mentions are
+    treated as noise.
+    """
+    if previous == 0:
+        return ('new' if current > 0 else 'stable'), None
+    growth = (current - previous) / previous
+    if abs(current - previous) < min_count:
+        return 'stable', round(growth, 4)
+    if growth >= growth_threshold:
+        return 'rising', round(growth, 4)
+    if growth <= -growth_threshold:
+        return 'falling', round(growth, 4)
+    return 'stable', round(growth, 4)
+
+
+def keyword_trends(database, company_id: str, window_days: int = 7, end_date: Optional[str] = None, limit: int = 20, growth_threshold: float = 0.25, min_count: int = 2) -> Dict[str, Any]:
+    """
+    Compares keyword counts in the last `window_days` days with the window before it.
+
+    Only the 2 * window_days daily buckets are read through the (company_id, date) index and
+    summed per keyword in one $group, so the cost depends on the window, not on how much
+    history has been stored. The top `limit` keywords by max(current, previous) are returned.
+    """
+    current_start, end = window_bounds(window_days, end_date)
+    previous_start, previous_end = window_bounds(window_days, (datetime.strptime(current_start, '%Y-%m-%d') - timedelta(days=1)).strftime('%Y-%m-%d'))
+    pipeline = [
+        {"$match": {"company_id": company_id, "date": {"$gte": previous_start, "$lte": end}}},
+        {"$group": {
+            "_id": "$keyword",
+            "current": {"$sum": {"$cond": [{"$gte": ["$date", current_start]}, "$count", 0]}},
+            "previous": {"$sum": {"$cond": [{"$lt": ["$date", current_start]}, "$count", 0]}},
+        }},
+        # Ranked by the larger window, so keywords that dropped to zero still show up as falling
+        {"$addFields": {"volume": {"$max": ["$current", "$previous"]}}},
+        {"$sort": {"volume": DESCENDING, "current": DESCENDING, "_id": ASCENDING}},
+        {"$limit": limit},
+    ]
+    rows = list(database[TERM_COLLECTIONS['keyword']].aggregate(pipeline))
+    peak = max((r["current"] for r in rows), default=0)
+    trends = []
+    for r in rows:
+        trend, growth = classify_trend(r["current"], r["previous"], growth_threshold, min_count)
+        trends.append({
+            "keyword": r["_id"],
+            "count": r["current"],
+            "previous_count": r["previous"],
+            "growth": growth,
+            "trend": trend,
+            "intensity": round(100 * r["current"] / peak) if peak else 0,
+        })
+    return {
+        "window_days": window_days,
+        "current": {"start": current_start, "end": end},
+        "previous": {"start": previous_start, "end": previous_end},
+        "keywords": trends,
+    }
@@ -3,159 +3,493 @@
 import pandas as pd
 from datetime import datetime
 import config
-from scrapers.wikipedia_s import get_company_profile
-from scrapers import new_api_s, reddit_s, twitter_s
+from scrapers import new_api_s, profile_cache, reddit_s, scrape_cursors, twitter_s
+from scrapers.fanout import SourceStream, SourceTask
 from processors import data_processor
+from processors import near_dup
+from processors.near_dup import NearDuplicateIndex
+from processors import entity_index, keyword_store, prefilter
+from processors.sentiment_labels import label_probabilities
 import argparse
-from typing import Dict, Any, List
+import hashlib
+from typing import Dict, Any, List, Optional
+
+from pymongo import UpdateOne
 
 import db
 
+# Collections this pipeline writes get their indexes with the core ones in db.ensure_indexes
+db.register_indexes(keyword_store.ensure_indexes, entity_index.ensure_indexes, scrape_cursors.ensure_indexes, near_dup.ensure_indexes,
+                    prefilter.ensure_indexes)
+
+def make_mention_id(company_id: str, source: str, row: Dict[str, Any]) -> str:
+    """
+    Stable id for a mention, derived from the same (company_id, source, url) triple as the
+    unique index in 'mentions'; falls back to the post id or text when there is no URL.
+    """
+    ref = row.get('url') or row.get('id') or row.get('title') or row.get('text') or ''
+    return hashlib.sha1(f"{company_id}|{source}|{ref}".encode('utf-8')).hexdigest()[:16]
+
+def store_mention_sentiments(company_id: str, mention_ids: List[str], results: List[Dict[str, Any]]) -> None:
+    """
+    Writes each mention's label, confidence and word attributions onto its document in 'mentions'.
+    """
+    m_col = db.get_collection("mentions")
+    if m_col is None:
+        return
+    ops = []
+    for mention_id, result in zip(mention_ids, results):
+        fields: Dict[str, Any] = {"sentiment": result['label']}
+        probabilities = result.get('probabilities')
+        if probabilities:
+            label_probs = label_probabilities(probabilities)
+            fields["sentiment_confidence"] = round(label_probs[result['label']], 4)
+            fields["sentiment_probabilities"] = label_probs
+        elif result.get('confidence') is not None:
+            fields["sentiment_confidence"] = result['confidence']
+        if result.get('attributions') is not None:
+            fields["attributions"] = result['attributions']
+        ops.append(UpdateOne({"company_id": company_id, "mention_id": mention_id}, {"$set": fields}))
+    if ops:
+        m_col.bulk_write(ops, ordered=False)
+
+
+# Column holding each source's high-water mark, stored as the cursor field of the same name
+CURSOR_COLUMNS = {'news': 'published_at', 'reddit': 'created_utc'}
+
+
+def load_cursors(company_id: str) -> Dict[str, Any]:
+    """Returns {'news': {'since': ...}, 'reddit': {'since': ...}} scraper kwargs from the stored cursors."""
+    since: Dict[str, Any] = {name: {} for name in CURSOR_COLUMNS}
+    if not (config.SCRAPE_INCREMENTAL and db.is_enabled()):
+        return since
+    for name, column in CURSOR_COLUMNS.items():
+        try:
+            cursor = scrape_cursors.get_cursor(db.get_db(), company_id, name)
+        except Exception as e:
+            print(f"Mongo: failed to read {name} cursor: {e}")
+            cursor = None
+        if cursor and cursor.get(column) is not None:
+            since[name] = {'since': cursor[column]}
+    return since
+
+
+def save_company_profile(company_id: str, company_name: str, profile_df: pd.DataFrame) -> None:
+    """
+    Writes a freshly downloaded Wikipedia profile to 'company_profiles'.
+    """
+    print(f"Wikipedia profile: {profile_df.attrs.get('cache', profile_cache.CHANGED)}")
+    # Fresh, revalidated or stale profiles are already stored as they are
+    if profile_df.empty or profile_df.attrs.get('cache', profile_cache.CHANGED) != profile_cache.CHANGED:
+        return
+    if not db.is_enabled():
+        print("Warning: MongoDB is not configured; company profile not saved.")
+        return
+    try:
+        profiles = db.get_collection("company_profiles")
+        record: Dict[str, Any] = {**profile_df.iloc[0].to_dict(), "company_id": company_id}
+        profiles.update_one({"company_id": company_id}, {"$set": record}, upsert=True)
+        # Also update display name if available
+        try:
+            companies = db.get_collection("companies")
+            companies.update_one({"company_id": company_id}, {"$set": {"Name": profile_df.iloc[0].get('Name', company_name)}})
+        except Exception:
+            pass
+    except Exception as e:
+        print(f"Mongo: failed to upsert company profile: {e}")
+
+
+def store_mentions(company_id: str, name: str, df: pd.DataFrame) -> None:
+    """
+    Inserts one page of a source's mentions into 'mentions' (or the legacy per-source collection).
+    """
+    if not db.is_enabled():
+        print(f"Warning: MongoDB is not configured; {name} mentions not saved.")
+        return
+    try:
+        # Prefer consolidated collection
+        m_col = db.get_collection("mentions")
+        col = m_col if m_col is not None else db.get_collection(f"{name}_mentions")
+        docs: List[Dict[str, Any]] = []
+        for _, row in df.iterrows():
+            doc = row.to_dict()
+            doc["company_id"] = company_id
+            if m_col is not None:
+                doc["source"] = name  # 'news' | 'reddit' | 'twitter'
+            docs.append(doc)
+        if docs:
+            # Insert ignoring duplicates where unique index exists
+            try:
+                col.insert_many(docs, ordered=False)
+            except Exception:
+                # Some may be duplicates; continue silently
+                pass
+            if m_col is not None:
+                # Duplicates stored by earlier runs may predate mention_id
+                backfill = [UpdateOne({"company_id": company_id, "source": name, "url": d["url"], "mention_id": {"$exists": False}},
+                                      {"$set": {"mention_id": d["mention_id"]}}) for d in docs if d.get("url")]
+                if backfill:
+                    col.bulk_write(backfill, ordered=False)
+    except Exception as e:
+        print(f"Mongo: failed to insert {name} mentions: {e}")
+
+
+def prefilter_mentions(company_id: str, name: str, df: pd.DataFrame, relevance_filter: prefilter.RelevanceFilter):
+    """
+    Splits one page into relevant English mentions and the rest, judged on title and text
+    together. Comments are judged on their own text: their title is the post's, which
+    would let every reply to a relevant post through. Rejected mentions are kept in
+    'quarantined_mentions' unless PREFILTER_ACTION is 'drop'. Returns (kept rows, verdicts
+    for every row).
+    """
+    parts = [df[c].fillna('').astype(str) for c in ('title', 'text') if c in df.columns]
+    texts = parts[0].str.cat(parts[1:], sep=' ') if parts else pd.Series([''] * len(df), index=df.index)
+    if 'type' in df.columns and 'text' in df.columns:
+        texts = texts.where(df['type'] != 'comment', df['text'].fillna('').astype(str))
+    verdicts = relevance_filter.apply(texts.tolist())
+    rejected = verdicts['reason'].notna().to_numpy()
+    if rejected.any() and config.PREFILTER_ACTION == 'quarantine' and db.is_enabled():
+        try:
+            docs = []
+            for row, verdict in zip(df[rejected].to_dict('records'), verdicts[rejected].to_dict('records')):
+                docs.append({**row, "company_id": company_id, "source": name, "filter_reason": verdict['reason'],
+                             "language_score": verdict['language_score'], "relevance": verdict['relevance'],
+                             "quarantined_at": datetime.utcnow()})
+            db.get_collection(prefilter.QUARANTINE_COLLECTION).insert_many(docs, ordered=False)
+        except Exception as e:
+            # Mentions quarantined by an earlier run are duplicates here
+            if "duplicate key" not in str(e):
+                print(f"Mongo: failed to quarantine {name} mentions: {e}")
+    return df[~rejected], verdicts
+
+
+def mention_texts(name: str, df: pd.DataFrame) -> pd.DataFrame:
+    """(mention_id, text, source) rows to analyze; news is analyzed on its headline."""
+    column = 'title' if name == 'news' else 'text'
+    if column not in df.columns:
+        return pd.DataFrame(columns=['mention_id', 'text', 'source'])
+    return df[['mention_id', column]].rename(columns={column: 'text'}).assign(source=name).dropna(subset=['text'])
+
+
+def analyze_mentions(company_id: str, today_str: str, text_df: pd.DataFrame):
+    """
+    Extracts keywords, themes and entities and scores sentiment for a batch of mentions,
+    storing the per-mention results. Returns (results, tiers) from score_mentions.
+    """
+    mention_terms = data_processor.extract_mention_terms(text_df, 'text')
+
+    if db.is_enabled():
+        try:
+            merged = keyword_store.record_mention_terms(db.get_db(), company_id, today_str, dict(zip(text_df['mention_id'], mention_terms)))
+            print(f"Merged keywords/themes from {merged['mentions']} new mentions ({merged['skipped']} already counted).")
+        except Exception as e:
+            print(f"Mongo: failed to merge keyword/theme counts: {e}")
+        try:
+            indexed = entity_index.index_mentions(db.get_db(), company_id, today_str,
+                                                  {mid: keywords for mid, (keywords, _) in zip(text_df['mention_id'], mention_terms)},
+                                                  dict(zip(text_df['mention_id'], text_df['source'])))
+            print(f"Indexed entities for {indexed['mentions']} mentions ({indexed['new_postings']} new postings).")
+        except Exception as e:
+            print(f"Mongo: failed to index mention entities: {e}")
+
+    results, tiers = data_processor.score_mentions(text_df, 'text', with_attributions=config.SENTIMENT_STORE_ATTRIBUTIONS)
+    if db.is_enabled():
+        try:
+            store_mention_sentiments(company_id, text_df['mention_id'].tolist(), results)
+        except Exception as e:
+            print(f"Mongo: failed to store per-mention sentiment: {e}")
+    return results, tiers
+
+
+def stored_results(company_id: str, mention_ids) -> Dict[str, Dict[str, Any]]:
+    """Sentiment already stored for earlier mentions, as score_mentions-style results."""
+    m_col = db.get_collection("mentions")
+    if m_col is None or not mention_ids:
+        return {}
+    try:
+        docs = m_col.find({"company_id": company_id, "mention_id": {"$in": list(mention_ids)}, "sentiment": {"$exists": True}},
+                          {"_id": 0, "mention_id": 1, "sentiment": 1, "sentiment_confidence": 1})
+        return {d["mention_id"]: {'label': d["sentiment"], 'confidence': d.get("sentiment_confidence")} for d in docs}
+    except Exception as e:
+        print(f"Mongo: failed to load representative labels: {e}")
+        return {}
+
+
+def stored_sentiment_totals(company_id: str) -> Optional[Dict[str, int]]:
+    """
+    Positive/neutral/negative counts over every mention of the company stored with a label,
+    including earlier runs' and near-duplicates that took their representative's label.
+    None when they cannot be read.
+    """
+    m_col = db.get_collection("mentions")
+    if m_col is None:
+        return None
+    totals = {"positive": 0, "neutral": 0, "negative": 0}
+    for group in m_col.aggregate([
+        {"$match": {"company_id": company_id, "sentiment": {"$in": list(totals)}}},
+        {"$group": {"_id": "$sentiment", "count": {"$sum": 1}}},
+    ]):
+        totals[group["_id"]] = int(group["count"])
+    return totals
+
+
+def store_duplicates(company_id: str, duplicate_of: Dict[str, str]) -> None:
+    """Links each near-duplicate to its representative, and counts duplicates on the representative."""
+    m_col = db.get_collection("mentions")
+    if m_col is None or not duplicate_of:
+        return
+    ops = [UpdateOne({"company_id": company_id, "mention_id": m}, {"$set": {"duplicate_of": rep}}) for m, rep in duplicate_of.items()]
+    joined: Dict[str, int] = {}
+    for rep in duplicate_of.values():
+        joined[rep] = joined.get(rep, 0) + 1
+    ops.extend(UpdateOne({"company_id": company_id, "mention_id": rep}, {"$inc": {"duplicates": n}}) for rep, n in joined.items())
+    m_col.bulk_write(ops, ordered=False)
+
+
+def analyze_page(company_id: str, today_str: str, text_df: pd.DataFrame, dedupe: Optional[NearDuplicateIndex]):
+    """
+    Runs analyze_mentions on one representative per near-duplicate cluster and gives every
+    other mention its representative's label. Returns (results for every row, tiers), so
+    run totals still count each duplicate.
+    """
+    if dedupe is None:
+        return analyze_mentions(company_id, today_str, text_df)
+    representative = dedupe.assign(company_id, text_df['mention_id'].tolist(), text_df['text'].tolist())
+    is_rep = text_df['mention_id'].map(lambda m: representative[m] == m)
+
+    in_page = set(text_df.loc[is_rep, 'mention_id'])
+    historical = {representative[m] for m in text_df.loc[~is_rep, 'mention_id']} - in_page
+    results_by_id = stored_results(company_id, historical)
+    tiers = None
+    # A duplicate whose earlier representative was never scored is scored itself
+    known = in_page | set(results_by_id)
+    to_score = is_rep | ~text_df['mention_id'].map(lambda m: representative[m] in known)
+    if to_score.any():
+        scored_df = text_df[to_score]
+        scored, tiers = analyze_mentions(company_id, today_str, scored_df)
+        results_by_id.update(zip(scored_df['mention_id'], scored))
+
+    duplicates = {m: representative[m] for m in text_df.loc[~to_score, 'mention_id']}
+    if duplicates:
+        print(f"Near-duplicates: {len(duplicates)} of {len(text_df)} mentions reuse a representative's label.")
+        propagated = {m: {k: v for k, v in results_by_id[rep].items() if k != 'attributions'} for m, rep in duplicates.items()}
+        if db.is_enabled():
+            try:
+                store_mention_sentiments(company_id, list(propagated), list(propagated.values()))
+                store_duplicates(company_id, duplicates)
+            except Exception as e:
+                print(f"Mongo: failed to store near-duplicate labels: {e}")
+        results_by_id.update(propagated)
+    return [results_by_id[m] for m in text_df['mention_id']], tiers
+
+
+def merge_tiers(total, tiers):
+    """Adds one batch's cascade tier counts to the running total."""
+    if tiers is None:
+        return total
+    if total is None:
+        return dict(tiers)
+    total = {**total, 'first_stage': total['first_stage'] + tiers['first_stage'], 'model': total['model'] + tiers['model']}
+    scored = total['first_stage'] + total['model']
+    total['escalation_rate'] = total['model'] / scored if scored else 0.0
+    return total
+
+
 def run_analysis(company_name: str, keywords_list: list):
     """
     Main function to scrape all sources for a given company and save the data.
+
+    Sources stream pages concurrently; each page is stored and analyzed as soon as it
+    arrives, while later pages are still downloading.
     """
     print(f"--- Starting analysis for: {company_name} at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ---")
     
     company_id = company_name.replace(" ", "_").lower()
+    today_str = datetime.now().strftime('%Y-%m-%d')
 
     # Ensure DB indexes if Mongo is enabled
     if db.is_enabled():
         db.ensure_indexes()
-
-    # --- 1. Scrape Data ---
-    print("Scraping Wikipedia for company profile...")
-    profile_df = get_company_profile(company_name, config.WIKI_USER_AGENT)
-    
-    # --- 2. Save/Update Central Company Profile in MongoDB ---
-    if db.is_enabled():
         try:
             # Always upsert a minimal company row so it appears in lists
             companies_col = db.get_collection("companies")
             companies_col.update_one({"company_id": company_id}, {"$set": {"company_id": company_id, "Name": company_name}}, upsert=True)
         except Exception as e:
             print(f"Mongo: failed to upsert company entry: {e}")
-    if not profile_df.empty:
-        if db.is_enabled():
-            try:
-                profiles = db.get_collection("company_profiles")
-                record: Dict[str, Any] = {**profile_df.iloc[0].to_dict(), "company_id": company_id}
-                profiles.update_one({"company_id": company_id}, {"$set": record}, upsert=True)
-                # Also update display name if available
-                try:
-                    companies = db.get_collection("companies")
-                    companies.update_one({"company_id": company_id}, {"$set": {"Name": profile_df.iloc[0].get('Name', company_name)}})
-                except Exception:
-                    pass
-            except Exception as e:
-                print(f"Mongo: failed to upsert company profile: {e}")
-        else:
-            print("Warning: MongoDB is not configured; company profile not saved.")
 
-    # --- 3. Scrape News, Reddit, and Twitter ---
+    # --- 1. Scrape Data ---
+    # All sources run concurrently, each against its own deadline
+    print("Scraping Wikipedia, news, Reddit and Twitter...")
     print(f"Using keywords: {keywords_list}")
-    news_df = new_api_s.get_news_mentions(company_name, keywords_list, config.NEWS_API_KEY, config.NEWS_LIMIT)
-    reddit_df = reddit_s.get_reddit_mentions(company_name, keywords_list, config.REDDIT_CLIENT_ID, config.REDDIT_CLIENT_SECRET, config.REDDIT_USER_AGENT, config.REDDIT_LIMIT)
-    twitter_df = twitter_s.get_twitter_mentions(company_name, keywords_list, config.TWITTER_LIMIT)
+    scrape_started = datetime.utcnow()
+    since = load_cursors(company_id)
+    for name, kwargs in since.items():
+        if kwargs:
+            print(f"  {name}: fetching items newer than {kwargs['since']}")
+    reddit_budget = config.REDDIT_CURSOR_MAX_ITEMS if since['reddit'] else config.REDDIT_LIMIT
+    reddit_comments = {
+        'submissions': config.REDDIT_COMMENT_SUBMISSIONS,
+        'per_submission': config.REDDIT_COMMENTS_PER_SUBMISSION,
+        'max_depth': config.REDDIT_COMMENT_DEPTH,
+        'more_limit': config.REDDIT_COMMENT_MORE_LIMIT,
+        'workers': config.REDDIT_COMMENT_WORKERS,
+    }
+    # Filled in by the query planner with per-query and per-keyword yield
+    query_reports: Dict[str, Dict[str, Any]] = {'news': {}, 'reddit': {}}
+    stream = SourceStream([
+        SourceTask('wikipedia', profile_cache.get_company_profile, (db.get_db() if db.is_enabled() else None, company_id, company_name, config.WIKI_USER_AGENT, config.WIKI_PROFILE_TTL_HOURS * 3600), config.WIKIPEDIA_TIMEOUT_SECONDS),
+        SourceTask('news', new_api_s.iter_news_pages, (company_name, keywords_list, config.NEWS_API_KEY, config.NEWS_LIMIT), config.NEWS_TIMEOUT_SECONDS, paged=True, kwargs={**since['news'], 'report': query_reports['news']}),
+        SourceTask('reddit', reddit_s.iter_reddit_pages, (company_name, keywords_list, config.REDDIT_CLIENT_ID, config.REDDIT_CLIENT_SECRET, config.REDDIT_USER_AGENT, reddit_budget), config.REDDIT_TIMEOUT_SECONDS, paged=True, kwargs={**since['reddit'], 'report': query_reports['reddit'], 'comments': reddit_comments}),
+        SourceTask('twitter', twitter_s.get_twitter_mentions, (company_name, keywords_list, config.TWITTER_LIMIT), config.TWITTER_TIMEOUT_SECONDS),
+    ])
 
-    # --- 4. Store Mentions in MongoDB ---
-    today_str = datetime.now().strftime('%Y-%m-%d')
-    for df, name in [(news_df, "news"), (reddit_df, "reddit"), (twitter_df, "twitter")]:
-        if not df.empty:
-            # Write mentions to MongoDB (consolidated 'mentions' collection)
-            if db.is_enabled():
-                try:
-                    # Prefer consolidated collection
-                    m_col = db.get_collection("mentions")
-                    col = m_col if m_col is not None else db.get_collection(f"{name}_mentions")
-                    docs: List[Dict[str, Any]] = []
-                    for _, row in df.iterrows():
-                        doc = row.to_dict()
-                        doc["company_id"] = company_id
-                        if m_col is not None:
-                            doc["source"] = name  # 'news' | 'reddit' | 'twitter'
-                        docs.append(doc)
-                    if docs:
-                        # Insert ignoring duplicates where unique index exists
-                        try:
-                            col.insert_many(docs, ordered=False)
-                        except Exception:
-                            # Some may be duplicates; continue silently
-                            pass
-                except Exception as e:
-                    print(f"Mongo: failed to insert {name} mentions: {e}")
-            else:
-                print(f"Warning: MongoDB is not configured; {name} mentions not saved.")
-
-    # --- 5. Process Data and Perform Sentiment Analysis ---
-    text_sources = []
-    if not news_df.empty and 'title' in news_df.columns:
-        text_sources.append(news_df['title'])
-    if not reddit_df.empty and 'text' in reddit_df.columns:
-        text_sources.append(reddit_df['text'])
-    if not twitter_df.empty and 'text' in twitter_df.columns:
-        text_sources.append(twitter_df['text'])
-
-    if text_sources:
-        all_text = pd.concat(text_sources, ignore_index=True).dropna()
-        if not all_text.empty:
-            all_text_df = pd.DataFrame(all_text, columns=['text'])
-            
-            print("Extracting keywords and themes...")
-            keywords_df, themes_df = data_processor.extract_keywords_and_themes(all_text_df, 'text')
-            print("Extracted keywords and themes.")
-
-            if db.is_enabled():
-                try:
-                    k_col = db.get_collection("keywords")
-                    k_docs = []
-                    for _, row in keywords_df.iterrows():
-                        rec = row.to_dict()
-                        rec["company_id"] = company_id
-                        rec["date"] = today_str
-                        k_docs.append(rec)
-                    if k_docs:
-                        k_col.insert_many(k_docs, ordered=False)
-                except Exception as e:
-                    print(f"Mongo: failed to insert keywords: {e}")
-                try:
-                    t_col = db.get_collection("themes")
-                    t_docs = []
-                    for _, row in themes_df.iterrows():
-                        rec = row.to_dict()
-                        rec["company_id"] = company_id
-                        rec["date"] = today_str
-                        t_docs.append(rec)
-                    if t_docs:
-                        t_col.insert_many(t_docs, ordered=False)
-                except Exception as e:
-                    print(f"Mongo: failed to insert themes: {e}")
-
-            print("Performing sentiment analysis...")
-            sentiment_df = data_processor.analyze_sentiment(all_text_df, 'text')
-            print("Computed sentiment analysis results.")
-            if db.is_enabled():
-                try:
-                    s_col = db.get_collection("sentiments")
-                    total = {"positive": 0, "neutral": 0, "negative": 0}
-                    for _, row in sentiment_df.iterrows():
-                        for k in total.keys():
-                            if k in row and pd.notna(row[k]):
-                                try:
-                                    total[k] += int(float(row[k]))
-                                except Exception:
-                                    pass
-                    s_col.insert_one({"company_id": company_id, "date": today_str, **total})
-                except Exception as e:
-                    print(f"Mongo: failed to insert sentiments: {e}")
+    # --- 2. Store and Analyze Each Page as It Arrives ---
+    dedupe = None
+    if config.NEAR_DUP_ENABLED:
+        dedupe = NearDuplicateIndex(db.get_collection("near_dup_index") if db.is_enabled() else None,
+                                    config.NEAR_DUP_THRESHOLD, config.NEAR_DUP_SHINGLE_SIZE)
+    relevance_filter = None
+    if config.PREFILTER_ENABLED:
+        relevance_filter = prefilter.RelevanceFilter(company_name, keywords_list, config.PREFILTER_MIN_RELEVANCE,
+                                                     config.PREFILTER_MIN_ENGLISH, config.PREFILTER_PROXIMITY_WORDS)
+    filter_stats: Dict[str, Dict[str, int]] = {}
+    seen_ids = set()
+    # Pages of each source's planned queries that were processed; Reddit comment pages follow them
+    query_pages = {name: 0 for name in query_reports}
+    newest: Dict[str, Any] = {}
+    results: List[Dict[str, Any]] = []
+    tiers = None
+    for name, payload in stream:
+        if name == 'wikipedia':
+            if payload is not None:
+                save_company_profile(company_id, company_name, payload)
+            continue
+        if name in query_pages and not (payload and payload[0].get('type') == 'comment'):
+            query_pages[name] += 1
+        df = payload if isinstance(payload, pd.DataFrame) else pd.DataFrame(payload)
+        if df.empty:
+            continue
+        df['mention_id'] = [make_mention_id(company_id, name, row) for row in df.to_dict('records')]
+        df = df[~df['mention_id'].isin(seen_ids)].drop_duplicates('mention_id')
+        seen_ids.update(df['mention_id'])
+        if df.empty:
+            continue
+        print(f"{name}: {len(df)} new mentions in this page.")
+
+        column = CURSOR_COLUMNS.get(name)
+        # The Reddit cursor tracks posts; comments on older posts can be much newer
+        cursor_rows = df[df['type'] != 'comment'] if 'type' in df.columns else df
+        if column in cursor_rows.columns and pd.notna(cursor_rows[column].max()):
+            value = cursor_rows[column].max()
+            value = value.item() if hasattr(value, 'item') else value
+            newest[name] = value if name not in newest else max(newest[name], value)
+
+        if relevance_filter is not None:
+            df, verdicts = prefilter_mentions(company_id, name, df, relevance_filter)
+            filter_stats[name] = prefilter.merge_stats(filter_stats.get(name), verdicts)
+            if df.empty:
+                continue
+        store_mentions(company_id, name, df)
+        text_df = mention_texts(name, df)
+        if not text_df.empty:
+            page_results, page_tiers = analyze_page(company_id, today_str, text_df, dedupe)
+            results.extend(page_results)
+            tiers = merge_tiers(tiers, page_tiers)
+
+    scrape_stats = stream.stats
+    # A cursor may move once every page of its source's queries was processed, even if the
+    # source then timed out expanding Reddit comments, unless some results were never read
+    cursor_ready: Dict[str, bool] = {}
+    for name, report in query_reports.items():
+        read_all = bool(report.get('complete')) and query_pages[name] == report.get('pages')
+        # Some of its queries failed: their terms were not searched down to the cursor
+        if report.get('failed'):
+            gap = 'partial'
+        # Stopped on its budget before reaching the cursor: the items in between were never read
+        elif report.get('truncated') and since[name]:
+            gap = 'truncated'
+        else:
+            gap = None
+        cursor_ready[name] = read_all and gap is None
+        if gap and scrape_stats[name]['status'] == 'ok':
+            scrape_stats[name]['status'] = gap
+    for name, stats in scrape_stats.items():
+        print(f"  {name}: {stats['status']} in {stats['seconds']}s, {stats['items']} items in {stats['pages']} pages" + (f" ({stats['error']})" if stats.get('error') else ""))
+    for name, counts in filter_stats.items():
+        scrape_stats[name]['prefilter'] = {**counts, 'kept_rate': round(counts['kept'] / counts['checked'], 3) if counts['checked'] else None}
+        print(f"  {name}: prefilter kept {counts['kept']} of {counts['checked']} ({counts['non_english']} non-English, {counts['irrelevant']} off-topic)")
+    for name, report in query_reports.items():
+        if report:
+            # Stored as lists: queries and keywords may contain '.' or '$', which field names cannot
+            scrape_stats[name]['queries'] = [{'query': q, **stats} for q, stats in report.get('queries', {}).items()]
+            scrape_stats[name]['terms'] = [{'term': t, 'matches': n} for t, n in report.get('terms', {}).items()]
+            print(f"  {name}: {len(report.get('queries', {}))} queries, yield {[(q['items'], q['new']) for q in report.get('queries', {}).values()]}")
+            unmatched = [t for t, n in report.get('terms', {}).items() if n == 0]
+            if unmatched and scrape_stats[name]['items']:
+                print(f"  {name}: no mentions matched {unmatched}; consider pruning these keywords.")
+    if db.is_enabled():
+        try:
+            db.get_collection("scrape_runs").insert_one({"company_id": company_id, "started_at": scrape_started, "sources": scrape_stats})
+        except Exception as e:
+            print(f"Mongo: failed to record scrape stats: {e}")
+        if config.SCRAPE_INCREMENTAL:
+            for name, value in newest.items():
+                if cursor_ready.get(name):
+                    try:
+                        scrape_cursors.advance_cursor(db.get_db(), company_id, name, {CURSOR_COLUMNS[name]: value})
+                    except Exception as e:
+                        print(f"Mongo: failed to advance {name} cursor: {e}")
+
+    # --- 3. Store the Company's Sentiment Summary ---
+    # An incremental run only scores what is new since the cursors, so the summary is
+    # counted over all stored mentions; this run's own counts are kept alongside
+    if results:
+        sentiment_df = data_processor.sentiment_counts(results, tiers)
+        print("Computed sentiment analysis results.")
+        if db.is_enabled():
+            try:
+                s_col = db.get_collection("sentiments")
+                run = {k: int(sentiment_df.iloc[0][k]) for k in ("positive", "neutral", "negative")}
+                total = stored_sentiment_totals(company_id)
+                if total is None:
+                    raise RuntimeError("stored mentions are unavailable")
+                s_doc = {"company_id": company_id, "date": today_str, **total, "run": run}
+                if sentiment_df.attrs.get('tiers'):
+                    s_doc["tiers"] = sentiment_df.attrs['tiers']
+                s_col.insert_one(s_doc)
+            except Exception as e:
+                print(f"Mongo: failed to insert sentiments: {e}")
         
     print(f"--- Analysis for {company_name} complete. ---\n")
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="Run brand reputation analysis for a company.")
-    parser.add_argument("--company", type=str, required=True, help="The name of the company to analyze.")
+    parser.add_argument("--company", type=str, help="The name of the company to analyze.")
     parser.add_argument("--keywords", type=str, default="", help="Comma-separated keywords.")
+    parser.add_argument("--check-models", action="store_true", help="Health check: load spaCy and the sentiment model, score one text, report load times and exit non-zero on failure.")
+    parser.add_argument("--reset-cursors", action="store_true", help="Forget scraping cursors (for --company, or all companies) so the next run backfills, then exit.")
+    parser.add_argument("--source", type=str, choices=sorted(CURSOR_COLUMNS), help="Limit --reset-cursors to one source.")
     args = parser.parse_args()
+
+    if args.reset_cursors:
+        if not db.is_enabled():
+            parser.error("--reset-cursors needs MongoDB")
+        company_id = args.company.replace(" ", "_").lower() if args.company else None
+        deleted = scrape_cursors.reset_cursors(db.get_db(), company_id, args.source)
+        print(f"Reset {deleted} scraping cursor(s).")
+        raise SystemExit(0)
+
+    if args.check_models:
+        try:
+            report = data_processor.preload()
+        except Exception as e:
+            print(f"Model check failed: {e}")
+            raise SystemExit(1)
+        for name, value in report.items():
+            print(f"{name}: {value}")
+        raise SystemExit(0)
+    if not args.company:
+        parser.error("--company is required unless --check-models or --reset-cursors is given")
     
     keyword_list = [k.strip() for k in args.keywords.split(',') if k.strip()]
     run_analysis(args.company, keyword_list)
\ No newline at end of file
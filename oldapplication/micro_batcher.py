@@ -0,0 +1,132 @@
+# processors/micro_batcher.py
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import config
+from .model_registry import get_sentiment_model
+from .sentiment_cache import get_sentiment_cache
+from .sentiment_labels import label_probabilities
+
+
+class MicroBatcher:
+    """
+    Collects concurrent scoring requests inside the API process and runs them as one
+    padded batch on the shared sentiment model.
+
+    A batch is closed after `max_wait_ms` or once `max_batch_size` texts are waiting,
+    then scored in a dedicated worker thread so the event loop keeps accepting requests.
+    While one batch runs, the next one fills up.
+    """
+
+    def __init__(self, max_batch_size: int = 32, max_wait_ms: float = 10.0):
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sentiment-batch")
+        self.batches = 0
+        self.items = 0
+
+    def start(self) -> None:
+        if self._worker is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        # Fail anything still waiting instead of leaving callers hanging
+        while self._queue is not None and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Scoring service stopped"))
+        self._executor.shutdown(wait=False)
+
+    async def score(self, text: str) -> Dict[str, Any]:
+        return (await self.score_many([text]))[0]
+
+    async def score_many(self, texts: List[str]) -> List[Dict[str, Any]]:
+        if self._worker is None:
+            self.start()
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            await self._queue.put((text, future))
+            futures.append(future)
+        return list(await asyncio.gather(*futures))
+
+    async def _collect(self) -> List[Any]:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait_ms / 1000.0
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            texts = [text for text, _ in batch]
+            try:
+                results = await loop.run_in_executor(self._executor, _score_texts, texts, self.max_batch_size)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            self.items += len(batch)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'running': self._worker is not None,
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'batches': self.batches,
+            'items': self.items,
+            'avg_batch_size': round(self.items / self.batches, 2) if self.batches else None,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait_ms,
+        }
+
+
+def _score_texts(texts: List[str], batch_size: int) -> List[Dict[str, Any]]:
+    model = get_sentiment_model()
+    cache = get_sentiment_cache()
+    if cache is not None:
+        results = cache.predict_batch(model, texts, batch_size=batch_size)
+    else:
+        results = model.predict_batch(texts, batch_size=batch_size)
+    scored = []
+    for r in results:
+        label_probs = label_probabilities(r['probabilities']) if r.get('probabilities') else None
+        scored.append({
+            'label': r['label'],
+            'confidence': round(label_probs[r['label']], 4) if label_probs else None,
+            'label_probabilities': label_probs,
+            'probabilities': r.get('probabilities'),
+        })
+    return scored
+
+
+def create_batcher() -> MicroBatcher:
+    return MicroBatcher(max_batch_size=config.SCORE_BATCH_MAX_ITEMS, max_wait_ms=config.SCORE_BATCH_MAX_WAIT_MS)
@@ -0,0 +1,161 @@
+# processors/model_registry.py
+
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+import config
+
+# One warm model per (model path, device, dtype) for the whole process
+_lock = threading.Lock()
+_models: Dict[Tuple[str, str, str], Any] = {}
+_load_stats: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+
+
+def _resident_memory_bytes() -> Optional[int]:
+    try:
+        import psutil
+        return psutil.Process(os.getpid()).memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        # ru_maxrss is the peak, reported in KB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except (ImportError, AttributeError):
+        return None
+
+
+def _resolve_key(model_path: Optional[str], device: Optional[str], dtype: Optional[str]) -> Tuple[str, str, str]:
+    if model_path is None and config.SENTIMENT_BACKEND == 'onnx':
+        model_path = config.SENTIMENT_ONNX_PATH
+    model_path = os.path.abspath(model_path or config.SENTIMENT_MODEL_PATH)
+    if _is_onnx(model_path):
+        return model_path, 'cpu', 'float32'
+    device = device or config.SENTIMENT_DEVICE
+    dtype = dtype or config.SENTIMENT_DTYPE
+    if dtype == 'int8':
+        # Dynamic quantization only runs on cpu, so an automatic device means cpu here
+        if device and not device.startswith('cpu'):
+            raise ValueError(f"SENTIMENT_DTYPE=int8 needs SENTIMENT_DEVICE=cpu (or unset), not {device!r}")
+        device = 'cpu'
+    if not device:
+        import torch
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+    return model_path, device, dtype
+
+
+def _is_onnx(model_path: str) -> bool:
+    return model_path.lower().endswith('.onnx')
+
+
+def get_sentiment_model(model_path: Optional[str] = None, device: Optional[str] = None, dtype: Optional[str] = None):
+    """
+    Returns the process-wide sentiment model for the given settings, loading it on first use.
+    A .onnx path (or SENTIMENT_BACKEND=onnx) selects the onnxruntime backend.
+    """
+    key = _resolve_key(model_path, device, dtype)
+    model = _models.get(key)
+    if model is not None:
+        return model
+    with _lock:
+        model = _models.get(key)
+        if model is None:
+            if _is_onnx(key[0]):
+                from .onnx_backend import OnnxSentimentModel as model_class
+            else:
+                from .sentiment import SentimentModel as model_class
+
+            rss_before = _resident_memory_bytes()
+            started = time.perf_counter()
+            model = model_class(model_path=key[0], device=key[1], dtype=key[2])
+            agreement = None
+            if key[2] == 'int8' and config.SENTIMENT_INT8_CHECK_SAMPLE:
+                model, agreement = _verify_int8(model, key)
+            load_seconds = time.perf_counter() - started
+            rss_after = _resident_memory_bytes()
+
+            _models[key] = model
+            _load_stats[key] = {
+                'backend': 'onnx' if _is_onnx(key[0]) else 'torch',
+                'model_path': key[0],
+                'device': key[1],
+                'dtype': key[2],
+                'effective_dtype': model.dtype,
+                'int8_agreement': agreement,
+                'loaded_at': datetime.utcnow().isoformat(),
+                'load_seconds': round(load_seconds, 3),
+                'rss_before_mb': _to_mb(rss_before),
+                'rss_after_mb': _to_mb(rss_after),
+                'rss_delta_mb': _to_mb(rss_after - rss_before) if rss_before is not None and rss_after is not None else None,
+            }
+            print(f"Loaded sentiment model ({key[1]}, {key[2]}) in {load_seconds:.1f}s.")
+    return model
+
+
+def _verify_int8(model, key: Tuple[str, str, str]):
+    """
+    Checks the int8 model against fp32 on the configured held-out sample and keeps
+    the fp32 model instead when label agreement is too low.
+    """
+    from .quantization import check_int8_agreement, load_sample
+    from .sentiment import SentimentModel
+
+    reference = SentimentModel(model_path=key[0], device=key[1], dtype='float32')
+    report = check_int8_agreement(load_sample(config.SENTIMENT_INT8_CHECK_SAMPLE), reference=reference, candidate=model)
+    print(f"int8 agreement {report['agreement']} on {report['samples']} texts, {report['speedup']}x faster, "
+          f"{report['fp32_size_mb']} MB -> {report['int8_size_mb']} MB.")
+    if report['agreement'] < config.SENTIMENT_INT8_MIN_AGREEMENT:
+        print(f"Warning: int8 agreement is below {config.SENTIMENT_INT8_MIN_AGREEMENT}; using the fp32 model instead.")
+        return reference, report
+    return model, report
+
+
+def warm_up(model_path: Optional[str] = None, device: Optional[str] = None, dtype: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Loads the model ahead of time and runs one dummy prediction so the first real request is fast.
+    """
+    model = get_sentiment_model(model_path, device, dtype)
+    model.predict_batch(["warm up"])
+    return _load_stats.get(_resolve_key(model_path, device, dtype), {})
+
+
+def unload(model_path: Optional[str] = None, device: Optional[str] = None, dtype: Optional[str] = None, all_models: bool = False) -> int:
+    """
+    Drops cached models so their memory can be reclaimed. Returns how many were removed.
+    """
+    with _lock:
+        if all_models:
+            keys = list(_models.keys())
+        else:
+            keys = [_resolve_key(model_path, device, dtype)]
+        removed = 0
+        for key in keys:
+            if _models.pop(key, None) is not None:
+                removed += 1
+            _load_stats.pop(key, None)
+    if removed:
+        import gc
+        gc.collect()
+    return removed
+
+
+def get_stats() -> Dict[str, Any]:
+    return {
+        'loaded': len(_models),
+        'rss_mb': _to_mb(_resident_memory_bytes()),
+        'models': list(_load_stats.values()),
+    }
+
+
+def _to_mb(value: Optional[int]) -> Optional[float]:
+    if value is None:
+        return None
+    return round(value / (1024 * 1024), 1)
@@ -0,0 +1,157 @@
+# processors/near_dup.py
+
+import hashlib
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pymongo import ASCENDING, UpdateOne
+
+import config
+from .sentiment_cache import normalize_text
+
+INDEX_COLLECTION = 'near_dup_index'
+
+# Universal hashing modulo a prime just above 2**32 keeps every product inside uint64
+_PRIME = np.uint64(4294967311)
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+_URL_RE = re.compile(r'https?://\S+|www\.\S+')
+
+
+def ensure_indexes(database) -> None:
+    """
+    Band-key lookup and per-mention uniqueness, plus a TTL index that drops clusters not
+    seen for NEAR_DUP_TTL_DAYS. A changed TTL is applied to the existing index with collMod,
+    since create_index refuses to change the options of an index that already exists.
+    """
+    collection = database[INDEX_COLLECTION]
+    collection.create_index([("company_id", ASCENDING), ("bands", ASCENDING)])
+    collection.create_index([("company_id", ASCENDING), ("mention_id", ASCENDING)], unique=True)
+    ttl_seconds = int(config.NEAR_DUP_TTL_DAYS * 86400)
+    existing = next((info for info in collection.index_information().values() if info.get('key') == [("last_seen", ASCENDING)]), None)
+    if existing is None:
+        collection.create_index([("last_seen", ASCENDING)], expireAfterSeconds=ttl_seconds)
+    elif existing.get('expireAfterSeconds') != ttl_seconds:
+        database.command('collMod', INDEX_COLLECTION, index={'keyPattern': {"last_seen": ASCENDING}, 'expireAfterSeconds': ttl_seconds})
+
+
+def shingles(text: str, size: int = 4) -> List[str]:
+    """
+    Word `size`-grams of the lower-cased text with URLs and punctuation removed. Texts
+    shorter than one shingle become a single shingle, so short duplicates still match.
+    """
+    words = _TOKEN_RE.findall(_URL_RE.sub(' ', normalize_text(text).lower()))
+    if len(words) <= size:
+        return [' '.join(words)] if words else []
+    return [' '.join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+def _hash32(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=4).digest(), 'little')
+
+
+class MinHasher:
+    """MinHash signatures with `num_perm` universal hash functions and LSH band keys over them."""
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._a = rng.randint(1, 2 ** 32 - 1, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 2 ** 32 - 1, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text_shingles: Sequence[str]) -> Optional[np.ndarray]:
+        if not text_shingles:
+            return None
+        hashes = np.fromiter((_hash32(s) for s in set(text_shingles)), dtype=np.uint64)
+        return ((np.outer(hashes, self._a) + self._b) % _PRIME).min(axis=0)
+
+    def band_keys(self, signature: np.ndarray) -> List[str]:
+        return [
+            f"{i}:{hashlib.blake2b(signature[i * self.rows:(i + 1) * self.rows].tobytes(), digest_size=8).hexdigest()}"
+            for i in range(self.bands)
+        ]
+
+    @staticmethod
+    def similarity(a: np.ndarray, b: np.ndarray) -> float:
+        """Estimated Jaccard similarity of the two shingle sets."""
+        return float(np.mean(a == b))
+
+
+class NearDuplicateIndex:
+    """
+    Clusters near-identical mentions of a company so only one representative per cluster
+    goes through NLP and sentiment scoring.
+
+    Representatives are kept per company in 'near_dup_index' (with `collection`) as their
+    MinHash signature and LSH band keys; candidates sharing a band key are confirmed
+    when their estimated Jaccard similarity reaches `threshold`. Entries expire once a
+    cluster has not been seen for NEAR_DUP_TTL_DAYS (TTL index in ensure_indexes).
+    """
+
+    def __init__(self, collection=None, threshold: float = 0.8, shingle_size: int = 4, num_perm: int = 64, bands: int = 16):
+        self.collection = collection
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.hasher = MinHasher(num_perm, bands)
+
+    def _load_candidates(self, company_id: str, keys: List[str]) -> List[Dict[str, Any]]:
+        if self.collection is None or not keys:
+            return []
+        return list(self.collection.find({"company_id": company_id, "bands": {"$in": keys}},
+                                         {"_id": 0, "mention_id": 1, "bands": 1, "signature": 1}))
+
+    def assign(self, company_id: str, mention_ids: Sequence[str], texts: Sequence[str]) -> Dict[str, str]:
+        """
+        Returns {mention_id: representative mention_id}. A mention that starts a new
+        cluster is its own representative and is added to the index; the others point at
+        an earlier mention from this batch or from a previous run.
+        """
+        signatures = [self.hasher.signature(shingles(t, self.shingle_size)) for t in texts]
+        keys = [self.hasher.band_keys(s) if s is not None else [] for s in signatures]
+
+        # Representatives by band key: stored ones first, then this batch's as they appear
+        buckets: Dict[str, List[Tuple[str, np.ndarray]]] = {}
+        for doc in self._load_candidates(company_id, sorted({k for ks in keys for k in ks})):
+            sig = np.array(doc["signature"], dtype=np.uint64)
+            for key in doc["bands"]:
+                buckets.setdefault(key, []).append((doc["mention_id"], sig))
+
+        now = datetime.utcnow()
+        assigned: Dict[str, str] = {}
+        ops = []
+        joined: Dict[str, int] = {}
+        for mention_id, sig, mention_keys in zip(mention_ids, signatures, keys):
+            if mention_id in assigned:
+                continue
+            representative = None
+            if sig is not None:
+                best = self.threshold
+                for key in mention_keys:
+                    for rep_id, rep_sig in buckets.get(key, []):
+                        sim = self.hasher.similarity(sig, rep_sig)
+                        if sim >= best:
+                            representative, best = rep_id, sim
+            if representative is None:
+                assigned[mention_id] = mention_id
+                if sig is not None:
+                    for key in mention_keys:
+                        buckets.setdefault(key, []).append((mention_id, sig))
+                    ops.append(UpdateOne({"company_id": company_id, "mention_id": mention_id},
+                                         {"$setOnInsert": {"bands": mention_keys, "signature": [int(v) for v in sig], "cluster_size": 1},
+                                          "$set": {"last_seen": now}}, upsert=True))
+            else:
+                assigned[mention_id] = representative
+                # A re-scraped representative matches its own entry: seen again, but not a new member
+                joined[representative] = joined.get(representative, 0) + (representative != mention_id)
+
+        ops.extend(UpdateOne({"company_id": company_id, "mention_id": rep_id}, {"$inc": {"cluster_size": n}, "$set": {"last_seen": now}})
+                   for rep_id, n in joined.items())
+        if self.collection is not None and ops:
+            self.collection.bulk_write(ops, ordered=False)
+        return assigned
+
@@ -4,39 +4,109 @@ import pandas as pd
 # Corrected the import statement back to the standard one
 from newsapi import NewsApiClient
 
-def get_news_mentions(company_name, keywords, api_key, limit=100):
+from .query_planner import plan_queries, run_planned_queries
+from .rate_limiter import get_limiter
+
+# Largest page NewsAPI returns
+NEWS_PAGE_SIZE = 100
+# Times a rate-limited page is requested again, after the limiter's pause, before the query fails
+NEWS_RATE_LIMIT_RETRIES = 2
+
+
+def _article_record(article):
+    return {
+        'source': article['source']['name'],
+        'title': article['title'],
+        'url': article['url'],
+        'published_at': article['publishedAt'],
+        'text': article.get('description', '') or '' # Ensure text is not None
+    }
+
+
+def _iter_query_pages(newsapi, query, budget, since=None, page_size=NEWS_PAGE_SIZE, report=None):
     """
-    Fetches news articles mentioning the company and keywords from NewsAPI.
+    Pages of article records for one NewsAPI query string. With `since`, `report['truncated']`
+    is set when the budget or NewsAPI's result cap ends paging before the cursor is reached.
+    """
+    if report is None:
+        report = {}
+    limiter = get_limiter('news')
+    # Page numbers are offsets in units of page_size, so it must stay fixed across pages
+    page_size = max(1, min(page_size, NEWS_PAGE_SIZE, budget))
+    params = {'q': query, 'language': 'en', 'page_size': page_size}
+    if since:
+        # NewsAPI's 'from' is inclusive; older duplicates are dropped below
+        params.update(sort_by='publishedAt', from_param=since)
+    else:
+        params.update(sort_by='relevancy')
+
+    read = 0
+    page = 1
+    retries = 0
+    while read < budget:
+        limiter.acquire()
+        try:
+            response = newsapi.get_everything(page=page, **params)
+        except Exception as e:
+            code = getattr(e, 'get_code', lambda: None)()
+            if code == 'rateLimited':
+                limiter.on_rate_limited()
+                if retries < NEWS_RATE_LIMIT_RETRIES:
+                    # acquire() waits out the pause before the same page is requested again
+                    retries += 1
+                    continue
+            if code == 'maximumResultsReached':
+                # The plan's result cap, not a failure: everything reachable has been read
+                report['truncated'] = bool(since)
+                return
+            raise
+        limiter.on_success()
+        retries = 0
+
+        fetched = response.get('articles', [])
+        articles = fetched[:budget - read]
+        read += len(articles)
+        records = [_article_record(a) for a in articles if not (since and a['publishedAt'] <= since)]
+        if records:
+            yield records
+        reached_cursor = len(records) < len(articles)
+        if reached_cursor or len(fetched) < page_size or read >= response.get('totalResults', 0):
+            return
+        page += 1
+    # Out of budget with newer articles possibly still unread above the cursor
+    report['truncated'] = bool(since)
+
+
+def iter_news_pages(company_name, keywords, api_key, budget=100, since=None, page_size=NEWS_PAGE_SIZE, report=None):
+    """
+    Yields pages (lists of article records) from NewsAPI as they are downloaded, following
+    its page numbers until `budget` articles have been collected or results run out.
+    The company name and keywords are packed into as few OR-queries as NewsAPI's length
+    limit allows; they run concurrently and their results are deduplicated by URL
+    (see query_planner.run_planned_queries for `report`).
+    With `since` (an ISO publishedAt timestamp) only newer articles are requested, newest
+    first, and paging stops at the cursor.
     """
     if not api_key:
         print("NewsAPI key not found. Skipping news scraping.")
-        return pd.DataFrame()
+        return
 
     newsapi = NewsApiClient(api_key=api_key)
-    
-    # Combine company name and keywords for a broader search query
-    query = f'"{company_name}" OR ({" AND ".join(keywords)})'
-    
-    try:
-        all_articles = newsapi.get_everything(q=query,
-                                              language='en',
-                                              sort_by='relevancy',
-                                              page_size=limit)
-        
-        data = []
-        for article in all_articles['articles']:
-            data.append({
-                'source': article['source']['name'],
-                'title': article['title'],
-                'url': article['url'],
-                'published_at': article['publishedAt'],
-                'text': article.get('description', '') or '' # Ensure text is not None
-            })
-        
-        df = pd.DataFrame(data)
-        print(f"Found {len(df)} news articles for {company_name}.")
-        return df
+    queries = plan_queries(company_name, keywords, 'news')
+    yield from run_planned_queries(queries, lambda query, stats: _iter_query_pages(newsapi, query, budget, since, page_size, stats),
+                                   lambda record: record['url'], budget, report)
+
 
+def get_news_mentions(company_name, keywords, api_key, limit=100, since=None):
+    """
+    Fetches news articles mentioning the company and keywords from NewsAPI.
+    """
+    data = []
+    try:
+        for records in iter_news_pages(company_name, keywords, api_key, limit, since):
+            data.extend(records)
     except Exception as e:
         print(f"An error occurred while fetching news for {company_name}: {e}")
-        return pd.DataFrame()
\ No newline at end of file
+    df = pd.DataFrame(data)
+    print(f"Found {len(df)} news articles for {company_name}.")
+    return df
@@ -0,0 +1,249 @@
+# processors/onnx_backend.py
+
+import argparse
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from transformers import RobertaTokenizerFast
+
+import config
+from .sentiment_labels import map_class_id
+from .tokenization import TokenizationStage, word_attributions
+
+PARITY_TEXTS = [
+    "The new update is fantastic and support was quick to help.",
+    "Terrible service, my order arrived broken and nobody replied.",
+    "The company announced its quarterly results on Tuesday.",
+    "Not sure how I feel about the redesign yet.",
+    "Meh.",
+    "I have been a loyal customer for almost ten years, and while the early products were great, "
+    "the last two releases shipped with bugs that support acknowledged but never fixed, so I am moving on.",
+]
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+class OnnxSentimentModel:
+    """
+    Runs the exported RobertaHAN graph through onnxruntime's CPU provider.
+    Same interface as SentimentModel, without importing torch.
+    """
+
+    def __init__(self, model_path='best_model.onnx', device='cpu', dtype='float32'):
+        import onnxruntime as ort
+
+        if device != 'cpu':
+            raise ValueError("The onnx sentiment backend only runs on cpu")
+        self.model_path = model_path
+        self.dtype = dtype
+        self.device = device
+        self.tokenizer = RobertaTokenizerFast.from_pretrained('roberta-base')
+        self.tokenization = TokenizationStage(self.tokenizer, max_length=512, return_tensors='np')
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=['CPUExecutionProvider'])
+        self.output_names = [o.name for o in self.session.get_outputs()]
+
+    def logits(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        return self.session.run(['logits'], self._feed(input_ids, attention_mask))[0]
+
+    def logits_and_attention(self, input_ids: np.ndarray, attention_mask: np.ndarray):
+        if 'attention' not in self.output_names:
+            raise ValueError(f"{self.model_path} has no attention output; re-export it to get attributions")
+        return self.session.run(['logits', 'attention'], self._feed(input_ids, attention_mask))
+
+    @staticmethod
+    def _feed(input_ids: np.ndarray, attention_mask: np.ndarray) -> Dict[str, np.ndarray]:
+        return {
+            'input_ids': input_ids.astype(np.int64),
+            'attention_mask': attention_mask.astype(np.int64),
+        }
+
+    def predict(self, text):
+        return self.predict_batch([text], batch_size=1)[0]['label']
+
+    def predict_batch(self, texts, batch_size=32, return_attributions=False):
+        """
+        Same contract as SentimentModel.predict_batch: length-sorted batches,
+        results in the original order.
+        """
+        texts = ['' if t is None else str(t) for t in texts]
+        if not texts:
+            return []
+
+        results = [None] * len(texts)
+        for batch_idx, input_ids, attention_mask, alignments in self.tokenization.batches(texts, batch_size, with_alignment=return_attributions):
+            if return_attributions:
+                logits, weights = self.logits_and_attention(input_ids, attention_mask)
+            else:
+                logits, weights = self.logits(input_ids, attention_mask), None
+            probs = _softmax(logits.astype(np.float32))
+            for row, i in enumerate(batch_idx):
+                results[i] = {
+                    'label': map_class_id(int(np.argmax(probs[row]))),
+                    'probabilities': probs[row].tolist(),
+                }
+                if return_attributions:
+                    word_ids, offsets = alignments[row]
+                    results[i]['attributions'] = word_attributions(texts[i], word_ids, offsets, weights[row].astype(np.float32).tolist(), results[i]['label'])
+        return results
+
+
+def _split_directions(gru):
+    """Two single-direction GRUs carrying the weights of a one-layer bidirectional GRU."""
+    import torch
+
+    directions = []
+    for suffix in ('', '_reverse'):
+        single = torch.nn.GRU(gru.input_size, gru.hidden_size, batch_first=True)
+        for name in ('weight_ih', 'weight_hh', 'bias_ih', 'bias_hh'):
+            getattr(single, f'{name}_l0').data.copy_(getattr(gru, f'{name}_l0{suffix}').data)
+        directions.append(single.eval())
+    return directions
+
+
+def _length_aware_han(model):
+    """
+    RobertaHAN.forward with the packed BiGRU rewritten in traceable ops. The backward
+    direction reads each row's valid tokens reversed (padding stays at the end), and
+    padded positions are zeroed, so logits and attention match the packed torch model.
+    """
+    import torch
+
+    class _LengthAwareHAN(torch.nn.Module):
+        def __init__(self, han):
+            super().__init__()
+            self.han = han
+            self.forward_gru, self.backward_gru = _split_directions(han.gru)
+
+        def forward(self, input_ids, attention_mask):
+            sequence_output = self.han.roberta(input_ids=input_ids, attention_mask=attention_mask).last_hidden_state
+            lengths = attention_mask.sum(dim=1, keepdim=True).clamp(min=1)
+            positions = torch.arange(sequence_output.size(1), device=input_ids.device).unsqueeze(0)
+            # Reversing the first `length` positions of a row is its own inverse
+            reverse = torch.where(positions < lengths, lengths - 1 - positions, positions)
+            forward_output, _ = self.forward_gru(sequence_output)
+            index = reverse.unsqueeze(-1).expand(-1, -1, sequence_output.size(2))
+            backward_output, _ = self.backward_gru(torch.gather(sequence_output, 1, index))
+            index = reverse.unsqueeze(-1).expand(-1, -1, backward_output.size(2))
+            backward_output = torch.gather(backward_output, 1, index)
+            valid = (positions < lengths).unsqueeze(-1).to(sequence_output.dtype)
+            gru_output = torch.cat([forward_output, backward_output], dim=-1) * valid
+            attn_output, weights = self.han.sent_attn(gru_output, mask=attention_mask, return_weights=True)
+            return self.han.classifier(attn_output), weights
+
+    return _LengthAwareHAN(model).eval()
+
+
+def export_onnx(model_path: Optional[str] = None, onnx_path: Optional[str] = None, opset: int = 17) -> str:
+    """
+    Traces RobertaHAN (encoder, length-aware GRU, attention and classifier) to ONNX
+    with dynamic batch and sequence axes. The graph outputs the logits and the
+    per-token attention weights.
+    """
+    import torch
+    from .sentiment import SentimentModel
+
+    model_path = model_path or config.SENTIMENT_MODEL_PATH
+    onnx_path = onnx_path or config.SENTIMENT_ONNX_PATH
+    reference = SentimentModel(model_path=model_path, device='cpu', dtype='float32')
+
+    sample = reference.tokenizer(PARITY_TEXTS[:2], padding=True, return_tensors='pt')
+    with torch.no_grad():
+        torch.onnx.export(
+            _length_aware_han(reference.model),
+            (sample['input_ids'], sample['attention_mask']),
+            onnx_path,
+            input_names=['input_ids', 'attention_mask'],
+            output_names=['logits', 'attention'],
+            dynamic_axes={
+                'input_ids': {0: 'batch', 1: 'sequence'},
+                'attention_mask': {0: 'batch', 1: 'sequence'},
+                'logits': {0: 'batch'},
+                'attention': {0: 'batch', 1: 'sequence'},
+            },
+            opset_version=opset,
+        )
+    print(f"Exported sentiment model to {onnx_path}.")
+    return onnx_path
+
+
+def verify_onnx_parity(model_path: Optional[str] = None, onnx_path: Optional[str] = None, texts: Optional[List[str]] = None, atol: float = 1e-3) -> Dict[str, Any]:
+    """
+    Compares the onnx backend with the packed torch backend on the same mixed-length
+    batches: probabilities and per-word attributions from both predict_batch calls,
+    and the resulting labels.
+    """
+    from .sentiment import SentimentModel
+
+    model_path = model_path or config.SENTIMENT_MODEL_PATH
+    onnx_path = onnx_path or config.SENTIMENT_ONNX_PATH
+    texts = texts or PARITY_TEXTS
+
+    reference = SentimentModel(model_path=model_path, device='cpu', dtype='float32')
+    candidate = OnnxSentimentModel(model_path=onnx_path)
+
+    torch_results = reference.predict_batch(texts, return_attributions=True)
+    onnx_results = candidate.predict_batch(texts, return_attributions=True)
+    prob_diff = max(float(np.max(np.abs(np.array(a['probabilities']) - np.array(b['probabilities']))))
+                    for a, b in zip(torch_results, onnx_results))
+    attention_diff = max((abs(x['value'] - y['value'])
+                          for a, b in zip(torch_results, onnx_results)
+                          for x, y in zip(a['attributions'], b['attributions'])), default=0.0)
+    agreement = sum(1 for a, b in zip(torch_results, onnx_results) if a['label'] == b['label']) / len(texts)
+    return {
+        'samples': len(texts),
+        'max_abs_probability_diff': prob_diff,
+        'max_abs_attention_diff': attention_diff,
+        'within_tolerance': prob_diff <= atol and attention_diff <= atol,
+        'label_agreement': round(agreement, 4),
+    }
+
+
+def export_verified(model_path: Optional[str] = None, onnx_path: Optional[str] = None, texts: Optional[List[str]] = None,
+                    atol: float = 1e-3, min_agreement: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Exports next to onnx_path and only moves the graph into place when it matches the
+    torch backend within atol and agrees on at least min_agreement of the labels.
+    Raises ValueError otherwise, leaving any previous export untouched.
+    """
+    onnx_path = onnx_path or config.SENTIMENT_ONNX_PATH
+    min_agreement = config.SENTIMENT_ONNX_MIN_AGREEMENT if min_agreement is None else min_agreement
+    candidate_path = export_onnx(model_path, onnx_path + '.candidate')
+    try:
+        report = verify_onnx_parity(model_path, candidate_path, texts, atol)
+        if not report['within_tolerance'] or report['label_agreement'] < min_agreement:
+            raise ValueError(f"ONNX export does not match the torch model: {report}")
+        os.replace(candidate_path, onnx_path)
+    finally:
+        if os.path.exists(candidate_path):
+            os.remove(candidate_path)
+    print(f"Verified {onnx_path} against the torch model.")
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export the sentiment model to ONNX and check parity with torch.")
+    parser.add_argument("--model-path", type=str, default=None, help="Path to the trained model weights.")
+    parser.add_argument("--output", type=str, default=None, help="Where to write the .onnx file.")
+    parser.add_argument("--sample", type=str, default=None, help="Text file with one held-out text per line (default: built-in mixed-length texts).")
+    parser.add_argument("--atol", type=float, default=1e-3, help="Allowed absolute difference in probabilities and attention weights.")
+    parser.add_argument("--min-agreement", type=float, default=config.SENTIMENT_ONNX_MIN_AGREEMENT, help="Required label agreement with torch.")
+    args = parser.parse_args()
+
+    sample = None
+    if args.sample:
+        from .quantization import load_sample
+        sample = load_sample(args.sample)
+    try:
+        report = export_verified(args.model_path, args.output, sample, args.atol, args.min_agreement)
+    except ValueError as e:
+        print(e)
+        raise SystemExit(1)
+    for key, value in report.items():
+        print(f"{key}: {value}")
@@ -0,0 +1,143 @@
+# processors/prefilter.py
+
+import re
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+from pymongo import ASCENDING
+
+QUARANTINE_COLLECTION = 'quarantined_mentions'
+
+_WORD_RE = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+_URL_RE = re.compile(r'https?://\S+|www\.\S+')
+
+_ENGLISH_STOPWORDS = frozenset("""
+a about after all also an and any are as at be been but by can could did do does for from had has have he her his how
+i if in into is it its just may more most my new no not now of on one only or our out over says she should so some
+than that the their them there these they this to up was we were what when which who will with would you your
+""".split())
+
+# Frequent function words of the other languages broad queries most often return; words that
+# are also English (e.g. 'a', 'in', 'die') are removed below so they only count as English
+_OTHER_STOPWORDS = frozenset("""
+el la los las del por para con una unos es est son pero como más muy sin sobre también
+le les des du et une est sont dans pour pas sur avec qui ce cette mais plus nous vous être
+der das und ist nicht mit sich auf dem den ein eine für auch von zu wird sind bei nach
+o os da das do dos em um uma não com mais pelo pela são foi
+il di che non per una sono della del nel anche gli questo
+het een van en niet met voor zijn ook wordt maar
+""".split()) - _ENGLISH_STOPWORDS
+
+# Legal suffixes dropped to derive the short name a company is usually written as
+_LEGAL_SUFFIXES = frozenset('inc incorporated corp corporation co company ltd limited llc plc ag sa nv se gmbh group holdings'.split())
+
+
+def ensure_indexes(database) -> None:
+    database[QUARANTINE_COLLECTION].create_index([("company_id", ASCENDING), ("mention_id", ASCENDING)], unique=True)
+
+
+def _words(text) -> List[str]:
+    if text is None or (isinstance(text, float) and pd.isna(text)):
+        return []
+    return _WORD_RE.findall(_URL_RE.sub(' ', str(text)).lower())
+
+
+def english_score(text) -> float:
+    """
+    Cheap language identification in [0, 1]: the share of Latin-alphabet ASCII letters,
+    times the share of recognised stopwords that are English. Texts without any known
+    stopwords (e.g. terse headlines) are judged on their alphabet alone.
+    """
+    words = _words(text)
+    letters = ''.join(words)
+    if not letters:
+        return 0.0
+    ascii_share = sum(c.isascii() for c in letters) / len(letters)
+    english = sum(w in _ENGLISH_STOPWORDS for w in words)
+    other = sum(w in _OTHER_STOPWORDS for w in words)
+    if english + other == 0:
+        return ascii_share
+    return ascii_share * english / (english + other)
+
+
+def company_aliases(company_name: str) -> List[List[str]]:
+    """The company name as word sequences: as given, and without a trailing legal suffix."""
+    words = _words(company_name)
+    aliases = [words] if words else []
+    short = list(words)
+    while len(short) > 1 and short[-1] in _LEGAL_SUFFIXES:
+        short.pop()
+    if short != words:
+        aliases.append(short)
+    return aliases
+
+
+def _positions(words: Sequence[str], phrase: Sequence[str], inflect: bool = False) -> List[int]:
+    """
+    Start positions of `phrase`. With `inflect` its last word also matches inflections
+    ('recall' -> 'recalls'); names are matched exactly, so 'Meta' does not match 'metal'.
+    """
+    n = len(phrase)
+    head, last = list(phrase[:-1]), phrase[-1]
+    return [i for i in range(len(words) - n + 1)
+            if list(words[i:i + n - 1]) == head
+            and (words[i + n - 1] == last or (inflect and len(last) >= 4 and words[i + n - 1].startswith(last)))]
+
+
+class RelevanceFilter:
+    """
+    Scores how likely a text is about one company and whether it is English, so off-topic
+    and foreign-language results can be set aside before NLP and sentiment scoring.
+
+    Relevance is 1.0 when the company name (or its alias) appears within `proximity` words of
+    a keyword, 0.8 when the name and a keyword both appear further apart, 0.6 for the name
+    alone and 0.3 for keywords alone. Without keywords, naming the company scores 1.0.
+    """
+
+    def __init__(self, company_name: str, keywords: Optional[Sequence[str]] = None, min_relevance: float = 0.5,
+                 min_english: float = 0.5, proximity: int = 12):
+        self.aliases = company_aliases(company_name)
+        alias_keys = {tuple(a) for a in self.aliases}
+        self.keywords = [k for k in (_words(kw) for kw in (keywords or [])) if k and tuple(k) not in alias_keys]
+        self.min_relevance = min_relevance
+        self.min_english = min_english
+        self.proximity = proximity
+
+    def relevance(self, text) -> float:
+        words = _words(text)
+        names = [p for alias in self.aliases for p in _positions(words, alias)]
+        keywords = [p for kw in self.keywords for p in _positions(words, kw, inflect=True)]
+        if not names:
+            return 0.3 if keywords else 0.0
+        if not self.keywords:
+            return 1.0
+        if not keywords:
+            return 0.6
+        if any(abs(n - k) <= self.proximity for n in names for k in keywords):
+            return 1.0
+        return 0.8
+
+    def verdict(self, text) -> Dict[str, object]:
+        """{'language_score', 'relevance', 'reason'}; reason is None for text that passes."""
+        language = round(english_score(text), 3)
+        relevance = self.relevance(text)
+        reason = None
+        if language < self.min_english:
+            reason = 'non_english'
+        elif relevance < self.min_relevance:
+            reason = 'irrelevant'
+        return {'language_score': language, 'relevance': relevance, 'reason': reason}
+
+    def apply(self, texts: Sequence) -> pd.DataFrame:
+        """One verdict row per text, in order."""
+        return pd.DataFrame([self.verdict(t) for t in texts], columns=['language_score', 'relevance', 'reason'])
+
+
+def merge_stats(total: Optional[Dict[str, int]], verdicts: pd.DataFrame) -> Dict[str, int]:
+    """Adds one page's verdict counts to a source's running {'checked', 'kept', <reason>: n} totals."""
+    total = dict(total or {'checked': 0, 'kept': 0, 'non_english': 0, 'irrelevant': 0})
+    total['checked'] += len(verdicts)
+    total['kept'] += int(verdicts['reason'].isna().sum())
+    for reason, n in verdicts['reason'].value_counts().items():
+        total[reason] = total.get(reason, 0) + int(n)
+    return total
@@ -0,0 +1,164 @@
+# scrapers/profile_cache.py
+"""
+Cache in front of the Wikipedia company profile scraper.
+
+Profiles in 'company_profiles' carry the page's revision id and the time they were
+fetched. Within the TTL the stored profile is used without touching the network; after
+it, one lightweight revision-id lookup decides whether the page changed, and only a
+changed profile is downloaded and handed back to be rewritten.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+from pymongo import UpdateOne
+
+from . import wikipedia_s
+
+PROFILES_COLLECTION = 'company_profiles'
+CONTENT_FIELDS = ('Name', 'Summary', 'URL')
+
+# Values of DataFrame.attrs['cache'] on the returned profile
+FRESH = 'fresh'                # within the TTL, no request made
+NOT_MODIFIED = 'not_modified'  # revalidated, stored content is still current
+CHANGED = 'changed'            # downloaded content differs from what is stored
+STALE = 'stale'                # refresh failed, stored profile returned as-is
+
+
+def cached_profile(database, company_id: str) -> Optional[Dict[str, Any]]:
+    return database[PROFILES_COLLECTION].find_one({"company_id": company_id}, {"_id": 0})
+
+
+def is_fresh(profile: Dict[str, Any], ttl_seconds: float, now: Optional[datetime] = None) -> bool:
+    fetched_at = profile.get('fetched_at')
+    if not isinstance(fetched_at, datetime):
+        return False
+    return (now or datetime.utcnow()) - fetched_at < timedelta(seconds=ttl_seconds)
+
+
+def _frame(profile: Dict[str, Any], status: str) -> pd.DataFrame:
+    df = pd.DataFrame([{k: v for k, v in profile.items() if k != 'company_id'}])
+    df.attrs['cache'] = status
+    return df
+
+
+def same_content(stored: Dict[str, Any], fetched: Dict[str, Any]) -> bool:
+    """Whether a stored and a freshly fetched profile agree on every content field; summaries are compared normalized."""
+    for f in CONTENT_FIELDS:
+        a, b = stored.get(f), fetched.get(f)
+        if f == 'Summary':
+            a, b = wikipedia_s.normalize_summary(a), wikipedia_s.normalize_summary(b)
+        if a != b:
+            return False
+    return True
+
+
+def _touch(database, company_id: str, revision_id: Optional[int], now: datetime) -> None:
+    fields: Dict[str, Any] = {"fetched_at": now}
+    if revision_id is not None:
+        fields["revision_id"] = revision_id
+    database[PROFILES_COLLECTION].update_one({"company_id": company_id}, {"$set": fields})
+
+
+def get_company_profile(database, company_id: str, company_name: str, user_agent: str, ttl_seconds: float) -> pd.DataFrame:
+    """
+    Same result as wikipedia_s.get_company_profile, with attrs['cache'] telling the caller
+    whether the profile needs to be written back (only when it is CHANGED).
+    Without a database every call is a full fetch reported as CHANGED.
+    """
+    if database is None:
+        df = wikipedia_s.get_company_profile(company_name, user_agent)
+        df.attrs['cache'] = CHANGED
+        return df
+
+    now = datetime.utcnow()
+    cached = cached_profile(database, company_id)
+    if cached and is_fresh(cached, ttl_seconds, now):
+        return _frame(cached, FRESH)
+
+    if cached and cached.get('revision_id') is not None and user_agent:
+        try:
+            revision_id = wikipedia_s.get_revision_ids([company_name], user_agent).get(company_name)
+        except Exception as e:
+            print(f"Wikipedia revision check failed for {company_name}: {e}")
+            revision_id = None
+        if revision_id is not None and revision_id == cached.get('revision_id'):
+            _touch(database, company_id, revision_id, now)
+            return _frame({**cached, 'fetched_at': now}, NOT_MODIFIED)
+
+    try:
+        df = wikipedia_s.get_company_profile(company_name, user_agent)
+    except Exception as e:
+        if not cached:
+            raise
+        print(f"Wikipedia profile fetch failed for {company_name}, keeping the stored one: {e}")
+        return _frame(cached, STALE)
+    if df.empty:
+        if cached:
+            return _frame(cached, STALE)
+        df.attrs['cache'] = CHANGED
+        return df
+
+    fetched = df.iloc[0].to_dict()
+    fetched['fetched_at'] = now
+    if cached and same_content(cached, fetched):
+        # A new revision that did not touch the intro, name or URL
+        _touch(database, company_id, fetched.get('revision_id'), now)
+        return _frame({**cached, 'revision_id': fetched.get('revision_id'), 'fetched_at': now}, NOT_MODIFIED)
+    return _frame(fetched, CHANGED)
+
+
+def refresh_profiles(database, companies: List[Tuple[str, str]], user_agent: str, ttl_seconds: float) -> Dict[str, int]:
+    """
+    Brings the stored profiles of many (company_id, company_name) pairs up to date with a
+    handful of batched requests: expired profiles are revalidated 50 titles at a time and
+    only the ones whose revision moved (or that were never stored) are downloaded, again
+    in batches. Returns counts per outcome.
+    """
+    now = datetime.utcnow()
+    ids = [company_id for company_id, _ in companies]
+    cached = {d["company_id"]: d for d in database[PROFILES_COLLECTION].find({"company_id": {"$in": ids}}, {"_id": 0})}
+    stats = {FRESH: 0, NOT_MODIFIED: 0, CHANGED: 0, 'missing': 0}
+
+    expired = []
+    for company_id, name in companies:
+        profile = cached.get(company_id)
+        if profile and is_fresh(profile, ttl_seconds, now):
+            stats[FRESH] += 1
+        else:
+            expired.append((company_id, name))
+
+    revalidate = [(cid, name) for cid, name in expired if cached.get(cid, {}).get('revision_id') is not None]
+    revisions: Dict[str, Any] = {}
+    for start in range(0, len(revalidate), wikipedia_s.MAX_TITLES_PER_REQUEST):
+        batch = [name for _, name in revalidate[start:start + wikipedia_s.MAX_TITLES_PER_REQUEST]]
+        revisions.update(wikipedia_s.get_revision_ids(batch, user_agent))
+
+    ops = []
+    to_fetch = []
+    for company_id, name in expired:
+        revision_id = revisions.get(name)
+        if revision_id is not None and revision_id == cached.get(company_id, {}).get('revision_id'):
+            ops.append(UpdateOne({"company_id": company_id}, {"$set": {"fetched_at": now}}))
+            stats[NOT_MODIFIED] += 1
+        else:
+            to_fetch.append((company_id, name))
+
+    fetched = wikipedia_s.get_company_profiles([name for _, name in to_fetch], user_agent) if to_fetch else {}
+    for company_id, name in to_fetch:
+        profile = fetched.get(name)
+        if profile is None:
+            stats['missing'] += 1
+            continue
+        previous = cached.get(company_id)
+        if previous and same_content(previous, profile):
+            ops.append(UpdateOne({"company_id": company_id}, {"$set": {"fetched_at": now, "revision_id": profile.get('revision_id')}}))
+            stats[NOT_MODIFIED] += 1
+        else:
+            ops.append(UpdateOne({"company_id": company_id}, {"$set": {**profile, "company_id": company_id, "fetched_at": now}}, upsert=True))
+            stats[CHANGED] += 1
+
+    if ops:
+        database[PROFILES_COLLECTION].bulk_write(ops, ordered=False)
+    return stats
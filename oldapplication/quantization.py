@@ -0,0 +1,93 @@
+# processors/quantization.py
+
+import argparse
+import io
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import config
+
+
+def _model_size_mb(model) -> float:
+    import torch
+    buffer = io.BytesIO()
+    torch.save(model.model.state_dict(), buffer)
+    return round(buffer.tell() / (1024 * 1024), 1)
+
+
+def _timed_predictions(model, texts: List[str], batch_size: int):
+    started = time.perf_counter()
+    results = model.predict_batch(texts, batch_size=batch_size)
+    elapsed = time.perf_counter() - started
+    return [r['label'] for r in results], elapsed
+
+
+def _label_distribution(labels: List[str]) -> Dict[str, float]:
+    counts = Counter(labels)
+    total = len(labels) or 1
+    return {k: round(counts.get(k, 0) / total, 4) for k in ('positive', 'neutral', 'negative')}
+
+
+def check_int8_agreement(texts: List[str], model_path: Optional[str] = None, batch_size: Optional[int] = None, reference=None, candidate=None) -> Dict[str, Any]:
+    """
+    Scores a held-out sample with the fp32 and int8 models and reports label agreement,
+    the label distribution of each, latency and model size.
+    Pass already-loaded models as reference/candidate to avoid loading them again.
+    """
+    from .sentiment import SentimentModel
+
+    model_path = model_path or config.SENTIMENT_MODEL_PATH
+    batch_size = batch_size or config.SENTIMENT_BATCH_SIZE
+    texts = [t for t in texts if t and str(t).strip()]
+    if not texts:
+        raise ValueError("Agreement check needs at least one non-empty text")
+
+    if reference is None:
+        reference = SentimentModel(model_path=model_path, device='cpu', dtype='float32')
+    if candidate is None:
+        candidate = SentimentModel(model_path=model_path, device='cpu', dtype='int8')
+
+    # One untimed pass each so lazy initialisation doesn't count against either model
+    reference.predict_batch(texts[:1])
+    candidate.predict_batch(texts[:1])
+
+    fp32_labels, fp32_seconds = _timed_predictions(reference, texts, batch_size)
+    int8_labels, int8_seconds = _timed_predictions(candidate, texts, batch_size)
+
+    agree = sum(1 for a, b in zip(fp32_labels, int8_labels) if a == b)
+    fp32_dist = _label_distribution(fp32_labels)
+    int8_dist = _label_distribution(int8_labels)
+    return {
+        'samples': len(texts),
+        'agreement': round(agree / len(texts), 4),
+        'fp32_distribution': fp32_dist,
+        'int8_distribution': int8_dist,
+        'max_distribution_shift': round(max(abs(fp32_dist[k] - int8_dist[k]) for k in fp32_dist), 4),
+        'fp32_ms_per_text': round(1000 * fp32_seconds / len(texts), 2),
+        'int8_ms_per_text': round(1000 * int8_seconds / len(texts), 2),
+        'speedup': round(fp32_seconds / int8_seconds, 2) if int8_seconds > 0 else None,
+        'fp32_size_mb': _model_size_mb(reference),
+        'int8_size_mb': _model_size_mb(candidate),
+    }
+
+
+def load_sample(path: str) -> List[str]:
+    """Reads a held-out sample file with one text per line."""
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare int8 and fp32 sentiment models on a held-out sample.")
+    parser.add_argument("--sample", type=str, required=True, help="Text file with one held-out text per line.")
+    parser.add_argument("--model-path", type=str, default=None, help="Path to the trained model weights.")
+    parser.add_argument("--min-agreement", type=float, default=config.SENTIMENT_INT8_MIN_AGREEMENT, help="Exit non-zero below this label agreement.")
+    args = parser.parse_args()
+
+    report = check_int8_agreement(load_sample(args.sample), model_path=args.model_path)
+    for key, value in report.items():
+        print(f"{key}: {value}")
+    if report['agreement'] < args.min_agreement:
+        print(f"Agreement {report['agreement']} is below the required {args.min_agreement}.")
+        raise SystemExit(1)
@@ -0,0 +1,129 @@
+# scrapers/query_planner.py
+
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .fanout import SourceStream, SourceTask
+
+# Longest query string each source accepts
+MAX_QUERY_LENGTH = {
+    'news': 500,
+    'reddit': 512,
+}
+
+
+@dataclass
+class PlannedQuery:
+    text: str
+    terms: List[str]
+
+
+def quote_term(term: str) -> str:
+    """A term as an exact phrase; embedded quotes would break the phrase, so they are dropped."""
+    return '"' + ' '.join(term.replace('"', ' ').split()) + '"'
+
+
+def plan_queries(company_name: str, keywords: List[str], source: str, max_length: Optional[int] = None) -> List[PlannedQuery]:
+    """
+    Packs the company name and keywords, deduplicated case-insensitively, into as few
+    `"a" OR "b" OR ...` queries as fit the source's length limit (first-fit decreasing).
+    A single term longer than the limit is dropped with a warning.
+    """
+    max_length = max_length or MAX_QUERY_LENGTH[source]
+    terms: Dict[str, str] = {}
+    for term in [company_name, *keywords]:
+        cleaned = ' '.join(str(term or '').replace('"', ' ').split())
+        if cleaned and cleaned.lower() not in terms:
+            terms[cleaned.lower()] = cleaned
+    bins: List[List[str]] = []
+    lengths: List[int] = []
+    for term in sorted(terms.values(), key=len, reverse=True):
+        size = len(quote_term(term))
+        if size > max_length:
+            print(f"Query term too long for {source} ({size} > {max_length} chars), skipped: {term[:40]}...")
+            continue
+        for i, used in enumerate(lengths):
+            if used + len(' OR ') + size <= max_length:
+                bins[i].append(term)
+                lengths[i] = used + len(' OR ') + size
+                break
+        else:
+            bins.append([term])
+            lengths.append(size)
+    return [PlannedQuery(' OR '.join(quote_term(t) for t in b), b) for b in bins]
+
+
+def matched_terms(record: Dict[str, Any], terms: List[str]) -> List[str]:
+    text = ' '.join(str(record.get(f) or '') for f in ('title', 'text')).lower()
+    return [t for t in terms if re.search(r'(?<!\w)' + re.escape(t.lower()) + r'(?!\w)', text)]
+
+
+def run_planned_queries(queries: List[PlannedQuery], fetch: Callable[[str, Dict[str, Any]], Iterator[List[Dict[str, Any]]]], key: Callable[[Dict[str, Any]], Any],
+                        budget: int, report: Optional[Dict[str, Any]] = None) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Runs every planned query concurrently (`fetch(query_text, query_stats)` yields pages)
+    and yields pages of records not seen from another query yet, up to `budget` records
+    in total.
+
+    When `report` is given it is filled with per-query yield ({query: {items, new}}) and
+    per-term matches ({term: mentions whose title/text contains it}), so keywords that
+    never match can be pruned. A fetch sets `query_stats['truncated']` when it stopped on
+    its budget before reaching its cursor. `report['truncated']` is set when any query did,
+    or when the overall budget cut the queries short; `report['failed']` lists the queries
+    that raised while others succeeded. Either way some results were never read, so the
+    source's cursor must not move past them. `report['complete']` is set once the queries
+    are finished with (run out, or the budget is reached) and `report['pages']` counts the
+    pages yielded, so a caller can tell whether it processed all of them even when it
+    goes on to read something else from the same source.
+    """
+    if report is None:
+        report = {}
+    report.setdefault('queries', {})
+    report.setdefault('terms', {})
+    all_terms = [t for q in queries for t in q.terms]
+    for q in queries:
+        report['queries'][q.text] = {'items': 0, 'new': 0}
+    for t in all_terms:
+        report['terms'].setdefault(t, 0)
+
+    seen = set()
+    emitted = 0
+    out_of_budget = False
+    report['pages'] = 0
+    stream = SourceStream([SourceTask(q.text, fetch, (q.text, report['queries'][q.text]), timeout=None, paged=True) for q in queries])
+    iterator = iter(stream)
+    try:
+        for query_text, page in iterator:
+            stats = report['queries'][query_text]
+            stats['items'] += len(page)
+            fresh = []
+            for record in page:
+                k = key(record)
+                if k in seen:
+                    continue
+                seen.add(k)
+                fresh.append(record)
+                for t in matched_terms(record, all_terms):
+                    report['terms'][t] += 1
+            fresh = fresh[:budget - emitted]
+            stats['new'] += len(fresh)
+            emitted += len(fresh)
+            if fresh:
+                report['pages'] += 1
+                yield fresh
+            if emitted >= budget:
+                out_of_budget = True
+                report['complete'] = True
+                return
+        errors = [s['error'] for s in stream.stats.values() if s.get('error')]
+        if errors and len(errors) == len(queries) and not emitted:
+            raise RuntimeError(errors[0])
+        report['complete'] = True
+    finally:
+        iterator.close()
+        for query_text, stats in stream.stats.items():
+            if stats.get('error'):
+                report['queries'][query_text]['error'] = stats['error']
+        report['truncated'] = out_of_budget or any(q.get('truncated') for q in report['queries'].values())
+        report['failed'] = [q for q, stats in report['queries'].items() if stats.get('error')]
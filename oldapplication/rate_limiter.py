@@ -0,0 +1,143 @@
+# scrapers/rate_limiter.py
+
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+import config
+
+
+class TokenBucket:
+    """
+    Token bucket for one outbound API, shared by every thread in the process.
+
+    Tokens refill at `rate_per_minute` up to `capacity`. A rate-limit response halves the
+    rate (down to 1/16 of the configured one) and blocks the bucket until the server's
+    Retry-After has passed; every successful request after that wins back 5% of the
+    configured rate. Quota headers, where a source reports them, cap the tokens available.
+    """
+
+    def __init__(self, name: str, rate_per_minute: float, capacity: Optional[float] = None):
+        self.name = name
+        self.configured_rate = float(rate_per_minute)
+        self.rate = self.configured_rate
+        self.capacity = float(capacity or max(1.0, rate_per_minute / 6))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'waited_seconds': 0.0, 'rate_limited': 0}
+        self._quota: Dict[str, Any] = {}
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate / 60.0)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """Blocks until `tokens` are available; returns False if that would exceed `timeout` seconds."""
+        tokens = min(tokens, self.capacity)
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._blocked_until and self._tokens >= tokens:
+                    self._tokens -= tokens
+                    self._stats['requests'] += 1
+                    self._stats['waited_seconds'] += now - started
+                    return True
+                wait = max(self._blocked_until - now, (tokens - self._tokens) * 60.0 / self.rate)
+            if timeout is not None and time.monotonic() - started + wait > timeout:
+                return False
+            time.sleep(min(wait, 1.0))
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.rate = min(self.configured_rate, self.rate + self.configured_rate * 0.05)
+
+    def on_rate_limited(self, retry_after: Optional[float] = None) -> None:
+        """Backs off after a 429 / rate-limit error."""
+        with self._lock:
+            now = time.monotonic()
+            self.rate = max(self.configured_rate / 16, self.rate / 2)
+            self._tokens = 0.0
+            self._updated = now
+            pause = retry_after if retry_after is not None else 60.0 / self.rate
+            self._blocked_until = max(self._blocked_until, now + pause)
+            self._stats['rate_limited'] += 1
+
+    def observe_quota(self, remaining: Optional[float], reset_seconds: Optional[float] = None) -> None:
+        """Applies a quota reported by the API: never hold more tokens than the server will accept."""
+        if remaining is None:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens = min(self._tokens, float(remaining))
+            if remaining <= 0 and reset_seconds:
+                self._blocked_until = max(self._blocked_until, now + reset_seconds)
+            self._quota = {'remaining': remaining, 'reset_seconds': reset_seconds}
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                'rate_per_minute': round(self.rate, 2),
+                'configured_rate_per_minute': self.configured_rate,
+                'tokens_available': round(self._tokens, 2),
+                'capacity': self.capacity,
+                'blocked_seconds': round(max(0.0, self._blocked_until - now), 1),
+                'requests': self._stats['requests'],
+                'waited_seconds': round(self._stats['waited_seconds'], 2),
+                'rate_limited': self._stats['rate_limited'],
+                **({'quota': dict(self._quota)} if self._quota else {}),
+            }
+
+
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def _configured_rates() -> Dict[str, float]:
+    return {
+        'news': config.NEWS_RATE_PER_MINUTE,
+        'reddit': config.REDDIT_RATE_PER_MINUTE,
+        'wikipedia': config.WIKIPEDIA_RATE_PER_MINUTE,
+    }
+
+
+def get_limiter(source: str) -> TokenBucket:
+    """The process-wide bucket for 'news', 'reddit' or 'wikipedia'."""
+    with _limiters_lock:
+        limiter = _limiters.get(source)
+        if limiter is None:
+            limiter = TokenBucket(source, _configured_rates()[source])
+            _limiters[source] = limiter
+        return limiter
+
+
+def get_stats() -> Dict[str, Dict[str, Any]]:
+    return {source: get_limiter(source).get_stats() for source in _configured_rates()}
+
+
+def paced(items: Iterable[Any], limiter: TokenBucket, page_size: int = 100) -> Iterator[Any]:
+    """Yields from a lazily paged listing, taking a token before each page is requested."""
+    iterator = iter(items)
+    count = 0
+    while True:
+        if count % page_size == 0:
+            limiter.acquire()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        count += 1
+        yield item
+
+
+def retry_after_seconds(headers) -> Optional[float]:
+    try:
+        return float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
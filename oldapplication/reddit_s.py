@@ -1,41 +1,210 @@
 # scrapers/reddit_scraper.py
 
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
 import praw
 import pandas as pd
+from praw.models import MoreComments
+from prawcore.exceptions import TooManyRequests
+
+from .query_planner import plan_queries, run_planned_queries
+from .rate_limiter import get_limiter, paced, retry_after_seconds
+
+# Reddit listings return at most 100 items per request
+REDDIT_PAGE_SIZE = 100
+
+
+def _submission_record(submission) -> dict:
+    return {
+        'type': 'post',
+        'id': submission.id,
+        'subreddit': submission.subreddit.display_name,
+        'title': submission.title,
+        'text': submission.selftext,
+        'score': submission.score,
+        'url': submission.permalink,
+        'created_utc': submission.created_utc,
+        'author': str(submission.author) if submission.author else None
+    }
+
+
+def _comment_record(comment, submission, depth: int) -> dict:
+    return {
+        'type': 'comment',
+        'id': comment.id,
+        'subreddit': submission.subreddit.display_name,
+        'title': submission.title,
+        'text': comment.body,
+        'score': comment.score,
+        'url': comment.permalink,
+        'created_utc': comment.created_utc,
+        'author': str(comment.author) if comment.author else None,
+        'parent_id': comment.parent_id,
+        'submission_id': submission.id,
+        'depth': depth
+    }
+
+
+def _comment_records(submission, max_comments: int, max_depth: int) -> list:
+    """Breadth-first walk of an expanded comment forest: top-level comments first, then replies, up to the budget."""
+    records = []
+    pending = deque((comment, 0) for comment in submission.comments)
+    while pending and len(records) < max_comments:
+        comment, depth = pending.popleft()
+        if isinstance(comment, MoreComments):
+            continue
+        records.append(_comment_record(comment, submission, depth))
+        if depth + 1 < max_depth:
+            pending.extend((reply, depth + 1) for reply in comment.replies)
+    return records
 
-def get_reddit_mentions(company_name: str, keywords: list, client_id: str, client_secret: str, user_agent: str, limit: int) -> pd.DataFrame:
+
+def iter_comment_pages(client_id: str, client_secret: str, user_agent: str, submission_ids: list, per_submission: int = 200, max_depth: int = 3, more_limit: int = 4, workers: int = 4):
     """
-    Fetches Reddit posts and comments mentioning the company or keywords.
+    Expands the comment forests of `submission_ids` with at most `workers` submissions in
+    flight and yields one page of comment records per submission as it completes.
+    Each submission costs one request plus up to `more_limit` "load more comments"
+    expansions and contributes at most `per_submission` comments, `max_depth` levels deep,
+    so a viral thread cannot blow up run time or memory.
     """
+    limiter = get_limiter('reddit')
+    local = threading.local()
+
+    def expand(submission_id):
+        if not hasattr(local, 'reddit'):
+            local.reddit = praw.Reddit(client_id=client_id, client_secret=client_secret, user_agent=user_agent)
+        submission = local.reddit.submission(id=submission_id)
+        submission.comment_sort = 'top'
+        submission.comment_limit = per_submission
+        try:
+            limiter.acquire(1 + more_limit)
+            submission.comments.replace_more(limit=more_limit)
+        except TooManyRequests as e:
+            limiter.on_rate_limited(retry_after_seconds(e.response.headers))
+            raise
+        limiter.on_success()
+        return _comment_records(submission, per_submission, max_depth)
+
+    ids = iter(submission_ids)
+    pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='reddit-comments')
     try:
-        reddit = praw.Reddit(client_id=client_id,
-                             client_secret=client_secret,
-                             user_agent=user_agent)
-    except Exception as e:
-        print(f"Error connecting to Reddit API: {e}")
-        return pd.DataFrame()
-        
-    query = f'"{company_name}" OR ' + ' OR '.join(f'"{k}"' for k in keywords)
+        in_flight = {pool.submit(expand, sid): sid for sid in _take(ids, max(1, workers))}
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                submission_id = in_flight.pop(future)
+                try:
+                    records = future.result()
+                except Exception as e:
+                    print(f"Error expanding Reddit comments for {submission_id}: {e}")
+                    records = []
+                for sid in _take(ids, 1):
+                    in_flight[pool.submit(expand, sid)] = sid
+                if records:
+                    yield records
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _take(iterator, n: int) -> list:
+    return [item for _, item in zip(range(n), iterator)]
+
+
+def _iter_query_pages(client_id: str, client_secret: str, user_agent: str, query: str, budget: int, since: float = None, page_size: int = REDDIT_PAGE_SIZE, report: dict = None):
+    """
+    Pages of post records for one Reddit search query. With `since`, `report['truncated']`
+    is set when the budget ends the listing before the cursor is reached.
+    """
+    if report is None:
+        report = {}
+    # praw instances are not shared between threads, so every query gets its own
+    reddit = praw.Reddit(client_id=client_id,
+                         client_secret=client_secret,
+                         user_agent=user_agent)
     
     # Search in popular subreddits, can be expanded
     subreddits_to_search = "all" 
     
+    limiter = get_limiter('reddit')
+    if since:
+        submissions = reddit.subreddit(subreddits_to_search).search(query, sort='new', limit=budget)
+    else:
+        submissions = reddit.subreddit(subreddits_to_search).search(query, limit=budget)
+
+    page = []
+    read = 0
+    reached_cursor = False
+    error = None
+    try:
+        # Each listing page of up to 100 posts is one request
+        for submission in paced(submissions, limiter, REDDIT_PAGE_SIZE):
+            read += 1
+            if since and submission.created_utc <= since:
+                reached_cursor = True
+                break
+            page.append(_submission_record(submission))
+            if len(page) >= page_size:
+                yield page
+                page = []
+        limiter.on_success()
+        # A listing that ran out before the budget has nothing newer left either
+        report['truncated'] = bool(since) and not reached_cursor and read >= budget
+    except TooManyRequests as e:
+        limiter.on_rate_limited(retry_after_seconds(e.response.headers))
+        error = e
+    except Exception as e:
+        error = e
+
+    limits = reddit.auth.limits
+    if limits.get('remaining') is not None:
+        reset = limits.get('reset_timestamp')
+        limiter.observe_quota(limits['remaining'], reset - time.time() if reset else None)
+
+    if page:
+        yield page
+    if error is not None:
+        raise error
+
+
+def iter_reddit_pages(company_name: str, keywords: list, client_id: str, client_secret: str, user_agent: str, budget: int = 100, since: float = None, page_size: int = REDDIT_PAGE_SIZE, report: dict = None, comments: dict = None):
+    """
+    Yields pages (lists of post records) as Reddit's listing cursors are followed, up to
+    `budget` posts. The company name and keywords are packed into as few OR-queries as
+    Reddit's length limit allows; they run concurrently and their results are
+    deduplicated by post id (see query_planner.run_planned_queries for `report`).
+    With `since` (a created_utc timestamp) posts are read newest first and paging stops
+    at the cursor.
+    With `comments` ({'submissions', 'per_submission', 'max_depth', 'more_limit', 'workers'})
+    the comment forests of the highest-scoring posts are expanded afterwards and streamed
+    as comment records (see iter_comment_pages). `report['complete']` is set before the
+    first comment is requested, so the post cursor does not wait for the comments.
+    """
+    queries = plan_queries(company_name, keywords, 'reddit')
+    scores = {}
+    for page in run_planned_queries(queries, lambda query, stats: _iter_query_pages(client_id, client_secret, user_agent, query, budget, since, page_size, stats),
+                                    lambda record: record['id'], budget, report):
+        scores.update((record['id'], record['score']) for record in page)
+        yield page
+
+    if comments and comments.get('submissions'):
+        top = sorted(scores, key=scores.get, reverse=True)[:comments['submissions']]
+        yield from iter_comment_pages(client_id, client_secret, user_agent, top,
+                                      comments.get('per_submission', 200), comments.get('max_depth', 3),
+                                      comments.get('more_limit', 4), comments.get('workers', 4))
+
+
+def get_reddit_mentions(company_name: str, keywords: list, client_id: str, client_secret: str, user_agent: str, limit: int, since: float = None) -> pd.DataFrame:
+    """
+    Fetches Reddit posts and comments mentioning the company or keywords.
+    """
     mentions = []
-    
     try:
-        submissions = reddit.subreddit(subreddits_to_search).search(query, limit=limit)
-        for submission in submissions:
-            mentions.append({
-                'type': 'post',
-                'id': submission.id,
-                'subreddit': submission.subreddit.display_name,
-                'title': submission.title,
-                'text': submission.selftext,
-                'score': submission.score,
-                'url': submission.permalink,
-                'created_utc': submission.created_utc
-            })
+        for page in iter_reddit_pages(company_name, keywords, client_id, client_secret, user_agent, limit, since):
+            mentions.extend(page)
     except Exception as e:
         print(f"Error fetching data from Reddit: {e}")
 
-    return pd.DataFrame(mentions)
\ No newline at end of file
+    return pd.DataFrame(mentions)
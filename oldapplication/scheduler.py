@@ -10,6 +10,8 @@ from datetime import datetime
 from typing import List
 import logging
 
+from scheduler_config import COMPANY_ANALYSIS_DELAY
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -54,6 +56,42 @@ class AnalysisScheduler:
         except Exception as e:
             logger.error(f"Error running analysis for {company_id}: {e}")
     
+    def warm_up_model(self):
+        """Load spaCy and the shared sentiment model once so scheduled runs reuse them"""
+        try:
+            from processors import data_processor
+            report = data_processor.preload()
+            stats = report.get('sentiment_model', {})
+            logger.info(f"spaCy ready in {report.get('spacy_seconds')}s; sentiment model ready in {stats.get('load_seconds')}s (rss {stats.get('rss_after_mb')} MB)")
+        except Exception as e:
+            logger.error(f"Error warming up models: {e}")
+    
+    def refresh_profiles(self, companies: List[dict] = None):
+        """Refresh Wikipedia profiles for all companies with batched requests"""
+        try:
+            import config
+            from scrapers import profile_cache
+            if companies is None:
+                companies = list(self.db.companies.find({}, {"company_id": 1, "Name": 1}))
+            pairs = [(c["company_id"], c.get("Name") or c["company_id"].replace("_", " ")) for c in companies if c.get("company_id")]
+            if not pairs:
+                return {}
+            stats = profile_cache.refresh_profiles(self.db, pairs, config.WIKI_USER_AGENT, config.WIKI_PROFILE_TTL_HOURS * 3600)
+            logger.info(f"Refreshed {len(pairs)} company profiles: {stats}")
+            return stats
+        except Exception as e:
+            logger.error(f"Error refreshing company profiles: {e}")
+            return {}
+    
+    def log_rate_limits(self):
+        """Log the remaining request budget of each source"""
+        try:
+            from scrapers import rate_limiter
+            for source, stats in rate_limiter.get_stats().items():
+                logger.info(f"Rate limit {source}: {stats}")
+        except Exception as e:
+            logger.error(f"Error reading rate limiter stats: {e}")
+    
     def run_all_companies(self):
         """Run analysis for all companies in the database"""
         try:
@@ -63,6 +101,10 @@ class AnalysisScheduler:
                 logger.warning("No companies found in database")
                 return
             
+            self.warm_up_model()
+            # Per-company runs then find their profile fresh and skip Wikipedia
+            self.refresh_profiles(companies)
+            
             logger.info(f"Running analysis for {len(companies)} companies")
             
             for company in companies:
@@ -75,8 +117,11 @@ class AnalysisScheduler:
                 
                 self.run_analysis_for_company(company_id, keywords)
                 
-                # Small delay between companies to avoid rate limits
-                time.sleep(5)
+                # Source quotas are enforced by the shared rate limiter; this is only an optional pause
+                if COMPANY_ANALYSIS_DELAY > 0:
+                    time.sleep(COMPANY_ANALYSIS_DELAY)
+            
+            self.log_rate_limits()
                 
         except Exception as e:
             logger.error(f"Error in run_all_companies: {e}")
@@ -100,6 +145,8 @@ class AnalysisScheduler:
         """Run the scheduler loop"""
         self.running = True
         logger.info("Scheduler started")
+        # Load the models in this long-lived thread so the first scheduled run doesn't pay for it
+        self.warm_up_model()
         
         while self.running:
             schedule.run_pending()
@@ -139,17 +186,6 @@ def store_sentiment_history(db, company_id: str, sentiment_data: dict):
     })
 
 
-def store_keyword_history(db, company_id: str, keywords: List[dict]):
-    """Store keyword trends with timestamp"""
-    for keyword in keywords:
-        db.keyword_history.insert_one({
-            "company_id": company_id,
-            "timestamp": datetime.utcnow(),
-            "keyword": keyword.get("keyword"),
-            "count": keyword.get("count", 0),
-        })
-
-
 def get_sentiment_trend(db, company_id: str, days: int = 30):
     """Get sentiment trend over time for XAI insights"""
     from datetime import timedelta
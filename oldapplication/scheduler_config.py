@@ -9,8 +9,9 @@ DAILY_ANALYSIS_TIME = "02:00"
 # Enable/disable scheduler
 SCHEDULER_ENABLED = True
 
-# Delay between analyzing different companies (seconds) to avoid rate limits
-COMPANY_ANALYSIS_DELAY = 5
+# Extra pause between companies (seconds). Source rate limits are enforced per request by
+# the shared token buckets (NEWS/REDDIT/WIKIPEDIA_RATE_PER_MINUTE), so 0 is usually right.
+COMPANY_ANALYSIS_DELAY = 0
 
 # Historical data retention (days)
 HISTORY_RETENTION_DAYS = 90
@@ -0,0 +1,46 @@
+# scrapers/scrape_cursors.py
+"""
+Per-company, per-source scraping high-water marks.
+
+After a source has been scraped completely, the newest item it returned is stored as the
+cursor for (company_id, source), and the next run only asks for items newer than that.
+Cursors only move forward; resetting them makes the next run a full backfill.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from pymongo import ASCENDING
+
+CURSORS_COLLECTION = 'scrape_cursors'
+
+
+def ensure_indexes(database) -> None:
+    database[CURSORS_COLLECTION].create_index([("company_id", ASCENDING), ("source", ASCENDING)], unique=True)
+
+
+def get_cursor(database, company_id: str, source: str) -> Optional[Dict[str, Any]]:
+    doc = database[CURSORS_COLLECTION].find_one({"company_id": company_id, "source": source}, {"_id": 0, "cursor": 1})
+    return doc.get("cursor") if doc else None
+
+
+def advance_cursor(database, company_id: str, source: str, cursor: Dict[str, Any]) -> None:
+    """Moves each cursor field forward with $max, so a late or partial run never rewinds it."""
+    values = {f"cursor.{k}": v for k, v in cursor.items() if v is not None}
+    if not values:
+        return
+    database[CURSORS_COLLECTION].update_one(
+        {"company_id": company_id, "source": source},
+        {"$max": values, "$set": {"updated_at": datetime.utcnow()}},
+        upsert=True,
+    )
+
+
+def reset_cursors(database, company_id: Optional[str] = None, source: Optional[str] = None) -> int:
+    """Deletes the cursors matching company_id and/or source (all of them when both are None)."""
+    query: Dict[str, Any] = {}
+    if company_id:
+        query["company_id"] = company_id
+    if source:
+        query["source"] = source
+    return database[CURSORS_COLLECTION].delete_many(query).deleted_count
@@ -2,7 +2,9 @@
 
 import torch
 import torch.nn as nn
-from transformers import RobertaModel, RobertaTokenizer
+from transformers import RobertaModel, RobertaTokenizerFast
+from .sentiment_labels import map_class_id
+from .tokenization import TokenizationStage, word_attributions
 
 # --- This code is now correct and matches your model's structure ---
 class Attention(nn.Module):
@@ -10,13 +12,15 @@ class Attention(nn.Module):
         super(Attention, self).__init__(**kwargs)
         self.attention = nn.Linear(feature_dim, 1, bias=bias)
 
-    def forward(self, x, mask=None):
+    def forward(self, x, mask=None, return_weights=False):
         eij = self.attention(x)
         a = torch.exp(eij)
         if mask is not None:
             a = a * mask.unsqueeze(-1)
         a = a / (torch.sum(a, dim=1, keepdim=True) + 1e-10)
         weighted_input = x * a
+        if return_weights:
+            return torch.sum(weighted_input, dim=1), a.squeeze(-1)
         return torch.sum(weighted_input, dim=1)
 
 class RobertaHAN(nn.Module):
@@ -35,20 +39,51 @@ class RobertaHAN(nn.Module):
             nn.Identity(),
             nn.Linear(GRU_HIDDEN_SIZE * 2, num_classes)
         )
+        self.pack_padded = True
 
-    def forward(self, input_ids, attention_mask):
+    def forward(self, input_ids, attention_mask, return_attention=False):
         outputs = self.roberta(input_ids=input_ids, attention_mask=attention_mask)
         sequence_output = outputs.last_hidden_state
-        gru_output, _ = self.gru(sequence_output)
+        if self.pack_padded and attention_mask.size(0) > 1:
+            # Keep padding out of the GRU so batched results match single-text scoring
+            lengths = attention_mask.sum(dim=1).clamp(min=1).cpu()
+            packed = nn.utils.rnn.pack_padded_sequence(sequence_output, lengths, batch_first=True, enforce_sorted=False)
+            packed_output, _ = self.gru(packed)
+            gru_output, _ = nn.utils.rnn.pad_packed_sequence(packed_output, batch_first=True, total_length=sequence_output.size(1))
+        else:
+            gru_output, _ = self.gru(sequence_output)
+        if return_attention:
+            # Per-token attention weights come out of the same forward pass at no extra cost
+            attn_output, weights = self.sent_attn(gru_output, mask=attention_mask, return_weights=True)
+            return self.classifier(attn_output), weights
         attn_output = self.sent_attn(gru_output, mask=attention_mask)
         logits = self.classifier(attn_output)
         return logits
 # --------------------------------------------------------------------
 
+SUPPORTED_DTYPES = ('float32', 'int8')
+
+
+def quantize_dynamic_int8(model):
+    """
+    Dynamic INT8 quantization for CPU inference: weights of the RoBERTa encoder's
+    Linear layers, the GRU and the classifier head are stored as int8 and
+    activations are quantized on the fly.
+    """
+    return torch.quantization.quantize_dynamic(model, {nn.Linear, nn.GRU}, dtype=torch.qint8)
+
+
 class SentimentModel:
-    def __init__(self, model_path='best_model.pth'):
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.tokenizer = RobertaTokenizer.from_pretrained('roberta-base')
+    def __init__(self, model_path='best_model.pth', device=None, dtype='float32'):
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported sentiment model dtype: {dtype}")
+        self.model_path = model_path
+        self.dtype = dtype
+        self.device = torch.device(device or ("cuda" if torch.cuda.is_available() else "cpu"))
+        if dtype == 'int8' and self.device.type != 'cpu':
+            raise ValueError("int8 sentiment inference is only available on cpu")
+        self.tokenizer = RobertaTokenizerFast.from_pretrained('roberta-base')
+        self.tokenization = TokenizationStage(self.tokenizer, max_length=512)
         
         # Instantiate the model with 5 classes
         self.model = RobertaHAN(num_classes=5)
@@ -57,18 +92,39 @@ class SentimentModel:
         self.model.load_state_dict(state_dict)
         self.model.to(self.device)
         self.model.eval()
+        if dtype == 'int8':
+            self.model = quantize_dynamic_int8(self.model)
 
     def predict(self, text):
-        inputs = self.tokenizer(text, return_tensors='pt', truncation=True, padding=True, max_length=512).to(self.device)
-        with torch.no_grad():
-            logits = self.model(input_ids=inputs['input_ids'], attention_mask=inputs['attention_mask'])
-        
-        predicted_class_id = torch.argmax(logits, dim=1).item()
-        
-        # FIX #2: Map the 5 output classes to 3 sentiment categories
-        if predicted_class_id in [0, 1]:
-            return 'negative'
-        elif predicted_class_id == 2:
-            return 'neutral'
-        else: # Covers classes 3 and 4
-            return 'positive'
\ No newline at end of file
+        return self.predict_batch([text], batch_size=1)[0]['label']
+
+    def predict_batch(self, texts, batch_size=32, return_attributions=False):
+        """
+        Scores many texts at once. Inputs are tokenized ahead of the model and sorted
+        by token length so that each batch is only padded to its own longest item
+        (see TokenizationStage). Results are returned in the original order as
+        {'label': ..., 'probabilities': [...]} dicts, where 'probabilities' holds
+        the softmax over the 5 model classes. With return_attributions, each result
+        also carries the HAN attention weights mapped back to words.
+        """
+        texts = ['' if t is None else str(t) for t in texts]
+        if not texts:
+            return []
+
+        results = [None] * len(texts)
+        for batch_idx, input_ids, attention_mask, alignments in self.tokenization.batches(texts, batch_size, with_alignment=return_attributions):
+            with torch.no_grad():
+                output = self.model(input_ids=input_ids.to(self.device), attention_mask=attention_mask.to(self.device), return_attention=return_attributions)
+            logits, weights = output if return_attributions else (output, None)
+            probs = torch.softmax(logits.float(), dim=1).cpu()
+            for row, i in enumerate(batch_idx):
+                p = probs[row]
+                results[i] = {
+                    'label': map_class_id(int(torch.argmax(p).item())),
+                    'probabilities': p.tolist(),
+                }
+                if return_attributions:
+                    word_ids, offsets = alignments[row]
+                    results[i]['attributions'] = word_attributions(texts[i], word_ids, offsets, weights[row].float().cpu().tolist(), results[i]['label'])
+        return results
+
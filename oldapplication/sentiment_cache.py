@@ -0,0 +1,338 @@
+# processors/sentiment_cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING, ReplaceOne, errors
+
+import config
+import db
+
+_fingerprints: Dict[Tuple[str, int, float], str] = {}
+_fingerprint_lock = threading.Lock()
+
+
+def normalize_text(text) -> str:
+    """
+    Canonical form used both as the cache key and as the text sent to the model,
+    so a cached result is exactly what the model would return.
+    """
+    if text is None:
+        return ''
+    text = unicodedata.normalize('NFC', str(text))
+    return ' '.join(text.split())
+
+
+def model_fingerprint(model) -> str:
+    """
+    Version string for a loaded model: a hash of its weights file plus the inference dtype.
+    The file hash is computed once per (path, size, mtime).
+    """
+    path = os.path.abspath(model.model_path)
+    stat = os.stat(path)
+    file_key = (path, stat.st_size, stat.st_mtime)
+    with _fingerprint_lock:
+        digest = _fingerprints.get(file_key)
+        if digest is None:
+            h = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    h.update(chunk)
+            digest = h.hexdigest()[:16]
+            _fingerprints[file_key] = digest
+    return f"{digest}:{os.path.splitext(path)[1].lstrip('.')}:{model.dtype}"
+
+
+def cache_key(text: str, model_version: str) -> str:
+    return hashlib.sha256(f"{model_version}\n{text}".encode('utf-8')).hexdigest()
+
+
+def _entry(label: str, probabilities, attributions) -> Dict[str, Any]:
+    entry = {"label": label, "probabilities": probabilities}
+    if attributions is not None:
+        entry["attributions"] = attributions
+    return entry
+
+
+class MongoCacheStore:
+    """Persistent tier in a Mongo collection, evicting least recently used entries past max_items."""
+
+    def __init__(self, collection, max_items: int):
+        self.collection = collection
+        self.max_items = max_items
+        try:
+            self.collection.create_index([("last_used", ASCENDING)])
+        except errors.PyMongoError:
+            pass
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        if not keys:
+            return {}
+        found = {}
+        for doc in self.collection.find({"_id": {"$in": keys}}):
+            found[doc["_id"]] = _entry(doc["label"], doc.get("probabilities"), doc.get("attributions"))
+        if found:
+            self.collection.update_many({"_id": {"$in": list(found.keys())}}, {"$set": {"last_used": time.time()}})
+        return found
+
+    def put_many(self, items: Dict[str, Dict[str, Any]], model_version: str) -> None:
+        if not items:
+            return
+        now = time.time()
+        ops = [
+            ReplaceOne({"_id": k}, {"label": v["label"], "probabilities": v.get("probabilities"), "attributions": v.get("attributions"),
+                                    "model_version": model_version, "last_used": now}, upsert=True)
+            for k, v in items.items()
+        ]
+        self.collection.bulk_write(ops, ordered=False)
+        self._evict()
+
+    def _evict(self) -> None:
+        excess = self.collection.estimated_document_count() - self.max_items
+        if excess <= 0:
+            return
+        oldest = [d["_id"] for d in self.collection.find({}, {"_id": 1}).sort("last_used", ASCENDING).limit(excess)]
+        if oldest:
+            self.collection.delete_many({"_id": {"$in": oldest}})
+
+    def clear(self) -> None:
+        self.collection.delete_many({})
+
+
+class DiskCacheStore:
+    """Persistent tier in a local SQLite file, evicting least recently used entries past max_items."""
+
+    def __init__(self, path: str, max_items: int):
+        self.path = path
+        self.max_items = max_items
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sentiment_cache ("
+                "key TEXT PRIMARY KEY, label TEXT NOT NULL, probabilities TEXT, "
+                "model_version TEXT, last_used REAL NOT NULL)"
+            )
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(sentiment_cache)")]
+            if "attributions" not in columns:
+                self._conn.execute("ALTER TABLE sentiment_cache ADD COLUMN attributions TEXT")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sentiment_cache_last_used ON sentiment_cache (last_used)")
+            self._conn.commit()
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        found = {}
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, label, probabilities, attributions FROM sentiment_cache WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, label, probabilities, attributions in rows:
+                    found[key] = _entry(label, json.loads(probabilities) if probabilities else None, json.loads(attributions) if attributions else None)
+            if found:
+                now = time.time()
+                self._conn.executemany("UPDATE sentiment_cache SET last_used = ? WHERE key = ?", [(now, k) for k in found])
+                self._conn.commit()
+        return found
+
+    def put_many(self, items: Dict[str, Dict[str, Any]], model_version: str) -> None:
+        if not items:
+            return
+        now = time.time()
+        rows = [(k, v["label"], json.dumps(v.get("probabilities")), model_version, now, json.dumps(v["attributions"]) if v.get("attributions") is not None else None)
+                for k, v in items.items()]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO sentiment_cache (key, label, probabilities, model_version, last_used, attributions) "
+                "VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            excess = self._conn.execute("SELECT COUNT(*) FROM sentiment_cache").fetchone()[0] - self.max_items
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM sentiment_cache WHERE key IN "
+                    "(SELECT key FROM sentiment_cache ORDER BY last_used ASC LIMIT ?)", (excess,)
+                )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM sentiment_cache")
+            self._conn.commit()
+
+
+class SentimentCache:
+    """
+    Two-tier cache of sentiment results: an in-memory LRU in front of a persistent store.
+    Keys combine the normalised text with the model fingerprint, so a new model never
+    reuses results from an old one.
+    """
+
+    def __init__(self, store=None, max_memory_items: int = 10000):
+        self.store = store
+        self.max_memory_items = max_memory_items
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.store_hits = 0
+        self.misses = 0
+
+    def _memory_get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self._memory.get(key)
+        if value is not None:
+            self._memory.move_to_end(key)
+        return value
+
+    def _memory_put(self, key: str, value: Dict[str, Any]) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def predict_batch(self, model, texts: List[str], batch_size: int = 32, return_attributions: bool = False) -> List[Dict[str, Any]]:
+        """
+        Drop-in for model.predict_batch: texts are normalised, looked up in memory and
+        then in the persistent store, and only the remaining misses are sent to the model.
+        When attributions are requested, entries cached without them count as misses.
+        """
+        usable = (lambda v: v is not None and v.get('attributions') is not None) if return_attributions else (lambda v: v is not None)
+        version = model_fingerprint(model)
+        texts = [normalize_text(t) for t in texts]
+        keys = [cache_key(t, version) for t in texts]
+
+        found: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for key in set(keys):
+                value = self._memory_get(key)
+                if usable(value):
+                    found[key] = value
+            memory_found = len(found)
+
+        pending = [k for k in dict.fromkeys(keys) if k not in found]
+        if pending and self.store is not None:
+            try:
+                stored = {k: v for k, v in self.store.get_many(pending).items() if usable(v)}
+            except Exception as e:
+                print(f"Sentiment cache: persistent lookup failed: {e}")
+                stored = {}
+            found.update(stored)
+            pending = [k for k in pending if k not in stored]
+        else:
+            stored = {}
+
+        scored: Dict[str, Dict[str, Any]] = {}
+        if pending:
+            text_by_key = dict(zip(keys, texts))
+            if return_attributions:
+                results = model.predict_batch([text_by_key[k] for k in pending], batch_size=batch_size, return_attributions=True)
+            else:
+                results = model.predict_batch([text_by_key[k] for k in pending], batch_size=batch_size)
+            scored = dict(zip(pending, results))
+            found.update(scored)
+            if self.store is not None:
+                try:
+                    self.store.put_many(scored, version)
+                except Exception as e:
+                    print(f"Sentiment cache: persistent write failed: {e}")
+
+        with self._lock:
+            for key, value in {**stored, **scored}.items():
+                self._memory_put(key, value)
+            self.memory_hits += memory_found
+            self.store_hits += len(stored)
+            self.misses += len(scored)
+
+        return [found[k] for k in keys]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Looks up a single precomputed key in memory, then in the persistent store."""
+        with self._lock:
+            value = self._memory_get(key)
+        if value is not None:
+            self.memory_hits += 1
+            return value
+        if self.store is not None:
+            try:
+                value = self.store.get_many([key]).get(key)
+            except Exception as e:
+                print(f"Sentiment cache: persistent lookup failed: {e}")
+        with self._lock:
+            if value is not None:
+                self._memory_put(key, value)
+                self.store_hits += 1
+            else:
+                self.misses += 1
+        return value
+
+    def put(self, key: str, value: Dict[str, Any], model_version: str) -> None:
+        with self._lock:
+            self._memory_put(key, value)
+        if self.store is not None:
+            try:
+                self.store.put_many({key: value}, model_version)
+            except Exception as e:
+                print(f"Sentiment cache: persistent write failed: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self.store is not None:
+            self.store.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.store_hits + self.misses
+        return {
+            'memory_items': len(self._memory),
+            'memory_hits': self.memory_hits,
+            'store_hits': self.store_hits,
+            'misses': self.misses,
+            'hit_rate': round((self.memory_hits + self.store_hits) / lookups, 4) if lookups else None,
+            'store': type(self.store).__name__ if self.store is not None else None,
+        }
+
+
+def select_store(collection_name: str, path: str, max_items: int, label: str):
+    """
+    The persistent store SENTIMENT_CACHE_BACKEND asks for: Mongo's `collection_name` for
+    "auto"/"mongo" when Mongo is configured, otherwise the SQLite file at `path` ("mongo"
+    says so with a warning). None for "off" or an unknown backend.
+    """
+    backend = config.SENTIMENT_CACHE_BACKEND
+    if backend in ('auto', 'mongo') and db.is_enabled():
+        return MongoCacheStore(db.get_collection(collection_name), max_items)
+    if backend in ('auto', 'mongo', 'disk'):
+        if backend == 'mongo':
+            print(f"{label}: MongoDB is unavailable; using the local file {path} instead.")
+        return DiskCacheStore(path, max_items)
+    return None
+
+
+_cache: Optional[SentimentCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_sentiment_cache() -> Optional[SentimentCache]:
+    """
+    Process-wide cache configured from SENTIMENT_CACHE_BACKEND
+    ("auto" uses Mongo when it is configured and a local file otherwise; "mongo" falls back to
+    the local file with a warning when Mongo is unavailable; "off" disables caching).
+    """
+    global _cache
+    backend = config.SENTIMENT_CACHE_BACKEND
+    if backend == 'off':
+        return None
+    if _cache is not None:
+        return _cache
+    with _cache_lock:
+        if _cache is None:
+            store = select_store("sentiment_cache", config.SENTIMENT_CACHE_PATH, config.SENTIMENT_CACHE_MAX_ITEMS, "Sentiment cache")
+            _cache = SentimentCache(store, max_memory_items=config.SENTIMENT_CACHE_MEMORY_ITEMS)
+    return _cache
@@ -0,0 +1,24 @@
+# processors/sentiment_labels.py
+
+# Kept free of torch so every inference backend can share the same mapping
+
+SENTIMENT_LABELS = ('positive', 'neutral', 'negative')
+
+
+def map_class_id(predicted_class_id):
+    # FIX #2: Map the 5 output classes to 3 sentiment categories
+    if predicted_class_id in [0, 1]:
+        return 'negative'
+    elif predicted_class_id == 2:
+        return 'neutral'
+    else: # Covers classes 3 and 4
+        return 'positive'
+
+
+def label_probabilities(probabilities):
+    """Collapses the 5 class probabilities onto the 3 sentiment labels."""
+    return {
+        'negative': float(probabilities[0] + probabilities[1]),
+        'neutral': float(probabilities[2]),
+        'positive': float(probabilities[3] + probabilities[4]),
+    }
@@ -3,13 +3,18 @@ Simplified API Server for PR Command Center
 Serves data directly from MongoDB without requiring scraping modules
 """
 
+import asyncio
 from typing import List, Dict, Any, Optional
-from fastapi import FastAPI
+from fastapi import FastAPI, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pymongo import MongoClient
 import os
 from dotenv import load_dotenv
 
+import config
+from processors import entity_index, keyword_store
+
 # Load environment variables
 load_dotenv()
 
@@ -22,6 +27,16 @@ except ImportError:
     SCHEDULER_AVAILABLE = False
     print("⚠️  Scheduler not available (missing dependencies)")
 
+# Shared sentiment model registry (optional: needs the processors package)
+try:
+    from processors import model_registry
+    from processors.micro_batcher import create_batcher
+    from processors import xai
+    MODEL_REGISTRY_AVAILABLE = True
+except ImportError:
+    model_registry = None
+    MODEL_REGISTRY_AVAILABLE = False
+
 app = FastAPI(title="PR Command Center API")
 
 # CORS middleware
@@ -40,6 +55,8 @@ MONGODB_DB_NAME = os.getenv("MONGODB_DB_NAME", "brand_analyzer")
 client = None
 db = None
 scheduler = None
+score_batcher = create_batcher() if MODEL_REGISTRY_AVAILABLE else None
+MAX_SCORE_TEXTS = 256
 
 def get_db():
     global client, db
@@ -57,13 +74,30 @@ def get_db():
     
     return db
 
+@app.on_event("startup")
+async def startup_event():
+    """Start the on-demand scoring queue and, with PRELOAD_MODELS, load the models"""
+    if score_batcher is not None:
+        score_batcher.start()
+    if MODEL_REGISTRY_AVAILABLE and config.PRELOAD_MODELS:
+        try:
+            from processors import data_processor
+            report = await asyncio.to_thread(data_processor.preload)
+            print(f"✅ Preloaded models: spaCy {report['spacy_seconds']}s, sentiment model {report['sentiment_model'].get('load_seconds')}s")
+        except Exception as e:
+            print(f"⚠️  Model preload failed; models will load on first use: {e}")
+
 @app.on_event("shutdown")
-def shutdown_event():
+async def shutdown_event():
     """Cleanup on shutdown"""
     global scheduler
     if scheduler:
         scheduler.stop()
         print("✅ Scheduler stopped")
+    if score_batcher is not None:
+        await score_batcher.stop()
+    if MODEL_REGISTRY_AVAILABLE:
+        model_registry.unload(all_models=True)
 
 @app.get("/")
 async def root():
@@ -106,7 +140,7 @@ async def get_sentiment(company_id: str):
         db = get_db()
         
         # Try to find sentiment data
-        sentiment = db.sentiments.find_one({"company_id": company_id})
+        sentiment = db.sentiments.find_one({"company_id": company_id}, sort=[("date", -1), ("_id", -1)])
         
         if sentiment:
             return {
@@ -134,11 +168,29 @@ async def get_sentiment(company_id: str):
         print(f"Error fetching sentiment: {e}")
         return {"positive": 0, "neutral": 0, "negative": 0}
 
+@app.get("/api/keywords/trends/{company_id}")
+async def get_keyword_trends(company_id: str, window: int = config.KEYWORD_TREND_WINDOW_DAYS, limit: int = 20, end_date: Optional[str] = None):
+    """Get rising, falling and new keywords for a company"""
+    if not 1 <= window <= config.KEYWORD_TREND_MAX_WINDOW_DAYS:
+        return JSONResponse({"error": f"window must be between 1 and {config.KEYWORD_TREND_MAX_WINDOW_DAYS} days"}, status_code=400)
+    try:
+        db = get_db()
+        return keyword_store.keyword_trends(db, company_id, window, end_date, min(max(limit, 1), 200),
+                                            config.KEYWORD_TREND_GROWTH_THRESHOLD, config.KEYWORD_TREND_MIN_COUNT)
+    except Exception as e:
+        print(f"Error fetching keyword trends: {e}")
+        return {"window_days": window, "keywords": []}
+
 @app.get("/api/keywords/{company_id}")
-async def get_keywords(company_id: str):
+async def get_keywords(company_id: str, days: int = Query(30, ge=1, le=config.KEYWORD_TREND_MAX_WINDOW_DAYS), limit: int = 20):
     """Get top keywords for a company"""
     try:
         db = get_db()
+        start, end = keyword_store.window_bounds(days)
+        keywords = keyword_store.top_terms(db, company_id, "keyword", start, end, limit)
+        if keywords:
+            return keywords
+        # Rows written before per-day counters existed
         keywords = list(db.keywords.find(
             {"company_id": company_id},
             {"_id": 0, "keyword": 1, "count": 1}
@@ -150,10 +202,14 @@ async def get_keywords(company_id: str):
         return []
 
 @app.get("/api/themes/{company_id}")
-async def get_themes(company_id: str):
+async def get_themes(company_id: str, days: int = Query(30, ge=1, le=config.KEYWORD_TREND_MAX_WINDOW_DAYS), limit: int = 10):
     """Get themes for a company"""
     try:
         db = get_db()
+        start, end = keyword_store.window_bounds(days)
+        themes = keyword_store.top_terms(db, company_id, "theme", start, end, limit)
+        if themes:
+            return [t["theme"] for t in themes]
         themes = list(db.themes.find(
             {"company_id": company_id},
             {"_id": 0, "theme": 1}
@@ -164,6 +220,26 @@ async def get_themes(company_id: str):
         print(f"Error fetching themes: {e}")
         return []
 
+@app.get("/api/entities/{company_id}")
+async def get_entities(company_id: str, limit: int = 50):
+    """Get the entities mentioned most often for a company"""
+    try:
+        db = get_db()
+        return entity_index.top_entities(db, company_id, min(max(limit, 1), 500))
+    except Exception as e:
+        print(f"Error fetching entities: {e}")
+        return []
+
+@app.get("/api/entities/{company_id}/{entity}/mentions")
+async def get_entity_mentions(company_id: str, entity: str, page: int = 1, page_size: int = 20):
+    """Get one page of mentions that name an entity"""
+    try:
+        db = get_db()
+        return entity_index.mentions_for_entity(db, company_id, entity, page, page_size)
+    except Exception as e:
+        print(f"Error fetching entity mentions: {e}")
+        return {"entity": entity, "page": page, "page_size": page_size, "total": 0, "mentions": []}
+
 @app.get("/api/news/{company_id}")
 async def get_news_mentions(company_id: str):
     """Get news mentions for a company"""
@@ -224,6 +300,22 @@ async def get_all_mentions(company_id: str, limit: int = 100):
         print(f"Error fetching mentions: {e}")
         return []
 
+@app.get("/api/xai/{mention_id}")
+async def get_xai_explanation(mention_id: str):
+    """Get the attention-based explanation stored for a mention"""
+    if not MODEL_REGISTRY_AVAILABLE:
+        return JSONResponse({"error": "XAI not available"}, status_code=503)
+    try:
+        db = get_db()
+        mention = db.mentions.find_one({"mention_id": mention_id}, {"_id": 0})
+        explanation = xai.explanation_from_mention(mention) if mention else None
+        if explanation is None:
+            return JSONResponse({"error": "No explanation stored for this mention"}, status_code=404)
+        return explanation
+    except Exception as e:
+        print(f"Error fetching XAI explanation: {e}")
+        return JSONResponse({"error": str(e)}, status_code=500)
+
 @app.post("/api/analyze/{company_id}")
 async def trigger_analysis(company_id: str, keywords: List[str] = None):
     """Manually trigger analysis for a company"""
@@ -269,6 +361,50 @@ async def get_scheduler_status():
         "interval_hours": ANALYSIS_INTERVAL_HOURS if SCHEDULER_AVAILABLE else None,
     }
 
+@app.get("/api/model/status")
+async def get_model_status():
+    """Get load time and memory of the shared sentiment model"""
+    if not MODEL_REGISTRY_AVAILABLE:
+        return {"available": False}
+    return {"available": True, **model_registry.get_stats(), "score_batcher": score_batcher.get_stats()}
+
+@app.post("/api/score")
+async def score_text(payload: Dict[str, Any]):
+    """Score one text ("text") or several ("texts") with the shared sentiment model"""
+    if score_batcher is None:
+        return {"error": "Sentiment model not available"}
+    texts = payload.get("texts")
+    if texts is None and payload.get("text") is not None:
+        texts = [payload.get("text")]
+    if not texts or not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+        return {"error": 'Provide "text" or a list of "texts"'}
+    if len(texts) > MAX_SCORE_TEXTS:
+        return {"error": f"At most {MAX_SCORE_TEXTS} texts per request"}
+    try:
+        results = await score_batcher.score_many(texts)
+    except Exception as e:
+        return {"error": str(e)}
+    if "texts" in payload:
+        return {"results": results}
+    return results[0]
+
+@app.post("/api/model/warmup")
+def warm_up_model():
+    """Load the shared sentiment model ahead of the next analysis"""
+    if not MODEL_REGISTRY_AVAILABLE:
+        return {"error": "Model registry not available"}
+    try:
+        return {"status": "ready", **model_registry.warm_up()}
+    except Exception as e:
+        return {"error": str(e)}
+
+@app.post("/api/model/unload")
+async def unload_model():
+    """Release the shared sentiment model"""
+    if not MODEL_REGISTRY_AVAILABLE:
+        return {"error": "Model registry not available"}
+    return {"unloaded": model_registry.unload(all_models=True)}
+
 @app.get("/api/sentiment/history/{company_id}")
 async def get_sentiment_history(company_id: str, days: int = 30):
     """Get historical sentiment data for trend analysis"""
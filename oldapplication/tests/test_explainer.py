@@ -0,0 +1,60 @@
+import pytest
+
+from processors.explainer import PerturbationExplainer
+
+
+class CountingModel:
+    """Positive when a text keeps any 'good' word; counts every text scored."""
+
+    def __init__(self):
+        self.evaluations = 0
+
+    def predict_batch(self, texts, batch_size=32):
+        self.evaluations += len(texts)
+        results = []
+        for text in texts:
+            positive = 0.8 if 'good' in text.split() else 0.2
+            negative = 0.9 - positive
+            # Five classes, very negative .. very positive
+            probabilities = [negative / 2, negative / 2, 0.1, positive / 2, positive / 2]
+            label = 'positive' if positive > negative else 'negative'
+            results.append({'label': label, 'probabilities': probabilities})
+        return results
+
+
+@pytest.mark.parametrize("method", ['occlusion', 'kernel_shap'])
+@pytest.mark.parametrize("n_words, budget", [(5, 64), (40, 16), (300, 32)])
+def test_evaluations_stay_within_the_budget(method, n_words, budget):
+    model = CountingModel()
+    text = ' '.join(['good' if i % 3 == 0 else 'filler' for i in range(n_words)])
+    result = PerturbationExplainer(model, max_evaluations=budget).explain(text, method)
+    assert model.evaluations <= budget
+    assert result['evaluations'] == model.evaluations
+    assert len(result['attributions']) == n_words
+    assert result['segments'] <= n_words
+
+
+def test_occlusion_points_at_the_decisive_word():
+    result = PerturbationExplainer(CountingModel()).explain("good filler filler", 'occlusion')
+    values = {a['word']: a['value'] for a in result['attributions']}
+    assert result['label'] == 'positive'
+    assert values['good'] == 1.0
+    assert abs(values['filler']) < 1.0
+
+
+def test_kernel_shap_is_exhaustive_for_short_texts():
+    result = PerturbationExplainer(CountingModel(), max_evaluations=64).explain("good filler good", 'kernel_shap')
+    assert result['converged']
+    values = [a['value'] for a in result['attributions']]
+    assert values[0] == pytest.approx(values[2])
+
+
+def test_empty_text_costs_one_evaluation():
+    model = CountingModel()
+    result = PerturbationExplainer(model).explain("", 'occlusion')
+    assert result['attributions'] == [] and model.evaluations == 1
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        PerturbationExplainer(CountingModel()).explain("good", 'lime')
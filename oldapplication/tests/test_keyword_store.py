@@ -0,0 +1,77 @@
+import pytest
+
+from processors import keyword_store
+
+
+def test_window_bounds_are_inclusive():
+    assert keyword_store.window_bounds(7, "2026-03-10") == ("2026-03-04", "2026-03-10")
+    assert keyword_store.window_bounds(1, "2026-03-10") == ("2026-03-10", "2026-03-10")
+
+
+@pytest.mark.parametrize("days", [0, -3, None])
+def test_window_bounds_reject_empty_windows(days):
+    with pytest.raises(ValueError):
+        keyword_store.window_bounds(days, "2026-03-10")
+
+
+@pytest.mark.parametrize("current, previous, expected", [
+    (5, 0, 'new'),
+    (0, 0, 'stable'),
+    (10, 5, 'rising'),
+    (2, 10, 'falling'),
+    (11, 10, 'stable'),
+    (3, 2, 'stable'),  # +50%, but below min_count
+])
+def test_classify_trend(current, previous, expected):
+    assert keyword_store.classify_trend(current, previous, growth_threshold=0.25, min_count=2)[0] == expected
+
+
+@pytest.fixture
+def database():
+    mongomock = pytest.importorskip("mongomock")
+    return mongomock.MongoClient().db
+
+
+def _count(database, keyword, date, count):
+    database[keyword_store.TERM_COLLECTIONS['keyword']].insert_one(
+        {"company_id": "acme", "date": date, "keyword": keyword, "count": count})
+
+
+def test_mentions_are_counted_once(database):
+    # The ledger relies on its unique index to spot mentions counted before
+    keyword_store.ensure_indexes(database)
+    terms = {"m1": (["rocket"], ["launch"]), "m2": (["rocket", "skates"], [])}
+    first = keyword_store.record_mention_terms(database, "acme", "2026-03-10", terms)
+    again = keyword_store.record_mention_terms(database, "acme", "2026-03-10", terms)
+    assert first['mentions'] == 2 and again['mentions'] == 0 and again['skipped'] == 2
+    top = keyword_store.top_terms(database, "acme", 'keyword', "2026-03-10", "2026-03-10")
+    assert top == [{"keyword": "rocket", "count": 2}, {"keyword": "skates", "count": 1}]
+
+
+def test_top_terms_only_read_the_window(database):
+    _count(database, "old", "2026-01-01", 100)
+    _count(database, "recent", "2026-03-09", 3)
+    start, end = keyword_store.window_bounds(7, "2026-03-10")
+    assert keyword_store.top_terms(database, "acme", 'keyword', start, end) == [{"keyword": "recent", "count": 3}]
+
+
+def test_trends_rank_by_the_larger_window(database):
+    # Current window 2026-03-08..10, previous 2026-03-05..07
+    _count(database, "collapsed", "2026-03-06", 50)
+    _count(database, "steady", "2026-03-05", 10)
+    _count(database, "steady", "2026-03-09", 10)
+    _count(database, "fresh", "2026-03-10", 4)
+    _count(database, "ancient", "2026-02-01", 500)
+    trends = keyword_store.keyword_trends(database, "acme", 3, "2026-03-10", limit=10)
+    assert trends['current'] == {"start": "2026-03-08", "end": "2026-03-10"}
+    assert trends['previous'] == {"start": "2026-03-05", "end": "2026-03-07"}
+    assert [(k['keyword'], k['trend']) for k in trends['keywords']] == [
+        ("collapsed", 'falling'), ("steady", 'stable'), ("fresh", 'new')]
+
+
+def test_trends_limit_keeps_the_falling_keyword(database):
+    _count(database, "collapsed", "2026-03-06", 50)
+    for i in range(5):
+        _count(database, f"small{i}", "2026-03-10", 2)
+    trends = keyword_store.keyword_trends(database, "acme", 3, "2026-03-10", limit=1)
+    assert [k['keyword'] for k in trends['keywords']] == ["collapsed"]
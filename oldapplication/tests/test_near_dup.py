@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from processors.near_dup import MinHasher, NearDuplicateIndex, shingles
+
+TEXT = "Acme recalls its new rocket skates after several customers reported sudden acceleration on steep hills"
+
+
+def test_shingles_ignore_case_urls_and_punctuation():
+    assert shingles("Big NEWS: see https://example.com/x now!", size=2) == ["big news", "news see", "see now"]
+
+
+def test_short_text_is_one_shingle():
+    assert shingles("Acme rocks", size=4) == ["acme rocks"]
+    assert shingles("", size=4) == []
+
+
+def test_num_perm_must_split_into_bands():
+    with pytest.raises(ValueError):
+        MinHasher(num_perm=64, bands=10)
+
+
+def test_similarity_estimates_jaccard():
+    hasher = MinHasher(num_perm=256, bands=32)
+    a = hasher.signature(shingles(TEXT))
+    b = hasher.signature(shingles(TEXT + " and crashes"))
+    c = hasher.signature(shingles("Quarterly earnings beat expectations as cloud revenue grows across all regions"))
+    assert hasher.similarity(a, a) == 1.0
+    assert hasher.similarity(a, b) > 0.7
+    assert hasher.similarity(a, c) < 0.2
+
+
+def test_signatures_are_deterministic():
+    assert np.array_equal(MinHasher().signature(shingles(TEXT)), MinHasher().signature(shingles(TEXT)))
+    assert len(MinHasher(num_perm=64, bands=16).band_keys(MinHasher().signature(shingles(TEXT)))) == 16
+
+
+def test_batch_duplicates_point_at_the_first_mention():
+    index = NearDuplicateIndex(threshold=0.7)
+    assigned = index.assign("acme", ["m1", "m2", "m3"], [TEXT, "RT " + TEXT, "Acme opens a new factory in Ohio next spring"])
+    assert assigned == {"m1": "m1", "m2": "m1", "m3": "m3"}
+
+
+def test_empty_text_is_its_own_representative():
+    assert NearDuplicateIndex().assign("acme", ["m1", "m2"], ["", ""]) == {"m1": "m1", "m2": "m2"}
+
+
+@pytest.fixture
+def collection():
+    mongomock = pytest.importorskip("mongomock")
+    return mongomock.MongoClient().db.near_dup_index
+
+
+def test_clusters_persist_across_runs(collection):
+    NearDuplicateIndex(collection, threshold=0.7).assign("acme", ["m1"], [TEXT])
+    assigned = NearDuplicateIndex(collection, threshold=0.7).assign("acme", ["m2"], [TEXT + "!"])
+    assert assigned == {"m2": "m1"}
+    assert collection.find_one({"mention_id": "m1"})["cluster_size"] == 2
+    assert collection.count_documents({"company_id": "acme"}) == 1
+
+
+def test_clusters_are_per_company(collection):
+    NearDuplicateIndex(collection).assign("acme", ["m1"], [TEXT])
+    assert NearDuplicateIndex(collection).assign("globex", ["g1"], [TEXT]) == {"g1": "g1"}
+
+
+def test_rescraped_representative_does_not_grow_its_cluster(collection):
+    index = NearDuplicateIndex(collection)
+    index.assign("acme", ["m1"], [TEXT])
+    assert index.assign("acme", ["m1"], [TEXT]) == {"m1": "m1"}
+    assert collection.find_one({"mention_id": "m1"})["cluster_size"] == 1
@@ -0,0 +1,97 @@
+import pytest
+
+from scrapers import new_api_s
+from scrapers.rate_limiter import TokenBucket
+
+
+class FakeNewsAPI:
+    """Serves `articles` newest first, `page_size` at a time, optionally failing some calls first."""
+
+    def __init__(self, articles, errors=()):
+        self.articles = articles
+        self.errors = list(errors)
+        self.calls = []
+
+    def get_everything(self, page, page_size, **params):
+        self.calls.append(page)
+        if self.errors:
+            raise self.errors.pop(0)
+        start = (page - 1) * page_size
+        return {'articles': self.articles[start:start + page_size], 'totalResults': len(self.articles)}
+
+
+class FakeNewsAPIError(Exception):
+    def __init__(self, code):
+        super().__init__(code)
+        self.code = code
+
+    def get_code(self):
+        return self.code
+
+
+def _article(day):
+    return {'source': {'name': 'Wire'}, 'title': f"Day {day}", 'url': f"https://example.com/{day}",
+            'publishedAt': f"2026-03-{day:02d}T00:00:00Z", 'description': "text"}
+
+
+@pytest.fixture(autouse=True)
+def fast_limiter(monkeypatch):
+    limiter = TokenBucket('news', 600000)
+    monkeypatch.setattr(new_api_s, 'get_limiter', lambda source: limiter)
+    return limiter
+
+
+def _read(client, budget, since=None, page_size=2):
+    report = {}
+    pages = list(new_api_s._iter_query_pages(client, "acme", budget, since, page_size, report))
+    return [r['title'] for page in pages for r in page], report
+
+
+def test_stops_at_the_cursor_without_truncation():
+    client = FakeNewsAPI([_article(d) for d in range(20, 0, -1)])
+    titles, report = _read(client, budget=10, since="2026-03-17T00:00:00Z")
+    assert titles == ["Day 20", "Day 19", "Day 18"]
+    assert not report.get('truncated')
+
+
+def test_budget_before_the_cursor_is_truncation():
+    client = FakeNewsAPI([_article(d) for d in range(20, 0, -1)])
+    titles, report = _read(client, budget=5, since="2026-03-01T00:00:00Z")
+    assert len(titles) == 5
+    assert report['truncated']
+
+
+def test_page_cut_to_the_budget_is_not_mistaken_for_the_last_page():
+    client = FakeNewsAPI([_article(d) for d in range(20, 0, -1)])
+    titles, report = _read(client, budget=3, since="2026-03-01T00:00:00Z", page_size=2)
+    assert len(titles) == 3
+    assert report['truncated']
+
+
+def test_running_out_of_results_is_not_truncation():
+    client = FakeNewsAPI([_article(d) for d in range(5, 0, -1)])
+    titles, report = _read(client, budget=50, since="2026-02-01T00:00:00Z")
+    assert len(titles) == 5
+    assert not report.get('truncated')
+
+
+def test_first_run_without_cursor_is_never_truncated():
+    client = FakeNewsAPI([_article(d) for d in range(20, 0, -1)])
+    titles, report = _read(client, budget=4)
+    assert len(titles) == 4
+    assert not report.get('truncated')
+
+
+def test_rate_limited_page_is_retried(fast_limiter):
+    client = FakeNewsAPI([_article(d) for d in range(3, 0, -1)], errors=[FakeNewsAPIError('rateLimited')])
+    titles, _ = _read(client, budget=10, page_size=5)
+    assert len(titles) == 3
+    assert client.calls == [1, 1]
+    assert fast_limiter.get_stats()['rate_limited'] == 1
+
+
+def test_rate_limit_gives_up_after_the_retries():
+    errors = [FakeNewsAPIError('rateLimited')] * (new_api_s.NEWS_RATE_LIMIT_RETRIES + 1)
+    client = FakeNewsAPI([_article(1)], errors=errors)
+    with pytest.raises(FakeNewsAPIError):
+        _read(client, budget=10)
@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+
+from processors import prefilter
+from processors.prefilter import RelevanceFilter, company_aliases, english_score
+
+
+def test_aliases_drop_a_trailing_legal_suffix():
+    assert company_aliases("Acme Rockets Inc.") == [["acme", "rockets", "inc"], ["acme", "rockets"]]
+    assert company_aliases("Acme") == [["acme"]]
+
+
+def test_english_score():
+    assert english_score("The company said it will recall the product") > 0.9
+    assert english_score("La empresa dijo que el producto es para todos") < 0.5
+    assert english_score("Прибыль компании выросла") == 0.0
+    assert english_score(None) == 0.0
+
+
+@pytest.fixture
+def relevance():
+    return RelevanceFilter("Acme Inc", ["recall"], proximity=5)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Acme announces a recall of rocket skates", 1.0),
+    ("Acme recalls rocket skates", 1.0),
+    ("Acme " + "word " * 20 + "recall", 0.8),
+    ("Acme opens a new office", 0.6),
+    ("A recall of rocket skates", 0.3),
+    ("Nothing to see here", 0.0),
+])
+def test_relevance_levels(relevance, text, expected):
+    assert relevance.relevance(text) == expected
+
+
+def test_company_names_match_exactly(relevance):
+    assert relevance.relevance("Acmes and acmeville are not the company") == 0.0
+
+
+def test_without_keywords_naming_the_company_is_enough():
+    assert RelevanceFilter("Acme").relevance("Acme opens a new office") == 1.0
+
+
+def test_verdict_reasons():
+    relevance = RelevanceFilter("Acme", ["recall"], min_relevance=0.5, min_english=0.5)
+    assert relevance.verdict("Acme issues a recall for the product")['reason'] is None
+    assert relevance.verdict("The weather is nice today")['reason'] == 'irrelevant'
+    assert relevance.verdict("Acme dijo que el producto es para todos los clientes")['reason'] == 'non_english'
+
+
+def test_merge_stats_adds_pages():
+    relevance = RelevanceFilter("Acme")
+    first = prefilter.merge_stats(None, relevance.apply(["Acme is great", "Nothing here"]))
+    total = prefilter.merge_stats(first, relevance.apply(["Acme again"]))
+    assert total == {'checked': 3, 'kept': 2, 'non_english': 0, 'irrelevant': 1}
+    assert isinstance(relevance.apply([]), pd.DataFrame)
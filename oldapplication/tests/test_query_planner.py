@@ -0,0 +1,97 @@
+import pytest
+
+from scrapers.query_planner import PlannedQuery, matched_terms, plan_queries, quote_term, run_planned_queries
+
+
+def test_quote_term_drops_embedded_quotes():
+    assert quote_term('say "hello"  world') == '"say hello world"'
+
+
+def test_terms_fit_in_one_query_when_short():
+    queries = plan_queries("Acme", ["rockets", "anvils"], 'news')
+    assert len(queries) == 1
+    assert sorted(queries[0].terms) == ["Acme", "anvils", "rockets"]
+    assert queries[0].text.count(" OR ") == 2
+
+
+def test_terms_are_deduplicated_case_insensitively():
+    queries = plan_queries("Acme", ["acme", "ACME ", "rockets"], 'news')
+    assert sorted(t for q in queries for t in q.terms) == ["Acme", "rockets"]
+
+
+def test_queries_respect_the_length_limit():
+    keywords = [f"keyword number {i}" for i in range(40)]
+    queries = plan_queries("Acme", keywords, 'news', max_length=100)
+    assert len(queries) > 1
+    assert all(len(q.text) <= 100 for q in queries)
+    assert sorted(t for q in queries for t in q.terms) == sorted(["Acme", *keywords])
+
+
+def test_term_longer_than_the_limit_is_skipped():
+    queries = plan_queries("Acme", ["x" * 200], 'news', max_length=50)
+    assert [t for q in queries for t in q.terms] == ["Acme"]
+
+
+def test_matched_terms_match_whole_words_in_title_and_text():
+    record = {'title': "Acme recall", 'text': "Rocketry news"}
+    assert matched_terms(record, ["acme", "rocket", "recall"]) == ["acme", "recall"]
+
+
+def _pages(pages_by_query, truncate=()):
+    def fetch(query, stats):
+        if isinstance(pages_by_query[query], Exception):
+            raise pages_by_query[query]
+        yield from pages_by_query[query]
+        if query in truncate:
+            stats['truncated'] = True
+    return fetch
+
+
+def _records(*ids):
+    return [{'id': i, 'title': i, 'text': ''} for i in ids]
+
+
+def test_results_are_deduplicated_across_queries():
+    queries = [PlannedQuery('a', ['a']), PlannedQuery('b', ['b'])]
+    fetch = _pages({'a': [_records('1', '2')], 'b': [_records('2', '3')]})
+    report = {}
+    ids = sorted(r['id'] for page in run_planned_queries(queries, fetch, lambda r: r['id'], 10, report) for r in page)
+    assert ids == ['1', '2', '3']
+    assert report['complete'] and not report['truncated'] and report['failed'] == []
+    assert sum(q['new'] for q in report['queries'].values()) == 3
+
+
+def test_overall_budget_stops_and_reports_truncation():
+    queries = [PlannedQuery('a', ['a'])]
+    fetch = _pages({'a': [_records('1', '2'), _records('3', '4')]})
+    report = {}
+    pages = list(run_planned_queries(queries, fetch, lambda r: r['id'], 3, report))
+    assert sum(len(p) for p in pages) == 3
+    assert report['truncated'] and report['complete']
+    assert report['pages'] == len(pages)
+
+
+def test_query_truncated_on_its_own_budget_is_reported():
+    queries = [PlannedQuery('a', ['a']), PlannedQuery('b', ['b'])]
+    fetch = _pages({'a': [_records('1')], 'b': [_records('2')]}, truncate={'b'})
+    report = {}
+    list(run_planned_queries(queries, fetch, lambda r: r['id'], 10, report))
+    assert report['truncated']
+    assert report['queries']['b']['truncated']
+
+
+def test_failed_query_is_reported_while_others_succeed():
+    queries = [PlannedQuery('a', ['a']), PlannedQuery('b', ['b'])]
+    fetch = _pages({'a': [_records('1')], 'b': RuntimeError("boom")})
+    report = {}
+    assert len(list(run_planned_queries(queries, fetch, lambda r: r['id'], 10, report))) == 1
+    assert report['failed'] == ['b']
+    assert 'boom' in report['queries']['b']['error']
+
+
+def test_all_queries_failing_raises():
+    queries = [PlannedQuery('a', ['a'])]
+    report = {}
+    with pytest.raises(RuntimeError):
+        list(run_planned_queries(queries, _pages({'a': RuntimeError("down")}), lambda r: r['id'], 10, report))
+    assert not report.get('complete')
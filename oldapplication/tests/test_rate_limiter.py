@@ -0,0 +1,61 @@
+from scrapers.rate_limiter import TokenBucket, paced, retry_after_seconds
+
+
+def test_burst_up_to_capacity_then_waits():
+    bucket = TokenBucket('test', rate_per_minute=60, capacity=3)
+    assert all(bucket.acquire(timeout=0) for _ in range(3))
+    # The next token takes a second to refill
+    assert not bucket.acquire(timeout=0.1)
+
+
+def test_default_capacity_is_ten_seconds_of_rate():
+    assert TokenBucket('test', rate_per_minute=600).capacity == 100
+    assert TokenBucket('test', rate_per_minute=3).capacity == 1
+
+
+def test_rate_limit_halves_rate_and_blocks():
+    bucket = TokenBucket('test', rate_per_minute=60, capacity=5)
+    bucket.on_rate_limited(retry_after=30)
+    stats = bucket.get_stats()
+    assert stats['rate_per_minute'] == 30
+    assert stats['blocked_seconds'] > 29
+    assert stats['rate_limited'] == 1
+    assert not bucket.acquire(timeout=0.1)
+
+
+def test_rate_never_drops_below_a_sixteenth():
+    bucket = TokenBucket('test', rate_per_minute=160)
+    for _ in range(10):
+        bucket.on_rate_limited(retry_after=0)
+    assert bucket.rate == 10
+
+
+def test_successes_win_back_the_configured_rate():
+    bucket = TokenBucket('test', rate_per_minute=100)
+    bucket.on_rate_limited(retry_after=0)
+    bucket.on_success()
+    assert bucket.rate == 55
+    for _ in range(20):
+        bucket.on_success()
+    assert bucket.rate == 100
+
+
+def test_quota_caps_tokens_and_blocks_until_reset():
+    bucket = TokenBucket('test', rate_per_minute=600, capacity=50)
+    bucket.observe_quota(2)
+    assert bucket.get_stats()['tokens_available'] <= 2.1
+    bucket.observe_quota(0, reset_seconds=60)
+    assert not bucket.acquire(timeout=0.1)
+    assert bucket.get_stats()['quota'] == {'remaining': 0, 'reset_seconds': 60}
+
+
+def test_paced_takes_one_token_per_page():
+    bucket = TokenBucket('test', rate_per_minute=6000, capacity=100)
+    assert list(paced(range(250), bucket, page_size=100)) == list(range(250))
+    assert bucket.get_stats()['requests'] == 3
+
+
+def test_retry_after_seconds():
+    assert retry_after_seconds({'Retry-After': '12'}) == 12.0
+    assert retry_after_seconds({'Retry-After': 'soon'}) is None
+    assert retry_after_seconds({}) is None
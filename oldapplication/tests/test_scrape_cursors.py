@@ -0,0 +1,52 @@
+import pytest
+
+from scrapers import scrape_cursors
+
+mongomock = pytest.importorskip("mongomock")
+
+
+@pytest.fixture
+def database():
+    return mongomock.MongoClient().db
+
+
+def test_missing_cursor_is_none(database):
+    assert scrape_cursors.get_cursor(database, "acme", "news") is None
+
+
+def test_advance_creates_and_moves_forward(database):
+    scrape_cursors.advance_cursor(database, "acme", "reddit", {"created_utc": 100.0})
+    scrape_cursors.advance_cursor(database, "acme", "reddit", {"created_utc": 250.0})
+    assert scrape_cursors.get_cursor(database, "acme", "reddit") == {"created_utc": 250.0}
+
+
+def test_advance_never_rewinds(database):
+    scrape_cursors.advance_cursor(database, "acme", "news", {"published_at": "2026-03-02T10:00:00Z"})
+    scrape_cursors.advance_cursor(database, "acme", "news", {"published_at": "2026-03-01T08:00:00Z"})
+    assert scrape_cursors.get_cursor(database, "acme", "news") == {"published_at": "2026-03-02T10:00:00Z"}
+
+
+def test_advance_ignores_empty_values(database):
+    scrape_cursors.advance_cursor(database, "acme", "news", {"published_at": None})
+    assert scrape_cursors.get_cursor(database, "acme", "news") is None
+
+
+def test_cursors_are_per_company_and_source(database):
+    scrape_cursors.advance_cursor(database, "acme", "news", {"published_at": "2026-03-02"})
+    scrape_cursors.advance_cursor(database, "acme", "reddit", {"created_utc": 5.0})
+    scrape_cursors.advance_cursor(database, "globex", "news", {"published_at": "2026-01-01"})
+    assert scrape_cursors.get_cursor(database, "globex", "news") == {"published_at": "2026-01-01"}
+    assert scrape_cursors.get_cursor(database, "globex", "reddit") is None
+
+
+def test_reset_by_company_and_source(database):
+    for company in ("acme", "globex"):
+        for source, cursor in (("news", {"published_at": "2026-03-02"}), ("reddit", {"created_utc": 5.0})):
+            scrape_cursors.advance_cursor(database, company, source, cursor)
+
+    assert scrape_cursors.reset_cursors(database, "acme", "reddit") == 1
+    assert scrape_cursors.get_cursor(database, "acme", "reddit") is None
+    assert scrape_cursors.get_cursor(database, "acme", "news") is not None
+
+    assert scrape_cursors.reset_cursors(database, source="news") == 2
+    assert scrape_cursors.reset_cursors(database) == 1
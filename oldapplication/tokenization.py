@@ -0,0 +1,119 @@
+# processors/tokenization.py
+
+import queue
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+_DONE = object()
+
+
+class TokenizationStage:
+    """
+    Tokenizes ahead of the model in a background thread.
+
+    Texts are taken in windows of `window_batches` batches. Each window is encoded in one
+    call to the Rust-backed fast tokenizer (which spreads the work over its own threads),
+    sorted by token length and cut into padded batches. Up to `prefetch` batches wait in
+    a queue, so the next window is being tokenized while the model runs the current batch.
+    """
+
+    def __init__(self, tokenizer, max_length: int = 512, window_batches: int = 8, prefetch: int = 2, return_tensors: str = 'pt'):
+        self.tokenizer = tokenizer
+        self.max_length = max_length
+        self.window_batches = max(1, window_batches)
+        self.prefetch = max(1, prefetch)
+        self.return_tensors = return_tensors
+        # Fast tokenizers raise "Already borrowed" when one instance is used from two threads at once
+        self._lock = threading.Lock()
+
+    def _produce(self, texts: List[str], batch_size: int, with_alignment: bool, out: "queue.Queue", stop: threading.Event) -> None:
+        try:
+            window = batch_size * self.window_batches
+            for offset in range(0, len(texts), window):
+                chunk = texts[offset:offset + window]
+                with self._lock:
+                    encoding = self.tokenizer(chunk, truncation=True, max_length=self.max_length, return_offsets_mapping=with_alignment)
+                encoded = encoding['input_ids']
+                order = sorted(range(len(chunk)), key=lambda i: len(encoded[i]))
+                for start in range(0, len(order), batch_size):
+                    batch_idx = order[start:start + batch_size]
+                    with self._lock:
+                        padded = self.tokenizer.pad(
+                            {'input_ids': [encoded[i] for i in batch_idx]},
+                            padding=True,
+                            return_tensors=self.return_tensors,
+                        )
+                    alignments = [(encoding.word_ids(i), encoding['offset_mapping'][i]) for i in batch_idx] if with_alignment else None
+                    item = ([offset + i for i in batch_idx], padded['input_ids'], padded['attention_mask'], alignments)
+                    if not self._put(out, item, stop):
+                        return
+            self._put(out, _DONE, stop)
+        except Exception as e:
+            self._put(out, e, stop)
+
+    @staticmethod
+    def _put(out: "queue.Queue", item, stop: threading.Event) -> bool:
+        """Waits for queue space until the consumer stops; False when it stopped first."""
+        while not stop.is_set():
+            try:
+                out.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def batches(self, texts: List[str], batch_size: int = 32, with_alignment: bool = False) -> Iterator[Tuple[List[int], object, object, Optional[list]]]:
+        """
+        Yields (original indices, input_ids, attention_mask, alignments) for each batch.
+        With with_alignment, alignments holds (word_ids, offsets) per row so token-level
+        outputs can be mapped back to words; otherwise it is None.
+        """
+        if not texts:
+            return
+        out: "queue.Queue" = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+        worker = threading.Thread(target=self._produce, args=(texts, batch_size, with_alignment, out, stop), daemon=True)
+        worker.start()
+        try:
+            while True:
+                item = out.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            worker.join(timeout=1)
+
+
+def word_attributions(text: str, word_ids: List[Optional[int]], offsets: List[Tuple[int, int]], weights: List[float], label: str) -> List[Dict[str, Any]]:
+    """
+    Sums token weights per word and returns [{'word', 'value', 'index'}] in text order.
+    Values are scaled so the strongest word is 1 and signed by the predicted label
+    (negative for 'negative', positive otherwise), which is the shape the frontend's
+    SHAP highlighter reads.
+    """
+    spans: Dict[int, List[int]] = {}
+    totals: Dict[int, float] = {}
+    for position, word_id in enumerate(word_ids):
+        if word_id is None or position >= len(weights):
+            continue
+        start, end = offsets[position]
+        if word_id not in spans:
+            spans[word_id] = [start, end]
+            totals[word_id] = 0.0
+        spans[word_id][0] = min(spans[word_id][0], start)
+        spans[word_id][1] = max(spans[word_id][1], end)
+        totals[word_id] += weights[position]
+    if not totals:
+        return []
+    peak = max(totals.values()) or 1.0
+    sign = -1.0 if label == 'negative' else 1.0
+    attributions = []
+    for word_id in sorted(spans):
+        start, end = spans[word_id]
+        word = text[start:end].strip()
+        if word:
+            attributions.append({'word': word, 'value': round(sign * totals[word_id] / peak, 4), 'index': len(attributions)})
+    return attributions
@@ -1,39 +1,145 @@
 # scrapers/wikipedia_s.py
 
 import pandas as pd
-import wikipediaapi
+import requests
+
+from .rate_limiter import get_limiter, retry_after_seconds
+
+WIKI_API_URL = "https://en.wikipedia.org/w/api.php"
 
 def get_company_profile(company_name, user_agent):
     """
-    Fetches the company profile from Wikipedia, including the summary and infobox.
+    Fetches the company profile from Wikipedia: the plain-text intro as the summary, the
+    page URL and its revision id. Uses the same query as get_company_profiles, so
+    profiles stored by either compare field for field.
     """
     if not user_agent:
         print("Wikipedia User-Agent not set. Skipping Wikipedia scraping.")
         return pd.DataFrame()
 
-    # Corrected the line below to include the user_agent
-    wiki_wiki = wikipediaapi.Wikipedia(user_agent=user_agent, language='en')
-    
-    page_py = wiki_wiki.page(company_name)
-
-    if not page_py.exists():
+    profile = get_company_profiles([company_name], user_agent).get(company_name)
+    if profile is None:
         print(f"Wikipedia page for '{company_name}' not found.")
         return pd.DataFrame()
 
-    # Extract Infobox data
-    infobox_data = {}
-    if hasattr(page_py, 'section_by_title') and page_py.section_by_title('Infobox'):
-        # This is a simplification; real infobox parsing is more complex
-        # and may require a different approach if this fails.
-        pass # Placeholder for more robust infobox parsing if needed
-
-    profile_data = {
-        'Name': company_name,
-        'Summary': page_py.summary,
-        'URL': page_py.fullurl
-    }
-    profile_data.update(infobox_data)
-    
-    df = pd.DataFrame([profile_data])
+    df = pd.DataFrame([profile])
     print(f"Successfully scraped Wikipedia profile for {company_name}.")
-    return df
\ No newline at end of file
+    return df
+
+
+def _check_rate_limit(response, limiter):
+    """Feeds a MediaWiki response back into the shared limiter, then raises on HTTP errors."""
+    if response.status_code == 429:
+        limiter.on_rate_limited(retry_after_seconds(response.headers))
+    elif response.ok:
+        limiter.on_success()
+    response.raise_for_status()
+
+
+def _resolve_titles(titles, query):
+    """Maps each requested title to the page title it ends up at after normalization and redirects."""
+    normalized = {n['from']: n['to'] for n in query.get('normalized', [])}
+    redirects = {r['from']: r['to'] for r in query.get('redirects', [])}
+    resolved = {}
+    for title in titles:
+        final = normalized.get(title, title)
+        resolved[title] = redirects.get(final, final)
+    return resolved
+
+
+def get_revision_ids(titles, user_agent, timeout=10):
+    """
+    Returns {title: latest revision id, or None if the page does not exist} for up to 50
+    titles in one MediaWiki API request, following redirects. Used to revalidate cached
+    profiles without downloading their content.
+    """
+    if not titles:
+        return {}
+    limiter = get_limiter('wikipedia')
+    limiter.acquire()
+    response = requests.get(WIKI_API_URL, params={
+        'action': 'query',
+        'prop': 'info',
+        'titles': '|'.join(titles),
+        'redirects': 1,
+        'format': 'json',
+        'formatversion': 2,
+    }, headers={'User-Agent': user_agent}, timeout=timeout)
+    _check_rate_limit(response, limiter)
+    query = response.json().get('query', {})
+    revisions = {p['title']: p.get('lastrevid') for p in query.get('pages', []) if not p.get('missing')}
+    return {title: revisions.get(final) for title, final in _resolve_titles(titles, query).items()}
+
+
+def normalize_summary(text):
+    """The intro extract with runs of whitespace collapsed, so formatting noise never reads as an edit."""
+    return ' '.join((text or '').split())
+
+
+# MediaWiki accepts up to 50 titles per query for regular clients
+MAX_TITLES_PER_REQUEST = 50
+
+
+def _query_pages(titles, user_agent, params, timeout=10):
+    """
+    Runs one multi-title query and follows 'continue' until every page has all of its
+    props (TextExtracts returns at most 20 intro extracts per response).
+    Returns ({requested title: final title}, {final title: merged page dict}).
+    """
+    session = requests.Session()
+    session.headers['User-Agent'] = user_agent
+    base = {'action': 'query', 'titles': '|'.join(titles), 'redirects': 1, 'format': 'json', 'formatversion': 2, **params}
+    resolved, pages = {}, {}
+    continuation = {}
+    limiter = get_limiter('wikipedia')
+    while True:
+        limiter.acquire()
+        response = session.get(WIKI_API_URL, params={**base, **continuation}, timeout=timeout)
+        _check_rate_limit(response, limiter)
+        payload = response.json()
+        query = payload.get('query', {})
+        if not resolved:
+            resolved = _resolve_titles(titles, query)
+        for page in query.get('pages', []):
+            merged = pages.setdefault(page['title'], {})
+            merged.update({k: v for k, v in page.items() if v not in (None, '')})
+        if 'continue' not in payload:
+            return resolved, pages
+        continuation = payload['continue']
+
+
+def get_company_profiles(company_names, user_agent, batch_size=MAX_TITLES_PER_REQUEST):
+    """
+    Fetches profiles for many companies with one MediaWiki query per `batch_size` titles.
+    Returns {company_name: profile dict like get_company_profile's row, or None when the
+    page does not exist}. Redirects are followed, so 'Google' resolves to its target page.
+    """
+    if not user_agent:
+        print("Wikipedia User-Agent not set. Skipping Wikipedia scraping.")
+        return {name: None for name in company_names}
+
+    names = list(dict.fromkeys(company_names))
+    batch_size = max(1, min(batch_size, MAX_TITLES_PER_REQUEST))
+    profiles = {}
+    for start in range(0, len(names), batch_size):
+        batch = names[start:start + batch_size]
+        resolved, pages = _query_pages(batch, user_agent, {
+            'prop': 'extracts|info',
+            'exintro': 1,
+            'explaintext': 1,
+            'exlimit': 'max',
+            'inprop': 'url',
+        })
+        for name in batch:
+            page = pages.get(resolved.get(name, name))
+            if not page or page.get('missing') or page.get('invalid'):
+                profiles[name] = None
+                continue
+            profiles[name] = {
+                'Name': name,
+                'Summary': normalize_summary(page.get('extract')),
+                'URL': page.get('fullurl'),
+                'revision_id': page.get('lastrevid'),
+            }
+    print(f"Fetched {sum(p is not None for p in profiles.values())} of {len(names)} Wikipedia profiles in batches of {batch_size}.")
+    return profiles
@@ -0,0 +1,39 @@
+# processors/xai.py
+
+from typing import Any, Dict, List, Optional
+
+
+def build_explanation(explanation_id: str, label: str, confidence: Optional[float], attributions: List[Dict[str, Any]], method: str = 'attention', top_k: int = 5) -> Dict[str, Any]:
+    """
+    Shapes word attributions like the frontend's XAIExplanation
+    (alertId, confidence, topFeatures, shapValues, reasoning, attentionWeights).
+    """
+    ranked = sorted(attributions, key=lambda a: abs(a['value']), reverse=True)[:top_k]
+    source = 'attention weight' if method == 'attention' else 'attribution'
+    top_features = [{
+        'feature': a['word'],
+        'contribution': a['value'],
+        'explanation': f'{source.capitalize()} {a["value"]:+.2f} on "{a["word"]}" for the {label} prediction',
+    } for a in ranked]
+    if ranked:
+        words = ', '.join(f'"{a["word"]}"' for a in ranked[:3])
+        reasoning = f"Classified as {label}" + (f" with {confidence:.0%} confidence" if confidence is not None else "") + f". The words that weighed most were {words}."
+    else:
+        reasoning = f"Classified as {label}; no word attributions are available for this text."
+    return {
+        'alertId': explanation_id,
+        'confidence': confidence if confidence is not None else 0.0,
+        'topFeatures': top_features,
+        'shapValues': [{'word': a['word'], 'value': a['value'], 'index': a.get('index', i)} for i, a in enumerate(attributions)],
+        'reasoning': reasoning,
+        'attentionWeights': [[abs(a['value']) for a in attributions]] if method == 'attention' else None,
+        'method': method,
+    }
+
+
+def explanation_from_mention(mention: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Builds the explanation stored on a mention document by run_analysis, or None if it has none."""
+    attributions = mention.get('attributions')
+    if not attributions or not mention.get('sentiment'):
+        return None
+    return build_explanation(mention.get('mention_id'), mention['sentiment'], mention.get('sentiment_confidence'), attributions)
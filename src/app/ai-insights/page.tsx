@@ -1,5 +1,6 @@
 'use client';
 
+import { useEffect, useState } from 'react';
 import { MainLayout } from '@/components/layout/MainLayout';
 import { SHAPWordHighlighter } from '@/components/xai/SHAPWordHighlighter';
 import { FeatureContributionBars } from '@/components/xai/FeatureContributionBars';
@@ -9,11 +10,43 @@ import { GlassCard } from '@/components/ui/GlassCard';
 import { generateFeatureContributions, generateConfidenceScore, generateReasoning } from '@/lib/mockXAI';
 import { Tooltip } from '@/components/ui/Tooltip';
 import { Info } from 'lucide-react';
+import { useStore } from '@/store/useStore';
+import * as api from '@/lib/api';
+import type { XAIExplanation } from '@/types';
 
 
 
 export default function AIInsightsPage() {
-    const sampleText = "The product is terrible and disappointing. Customer service was broken and the experience was awful. However, the delivery was excellent and packaging was great.";
+    const { selectedBrand } = useStore();
+    const demoText = "The product is terrible and disappointing. Customer service was broken and the experience was awful. However, the delivery was excellent and packaging was great.";
+    // The brand's most recent negative mention that has a stored explanation; the demo text until one loads
+    const [sample, setSample] = useState<{ text: string; explanation: XAIExplanation } | null>(null);
+
+    useEffect(() => {
+        let cancelled = false;
+        async function loadSample() {
+            setSample(null);
+            const companyId = selectedBrand.replace(/ /g, '_').toLowerCase();
+            const mentions = await api.getMentions(companyId);
+            const negative = mentions.filter(m => m.sentiment?.toLowerCase() === 'negative').slice(0, 5);
+            for (const mention of negative) {
+                const explanation = await api.getXAIExplanation(mention.id);
+                if (cancelled) return;
+                if (explanation?.method) {
+                    // News is scored on its headline, other sources on their text
+                    setSample({ text: mention.platform === 'news' ? mention.title || mention.text : mention.text, explanation });
+                    return;
+                }
+            }
+        }
+        loadSample().catch(error => console.error('Failed to load a sample explanation:', error));
+        return () => {
+            cancelled = true;
+        };
+    }, [selectedBrand]);
+
+    const sampleText = sample?.text ?? demoText;
+    const sampleValues = sample?.explanation.shapValues;
 
     const features = generateFeatureContributions({ negativeRatio: 0.65, mentionCount: 75 });
     const confidence = generateConfidenceScore({ dataPoints: 85, consistency: 0.88 });
@@ -46,7 +79,7 @@ export default function AIInsightsPage() {
                         <span className="text-green-400"> green</span> indicates positive impact.
                         Hover over highlighted words to see their exact SHAP values.
                     </p>
-                    <SHAPWordHighlighter text={sampleText} className="text-lg" />
+                    <SHAPWordHighlighter text={sampleText} values={sampleValues} className="text-lg" />
                 </GlassCard>
 
                 {/* Feature Contributions Demo */}
@@ -125,7 +158,7 @@ export default function AIInsightsPage() {
                         {/* Sample Text with SHAP */}
                         <div>
                             <h4 className="text-sm font-semibold text-gray-400 mb-2">Sample Mention:</h4>
-                            <SHAPWordHighlighter text={sampleText} />
+                            <SHAPWordHighlighter text={sampleText} values={sampleValues} />
                         </div>
 
                         {/* Feature Contributions */}
@@ -20,7 +20,8 @@ interface AlertStreamProps {
 
 interface AlertCardProps {
     alert: Alert;
-    xaiExplanation?: XAIExplanation;
+    // undefined while loading, null when the backend has no explanation for the alert's mention
+    xaiExplanation?: XAIExplanation | null;
     onLoadExplanation: () => void;
 }
 
@@ -28,7 +29,7 @@ function AlertCard({ alert, xaiExplanation, onLoadExplanation }: AlertCardProps)
     const [expanded, setExpanded] = useState(false);
 
     const handleExpand = () => {
-        if (!expanded && !xaiExplanation) {
+        if (!expanded && xaiExplanation === undefined) {
             onLoadExplanation();
         }
         setExpanded(!expanded);
@@ -129,10 +130,13 @@ function AlertCard({ alert, xaiExplanation, onLoadExplanation }: AlertCardProps)
                                         dataQuality={alert.relatedMentions > 50 ? 'Excellent' : 'Good'}
                                     />
 
-                                    {/* Alert Description with SHAP highlighting */}
+                                    {/* Example mention (or the alert description) with word attributions */}
                                     <div>
-                                        <div className="text-sm font-medium mb-2">Alert Description</div>
-                                        <SHAPWordHighlighter text={alert.description} />
+                                        <div className="text-sm font-medium mb-2">{alert.mentionText ? 'Example Mention' : 'Alert Description'}</div>
+                                        <SHAPWordHighlighter
+                                            text={alert.mentionText || alert.description}
+                                            values={xaiExplanation.method ? xaiExplanation.shapValues : undefined}
+                                        />
                                     </div>
 
                                     {/* Feature Contributions with new component */}
@@ -169,6 +173,10 @@ function AlertCard({ alert, xaiExplanation, onLoadExplanation }: AlertCardProps)
                                         <ExternalLink className="w-4 h-4" />
                                     </button>
                                 </div>
+                            ) : xaiExplanation === null ? (
+                                <div className="pt-4 text-center text-gray-400">
+                                    No explanation is available for this alert yet.
+                                </div>
                             ) : (
                                 <div className="pt-4 text-center text-gray-400">
                                     Loading explanation...
@@ -183,14 +191,12 @@ function AlertCard({ alert, xaiExplanation, onLoadExplanation }: AlertCardProps)
 }
 
 export function AlertStream({ alerts, onAlertClick }: AlertStreamProps) {
-    const [xaiExplanations, setXaiExplanations] = useState<Record<string, XAIExplanation>>({});
+    const [xaiExplanations, setXaiExplanations] = useState<Record<string, XAIExplanation | null>>({});
 
-    const loadXAIExplanation = async (alertId: string) => {
-        // Simulate loading XAI explanation
-        // In real app, this would call: await getXAIExplanation(alertId)
+    const loadXAIExplanation = async (alert: Alert) => {
         const { getXAIExplanation } = await import('@/lib/api');
-        const explanation = await getXAIExplanation(alertId);
-        setXaiExplanations(prev => ({ ...prev, [alertId]: explanation }));
+        const explanation = await getXAIExplanation(alert.mentionId ?? alert.id);
+        setXaiExplanations(prev => ({ ...prev, [alert.id]: explanation }));
     };
 
     return (
@@ -205,7 +211,7 @@ export function AlertStream({ alerts, onAlertClick }: AlertStreamProps) {
                     <AlertCard
                         alert={alert}
                         xaiExplanation={xaiExplanations[alert.id]}
-                        onLoadExplanation={() => loadXAIExplanation(alert.id)}
+                        onLoadExplanation={() => loadXAIExplanation(alert)}
                     />
                 </motion.div>
             ))}
@@ -41,7 +41,7 @@ export function CrisisKeywords({ keywords, onKeywordClick }: CrisisKeywordsProps
                     {crisisKeywords.map((keyword, index) => {
                         const intensity = keyword.count / maxCount;
                         const size = Math.max(0.8, intensity * 1.5);
-                        const isRising = keyword.trend === 'rising';
+                        const isRising = keyword.trend === 'rising' || keyword.trend === 'new';
 
                         return (
                             <motion.button
@@ -87,7 +87,7 @@ export function CrisisKeywords({ keywords, onKeywordClick }: CrisisKeywordsProps
                     <div>
                         <div className="text-xs text-gray-400 mb-1">Rising Trends</div>
                         <div className="text-lg font-bold text-red-400">
-                            {crisisKeywords.filter(k => k.trend === 'rising').length}
+                            {crisisKeywords.filter(k => k.trend === 'rising' || k.trend === 'new').length}
                         </div>
                     </div>
                     <div>
@@ -8,6 +8,8 @@ import { generateSHAPValues } from '@/lib/mockXAI';
 interface SHAPWordHighlighterProps {
     text: string;
     className?: string;
+    // Word attributions from the backend (e.g. XAIExplanation.shapValues); mock values are used when omitted
+    values?: Array<{ word: string; value: number; index?: number }>;
 }
 
 function getSHAPColor(value: number): string {
@@ -29,8 +31,10 @@ function getSHAPColor(value: number): string {
     return '';
 }
 
-export function SHAPWordHighlighter({ text, className }: SHAPWordHighlighterProps) {
-    const shapValues = generateSHAPValues(text);
+export function SHAPWordHighlighter({ text, className, values }: SHAPWordHighlighterProps) {
+    const shapValues = values && values.length > 0
+        ? values.map((v, i) => ({ word: v.word, value: v.value, index: v.index ?? i }))
+        : generateSHAPValues(text);
 
     return (
         <div className={cn('leading-relaxed', className)}>
@@ -17,6 +17,16 @@ import type {
 // Mock data will be imported when USE_MOCK_DATA is true
 import * as mockData from './mockData';
 
+// Raised when the backend answered with an error status (as opposed to being unreachable)
+export class APIError extends Error {
+    status: number;
+
+    constructor(status: number, statusText: string) {
+        super(`API Error: ${statusText}`);
+        this.status = status;
+    }
+}
+
 // API Client
 class APIClient {
     private baseURL: string;
@@ -28,7 +38,7 @@ class APIClient {
     private async fetch<T>(endpoint: string): Promise<T> {
         const response = await fetch(`${this.baseURL}${endpoint}`);
         if (!response.ok) {
-            throw new Error(`API Error: ${response.statusText}`);
+            throw new APIError(response.status, response.statusText);
         }
         return response.json();
     }
@@ -48,6 +58,11 @@ class APIClient {
         return this.fetch(`/api/keywords/${companyId}`);
     }
 
+    async getKeywordTrends(companyId: string, windowDays?: number): Promise<{ window_days: number; keywords: Array<{ keyword: string; count: number; previous_count: number; growth: number | null; trend: 'rising' | 'stable' | 'falling' | 'new'; intensity: number }> }> {
+        const query = windowDays ? `?window=${windowDays}` : '';
+        return this.fetch(`/api/keywords/trends/${companyId}${query}`);
+    }
+
     // Themes
     async getThemes(companyId: string): Promise<string[]> {
         return this.fetch(`/api/themes/${companyId}`);
@@ -66,6 +81,20 @@ class APIClient {
         return this.fetch(`/api/twitter/${companyId}`);
     }
 
+    // Entities
+    async getEntities(companyId: string): Promise<Array<{ entity: string; display: string; count: number }>> {
+        return this.fetch(`/api/entities/${companyId}`);
+    }
+
+    async getEntityMentions(companyId: string, entity: string, page: number = 1, pageSize: number = 20): Promise<{ entity: string; page: number; page_size: number; total: number; mentions: any[] }> {
+        return this.fetch(`/api/entities/${companyId}/${encodeURIComponent(entity)}/mentions?page=${page}&page_size=${pageSize}`);
+    }
+
+    // Explanations
+    async getXAIExplanation(mentionId: string): Promise<XAIExplanation> {
+        return this.fetch(`/api/xai/${encodeURIComponent(mentionId)}`);
+    }
+
     // Health check
     async getHealth(): Promise<any> {
         return this.fetch('/api/health');
@@ -199,6 +228,13 @@ export async function getAlerts(companyId: string): Promise<Alert[]> {
             m.sentiment === 'negative' || m.sentiment === 'Negative'
         );
 
+        // Alerts link one example mention so its stored explanation can be shown
+        const example = (mentions: any[]) => mentions.find(m => m.mention_id && m.attributions) || mentions.find(m => m.mention_id);
+        const exampleFields = (mention: any) => mention ? {
+            mentionId: mention.mention_id as string,
+            mentionText: (mention.source === 'news' ? mention.title : mention.text || mention.title) as string,
+        } : {};
+
         // Create alert for high negative sentiment
         if (negativeMentions.length > 5) {
             alerts.push({
@@ -212,6 +248,7 @@ export async function getAlerts(companyId: string): Promise<Alert[]> {
                 keywords: ['negative', 'sentiment', 'spike'],
                 sentiment: 'negative',
                 isRead: false,
+                ...exampleFields(example(negativeMentions)),
             });
         }
 
@@ -228,6 +265,7 @@ export async function getAlerts(companyId: string): Promise<Alert[]> {
                 keywords: ['volume', 'mentions', 'trending'],
                 sentiment: 'neutral',
                 isRead: false,
+                ...exampleFields(example(allMentions)),
             });
         }
 
@@ -339,19 +377,37 @@ export async function getMentions(companyId: string, source?: 'news' | 'reddit'
     }
 }
 
+export async function getMentionsByEntity(companyId: string, entity: string, page: number = 1, pageSize: number = 20): Promise<{ mentions: Mention[]; total: number }> {
+    if (USE_MOCK_DATA) {
+        return { mentions: mockData.generateMentions(pageSize), total: pageSize };
+    }
+
+    try {
+        const result = await apiClient.getEntityMentions(companyId, entity, page, pageSize);
+        return {
+            mentions: result.mentions.map(m => convertBackendMention(m, m.source || 'news')),
+            total: result.total,
+        };
+    } catch (error) {
+        console.error('Failed to fetch entity mentions:', error);
+        return { mentions: [], total: 0 };
+    }
+}
+
 export async function getKeywordTrends(companyId: string): Promise<KeywordTrend[]> {
     if (USE_MOCK_DATA) {
         return mockData.generateKeywordTrends();
     }
 
     try {
-        const keywords = await apiClient.getKeywords(companyId);
-        return keywords.map(k => ({
+        const trends = await apiClient.getKeywordTrends(companyId);
+        return trends.keywords.map(k => ({
             keyword: k.keyword,
             count: k.count,
             sentiment: 'neutral' as const,
-            trend: 'stable' as const,
-            intensity: Math.min(100, k.count),
+            trend: k.trend,
+            growth: k.growth,
+            intensity: k.intensity,
         }));
     } catch (error) {
         console.error('Failed to fetch keywords:', error);
@@ -359,12 +415,25 @@ export async function getKeywordTrends(companyId: string): Promise<KeywordTrend[
     }
 }
 
-export async function getXAIExplanation(alertId: string): Promise<XAIExplanation> {
+// Resolves to null when the backend has no explanation for the mention (404); the mock is
+// only used in mock mode or when the backend can't be reached
+export async function getXAIExplanation(mentionId: string): Promise<XAIExplanation | null> {
     if (USE_MOCK_DATA) {
-        return mockData.generateXAIExplanation(alertId);
+        return mockData.generateXAIExplanation(mentionId);
+    }
+
+    try {
+        return await apiClient.getXAIExplanation(mentionId);
+    } catch (error) {
+        if (error instanceof APIError) {
+            if (error.status !== 404) {
+                console.error('Failed to fetch XAI explanation:', error);
+            }
+            return null;
+        }
+        console.error('XAI backend unreachable, using mock explanation:', error);
+        return mockData.generateXAIExplanation(mentionId);
     }
-    // TODO: Implement real API call when backend endpoint is available
-    return mockData.generateXAIExplanation(alertId);
 }
 
 export async function getSpikeDetections(companyId: string): Promise<SpikeDetection[]> {
@@ -378,7 +447,7 @@ export async function getSpikeDetections(companyId: string): Promise<SpikeDetect
 // Helper function to convert backend mention format to frontend format
 function convertBackendMention(backendMention: any, platform: 'news' | 'reddit' | 'twitter'): Mention {
     return {
-        id: backendMention.url || backendMention.id || Math.random().toString(),
+        id: backendMention.mention_id || backendMention.url || backendMention.id || Math.random().toString(),
         text: backendMention.text || backendMention.title || backendMention.content || '',
         author: backendMention.author || 'Unknown',
         authorHandle: backendMention.author || '@unknown',
@@ -19,6 +19,9 @@ export interface Alert {
     keywords: string[];
     sentiment: Sentiment;
     isRead: boolean;
+    // Example mention behind the alert; its stored explanation is loaded via /api/xai/{mention_id}
+    mentionId?: string;
+    mentionText?: string;
 }
 
 export interface SentimentData {
@@ -79,6 +82,7 @@ export interface XAIExplanation {
     }[];
     reasoning: string;
     attentionWeights?: number[][]; // Optional for advanced view
+    method?: 'attention' | 'occlusion' | 'kernel_shap'; // Set by the backend, absent on mock explanations
 }
 
 export interface RiskSummary {
@@ -94,7 +98,8 @@ export interface KeywordTrend {
     keyword: string;
     count: number;
     sentiment: Sentiment;
-    trend: 'rising' | 'stable' | 'falling';
+    trend: 'rising' | 'stable' | 'falling' | 'new';
+    growth?: number | null; // change vs. the previous window, e.g. 0.5 = +50%
     intensity: number; // 0-100 for visualization
 }
 